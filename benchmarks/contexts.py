@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+'''
+Compares short offscreen render jobs that create and destroy a hidden
+window per job against jobs leasing windows from a glfw.ContextPool
+
+Each job makes its context current, clears the framebuffer and waits
+for the GPU to finish.
+
+Usage:
+    contexts [options]
+
+Options:
+    -h --help                This message
+    -j --jobs=<jobs>         Render jobs per measurement [default: 50]
+    -s --size=<size>         Windows kept warm by the pool [default: 4]
+    -W --width=<width>       Width of the windows [default: 256]
+    -H --height=<height>     Height of the windows [default: 256]
+'''
+from __future__ import absolute_import, division, print_function, unicode_literals  # noqa
+
+import time
+
+import glfw
+from glfw import pool as context_pool
+
+
+def render():
+    '''Clears the current framebuffer and waits for the GPU'''
+    functions = context_pool._get_gl_functions()
+    functions['glClearColor'](0.25, 0.5, 0.75, 1.0)
+    functions['glClear'](context_pool._GL_COLOR_BUFFER_BIT)
+    finish = glfw.ffi.cast('void (*)(void)', glfw.core.glfwGetProcAddress(b'glFinish'))
+    finish()
+
+
+def create_per_job(jobs, width, height):
+    for _ in range(jobs):
+        glfw.default_window_hints()
+        glfw.window_hint(glfw.VISIBLE, False)
+        win = glfw.create_window(width, height, 'job', monitor=glfw.ffi.NULL, raise_exception=True)
+        glfw.make_context_current(win)
+        render()
+        glfw.make_context_current(glfw.ffi.NULL)
+        glfw.destroy_window(win)
+
+
+def pooled(pool, jobs):
+    for _ in range(jobs):
+        with pool.context():
+            render()
+
+
+def main(jobs=50, size=4, width=256, height=256, **kwds):
+    jobs, size, width, height = int(jobs), int(size), int(width), int(height)
+    if not glfw.init():
+        raise RuntimeError('Could not initialize GLFW')
+
+    start = time.time()
+    create_per_job(jobs, width, height)
+    per_job = (time.time() - start) / jobs
+
+    start = time.time()
+    pool = glfw.ContextPool(size=size, width=width, height=height)
+    warm = time.time() - start
+    start = time.time()
+    pooled(pool, jobs)
+    leased = (time.time() - start) / jobs
+    metrics = dict(pool.metrics)
+    pool.close()
+
+    print('{} jobs of {}x{}'.format(jobs, width, height))
+    print('create per job:  {:.3f} ms per job'.format(per_job * 1e3))
+    print('context pool:    {:.3f} ms per job (+{:.1f} ms to warm {} windows), {:.0f}x'.format(
+        leased * 1e3, warm * 1e3, size, per_job / leased))
+    print('pool metrics:    hits={hits} misses={misses} created={created} '
+          'mean creation {mean:.3f} ms, max {max:.3f} ms'.format(
+              mean=metrics['creation_seconds'] / max(metrics['created'], 1) * 1e3,
+              max=metrics['max_creation_seconds'] * 1e3, **metrics))
+
+
+if __name__ == '__main__':
+    from docopt import docopt
+
+    def fix(option):
+        option = option.lstrip('--')  # --optional-arg -> optional-arg
+        option = option.lstrip('<').rstrip('>')  # <positional-arg> -> positional-arg
+        option = option.replace('-', '_')  # hyphen-arg -> method_parameter
+        return option
+
+    options = {fix(k): v for k, v in docopt(__doc__).items()}
+    main(**options)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+'''
+Compares the per-call cost of the enum name lookups (get_key_string,
+get_mod_string, get_mouse_button_string and get_action_string) against
+the previous implementations, which rebuilt a dictionary from the
+module globals on every call
+
+Usage:
+    lookups [options]
+
+Options:
+    -h --help                This message
+    -n --number=<number>     Calls per measurement [default: 20000]
+    -r --repeat=<repeat>     Measurements per function (best is kept) [default: 5]
+    -s --size=<size>         Keys per call for the vectorized lookup [default: 10000]
+'''
+from __future__ import absolute_import, division, print_function, unicode_literals  # noqa
+
+import timeit
+
+import glfw
+from glfw import api
+
+
+def previous_get_key_string(key):
+    val = 'KEY_'
+    globs = dict(vars(api).items())
+    lookup = {v: k.replace(val, '').lower() for k, v in globs.items() if k.startswith(val)}
+    return lookup.get(key, key)
+
+
+def previous_get_mod_string(mods):
+    val = 'MOD_'
+    lookup = {v: k.replace(val, '').lower() for k, v in vars(api).items() if k.startswith(val)}
+    return '+'.join(sorted({v for m, v in lookup.items() if m & mods}))
+
+
+def previous_get_mouse_button_string(button):
+    val = 'MOUSE_BUTTON_'
+    lookup = {v: k.replace(val, '').lower() for k, v in sorted(vars(api).items()) if k.startswith(val)}
+    return lookup.get(button, button)
+
+
+def previous_get_action_string(action):
+    options = ['RELEASE', 'PRESS', 'REPEAT']
+    data = {v: k.lower() for k, v in vars(api).items() if k in options}
+    return data.get(action, action)
+
+
+def measure(func, args, number, repeat):
+    '''Returns the best time per call in nanoseconds'''
+    timer = timeit.Timer(lambda: func(*args))
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e9
+
+
+def main(number=20000, repeat=5, size=10000, **kwds):
+    number, repeat, size = int(number), int(repeat), int(size)
+    calls = [
+        (previous_get_key_string, glfw.get_key_string, glfw.KEY_A),
+        (previous_get_mod_string, glfw.get_mod_string, glfw.MOD_SHIFT | glfw.MOD_CONTROL),
+        (previous_get_mouse_button_string, glfw.get_mouse_button_string, glfw.MOUSE_BUTTON_LEFT),
+        (previous_get_action_string, glfw.get_action_string, glfw.PRESS),
+    ]
+    row = '{:<26}{:>16}{:>16}{:>10}'
+    print(row.format('function', 'previous (ns)', 'tables (ns)', 'speedup'))
+    for previous, current, value in calls:
+        old = measure(previous, (value, ), number // 10, repeat)
+        new = measure(current, (value, ), number, repeat)
+        print(row.format(current.__name__, '{:.0f}'.format(old), '{:.0f}'.format(new), '{:.0f}x'.format(old / new)))
+
+    try:
+        import numpy as np
+    except ImportError:
+        print('numpy is not installed, skipping vectorized lookups')
+        return
+    keys = np.random.choice(sorted(glfw.key_names), size=size)
+    loop = measure(lambda: [glfw.get_key_string(key) for key in keys], (), max(number // size, 1), repeat)
+    vectorized = measure(glfw.get_key_strings, (keys, ), max(number // size, 1), repeat)
+    print('')
+    print('{} keys:  get_key_string loop {:.0f} us, get_key_strings {:.0f} us'.format(size, loop / 1e3, vectorized / 1e3))
+
+
+if __name__ == '__main__':
+    from docopt import docopt
+
+    def fix(option):
+        option = option.lstrip('--')  # --optional-arg -> optional-arg
+        option = option.lstrip('<').rstrip('>')  # <positional-arg> -> positional-arg
+        option = option.replace('-', '_')  # hyphen-arg -> method_parameter
+        return option
+
+    options = {fix(k): v for k, v in docopt(__doc__).items()}
+    main(**options)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+'''
+Compares a render loop that reads every frame back with glReadPixels and
+encodes it before swapping buffers against one using glfw.FrameRecorder,
+which reads frames back asynchronously and encodes them on a worker thread
+
+Runs under Xvfb, e.g.:  xvfb-run -s '-screen 0 1280x1024x24' python benchmarks/recorder.py
+
+Usage:
+    recorder [options]
+
+Options:
+    -h --help                This message
+    -f --frames=<frames>     Frames rendered per loop [default: 120]
+    -W --width=<width>       Width of the window [default: 640]
+    -H --height=<height>     Height of the window [default: 480]
+    -F --format=<format>     raw or png [default: png]
+    -p --policy=<policy>     drop or block [default: drop]
+    -q --queue=<queue>       Frames that may wait for the worker [default: 8]
+'''
+from __future__ import absolute_import, division, print_function, unicode_literals  # noqa
+
+import os
+import shutil
+import tempfile
+import time
+
+import glfw
+from glfw import gl
+
+
+def render(index):
+    gl.clear_color((index % 60) / 60.0, 0.25, 0.5, 1.0)
+    gl.clear(gl.COLOR_BUFFER_BIT)
+
+
+def synchronous(win, recorder, frames, width, height):
+    '''Reads each frame back and writes it before swapping buffers'''
+    for index in range(frames):
+        render(index)
+        pixels = gl.read_pixels(0, 0, width, height, gl.RGBA, gl.UNSIGNED_BYTE, outputType=None)
+        # Encode on the render thread, as ad hoc capture loops do
+        recorder._write_frame(index, pixels.reshape(height, width, 4)[::-1].copy())
+        recorder.counters['written'] += 1
+        glfw.swap_buffers(win)
+        glfw.poll_events()
+
+
+def asynchronous(win, recorder, frames):
+    for index in range(frames):
+        render(index)
+        recorder.swap_buffers(win)
+        glfw.poll_events()
+
+
+def main(frames=120, width=640, height=480, format='png', policy='drop', queue=8, **kwds):
+    frames, width, height, queue = int(frames), int(width), int(height), int(queue)
+    if not glfw.init():
+        raise RuntimeError('Could not initialize GLFW')
+    info = glfw.probe_context_versions()
+    if info.core is None:
+        raise RuntimeError('An OpenGL 3.2 core profile context is required')
+    glfw.window_hint(glfw.CONTEXT_VERSION_MAJOR, info.core[0])
+    glfw.window_hint(glfw.CONTEXT_VERSION_MINOR, info.core[1])
+    glfw.window_hint(glfw.OPENGL_PROFILE, glfw.OPENGL_CORE_PROFILE)
+    glfw.window_hint(glfw.OPENGL_FORWARD_COMPAT, True)
+    win = glfw.create_window(width, height, 'recorder benchmark', monitor=glfw.ffi.NULL, raise_exception=True)
+    glfw.make_context_current(win)
+    glfw.swap_interval(0)
+    width, height = glfw.get_framebuffer_size(win)
+
+    folder = tempfile.mkdtemp(prefix='glfw-recorder-')
+    path = os.path.join(folder, 'frame-{:06d}.png' if format == 'png' else 'frames.rgba')
+    try:
+        results = []
+        for name in ('synchronous', 'asynchronous'):
+            recorder = glfw.FrameRecorder(path, width, height, format=format, queue_size=queue,
+                                          policy='block' if name == 'synchronous' else policy)
+            start = time.time()
+            if name == 'synchronous':
+                synchronous(win, recorder, frames, width, height)
+            else:
+                asynchronous(win, recorder, frames)
+            render_seconds = time.time() - start
+            recorder.close()
+            total_seconds = time.time() - start
+            results.append((name, render_seconds, total_seconds, recorder.counters))
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+        glfw.destroy_window(win)
+
+    print('{} frames of {}x{} written as {}'.format(frames, width, height, format))
+    row = '{:<14}{:>12}{:>12}{:>10}{:>10}'
+    print(row.format('loop', 'render fps', 'total (s)', 'written', 'dropped'))
+    for name, render_seconds, total_seconds, counters in results:
+        print(row.format(name, '{:.1f}'.format(frames / render_seconds), '{:.2f}'.format(total_seconds),
+                         counters['written'], counters['dropped']))
+
+
+if __name__ == '__main__':
+    from docopt import docopt
+
+    def fix(option):
+        option = option.lstrip('--')  # --optional-arg -> optional-arg
+        option = option.lstrip('<').rstrip('>')  # <positional-arg> -> positional-arg
+        option = option.replace('-', '_')  # hyphen-arg -> method_parameter
+        return option
+
+    options = {fix(k): v for k, v in docopt(__doc__).items()}
+    main(**options)
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+'''
+Compares input latency of a single-threaded render loop with a
+glfw.RenderThread while every frame takes a synthetic render load
+
+An injector thread emulates input arriving at random intervals: it
+stamps each input and wakes glfw with glfwPostEmptyEvent.  Latency is
+measured until the main thread handles the input and until a frame
+being rendered receives it.  The load sleeps, like a render thread
+waiting on the GPU, so it does not hold the GIL.
+
+Runs under Xvfb, e.g.:  xvfb-run -s '-screen 0 1280x1024x24' python benchmarks/render_thread.py
+
+Usage:
+    render_thread [options]
+
+Options:
+    -h --help                This message
+    -i --inputs=<inputs>     Inputs injected per loop [default: 100]
+    -l --load=<load>         Render load per frame in milliseconds [default: 30]
+'''
+from __future__ import absolute_import, division, print_function, unicode_literals  # noqa
+
+import collections
+import random
+import threading
+import time
+
+import glfw
+from glfw import gl
+from glfw.events import Event
+
+
+class Injector(object):
+    '''Emulates input arriving every 5 to 50 ms'''
+
+    def __init__(self, inputs):
+        self.inputs = inputs
+        self.pending = collections.deque()
+        self.done = threading.Event()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+
+    def _run(self):
+        for _ in range(self.inputs):
+            time.sleep(random.uniform(0.005, 0.050))
+            self.pending.append(time.time())
+            glfw.core.glfwPostEmptyEvent()
+        self.done.set()
+
+    def start(self):
+        self._thread.start()
+
+    def join(self):
+        self._thread.join()
+
+    def drain(self):
+        stamps = []
+        while self.pending:
+            stamps.append(self.pending.popleft())
+        return stamps
+
+
+def render(load):
+    gl.clear(gl.COLOR_BUFFER_BIT)
+    time.sleep(load)
+
+
+def single_threaded(win, inputs, load):
+    '''Renders, swaps and polls events on the main thread'''
+    handled, rendered = [], []
+    injector = Injector(inputs)
+    glfw.make_context_current(win)
+    injector.start()
+    while not injector.done.is_set() or injector.pending:
+        render(load)
+        glfw.swap_buffers(win)
+        glfw.poll_events()
+        now = time.time()
+        stamps = injector.drain()
+        handled.extend(now - stamp for stamp in stamps)
+        # The next frame starts immediately
+        rendered.extend(now - stamp for stamp in stamps)
+    injector.join()
+    glfw.make_context_current(glfw.ffi.NULL)
+    return handled, rendered
+
+
+class LatencyRenderThread(glfw.RenderThread):
+    '''Forwards injected inputs to the render thread as they are handled'''
+
+    def __init__(self, win, injector, load):
+        super(LatencyRenderThread, self).__init__(win, self.render_frame, swap_interval=0)
+        self.injector = injector
+        self.load = load
+        self.handled = []
+        self.rendered = []
+
+    def process_commands(self):
+        now = time.time()
+        for stamp in self.injector.drain():
+            self.handled.append(now - stamp)
+            self.events.put(Event('input', self.window, stamp, ()))
+        return super(LatencyRenderThread, self).process_commands()
+
+    def render_frame(self, thread, events):
+        now = time.time()
+        self.rendered.extend(now - event.time for event in events if event.type == 'input')
+        if self.injector.done.is_set() and not self.injector.pending and len(self.rendered) == self.injector.inputs:
+            self.close()
+        render(self.load)
+
+
+def threaded(win, inputs, load):
+    '''Renders on a RenderThread while the main thread waits for events'''
+    injector = Injector(inputs)
+    thread = LatencyRenderThread(win, injector, load)
+    injector.start()
+    thread.run()
+    injector.join()
+    glfw.set_window_should_close(win, False)
+    return thread.handled, thread.rendered
+
+
+def describe(latencies):
+    latencies = sorted(latencies)
+    if not latencies:
+        return ['-'] * 3
+    mean = sum(latencies) / len(latencies)
+    p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+    return ['{:.1f}'.format(value * 1000) for value in (mean, p95, latencies[-1])]
+
+
+def main(inputs=100, load=30, **kwds):
+    inputs, load = int(inputs), float(load) / 1000
+    if not glfw.init():
+        raise RuntimeError('Could not initialize GLFW')
+    glfw.window_hint(glfw.VISIBLE, False)
+    win = glfw.create_window(320, 240, 'render thread benchmark', monitor=glfw.ffi.NULL, raise_exception=True)
+    glfw.make_context_current(win)
+    glfw.swap_interval(0)
+    glfw.make_context_current(glfw.ffi.NULL)
+    try:
+        results = [
+            ('single thread', ) + single_threaded(win, inputs, load),
+            ('render thread', ) + threaded(win, inputs, load),
+        ]
+    finally:
+        glfw.destroy_window(win)
+
+    print('{} inputs with a {:.0f} ms render load; latency in ms'.format(inputs, load * 1000))
+    row = '{:<16}{:>10}{:>10}{:>10}{:>12}{:>10}{:>10}'
+    print(row.format('loop', 'handled', 'p95', 'max', 'rendered', 'p95', 'max'))
+    for name, handled, rendered in results:
+        print(row.format(name, *(describe(handled) + describe(rendered))))
+
+
+if __name__ == '__main__':
+    from docopt import docopt
+
+    def fix(option):
+        option = option.lstrip('--')  # --optional-arg -> optional-arg
+        option = option.lstrip('<').rstrip('>')  # <positional-arg> -> positional-arg
+        option = option.replace('-', '_')  # hyphen-arg -> method_parameter
+        return option
+
+    options = {fix(k): v for k, v in docopt(__doc__).items()}
+    main(**options)
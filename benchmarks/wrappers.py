@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+'''
+Compares call latency of the generated snake-case wrappers against the
+generic *args wrapper glfw-cffi used previously, and with reused output
+pointers (glfw.configure(reuse_buffers=True))
+
+Functions needing a window are only measured if a hidden window can be
+created.
+
+Usage:
+    wrappers [options]
+
+Options:
+    -h --help                This message
+    -n --number=<number>     Calls per measurement [default: 100000]
+    -r --repeat=<repeat>     Measurements per function (best is kept) [default: 5]
+'''
+from __future__ import absolute_import, division, print_function, unicode_literals  # noqa
+
+import timeit
+
+import glfw
+from glfw import raw
+from glfw.cdef import _get_function_declaration
+
+
+def generic_wrapper(name):
+    '''Recreates the generic wrapper for a snake-case glfw function'''
+    wrapper = getattr(raw.snake, name)
+    declaration = wrapper.__doc__.strip().split('\n')[-1].strip()
+    func_decl = _get_function_declaration(declaration + ';')
+    func = getattr(raw.core, func_decl['func_name'])
+    return raw._wrap_func_generic(raw._ffi, func_decl, func)
+
+
+def measure(func, args, number, repeat):
+    '''Returns the best time per call in nanoseconds'''
+    timer = timeit.Timer(lambda: func(*args))
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e9
+
+
+def main(number=100000, repeat=5, **kwds):
+    number, repeat = int(number), int(repeat)
+    calls = [
+        ('get_time', ()),
+        ('get_version', ()),
+    ]
+    win = glfw.ffi.NULL
+    if glfw.init():
+        glfw.window_hint(glfw.VISIBLE, False)
+        win = glfw.core.create_window(64, 64, b'benchmark', glfw.ffi.NULL, glfw.ffi.NULL)
+    if win != glfw.ffi.NULL:
+        calls.extend([
+            ('get_cursor_pos', (win, )),
+            ('get_key', (win, glfw.KEY_A)),
+            ('window_should_close', (win, )),
+            ('poll_events', ()),
+        ])
+    else:
+        print('Could not create a window, only measuring window-less functions')
+
+    row = '{:<22}{:>16}{:>16}{:>10}{:>16}'
+    print(row.format('function', 'generic (ns)', 'generated (ns)', 'speedup', 'reused (ns)'))
+    for name, args in calls:
+        old = measure(generic_wrapper(name), args, number, repeat)
+        new = measure(getattr(raw.snake, name), args, number, repeat)
+        glfw.configure(reuse_buffers=True)
+        reused = measure(getattr(raw.snake, name), args, number, repeat)
+        glfw.configure(reuse_buffers=False)
+        print(row.format(
+            name, '{:.0f}'.format(old), '{:.0f}'.format(new), '{:.2f}x'.format(old / new), '{:.0f}'.format(reused)
+        ))
+
+    if win != glfw.ffi.NULL:
+        glfw.destroy_window(win)
+    glfw.terminate()
+
+
+if __name__ == '__main__':
+    from docopt import docopt
+
+    def fix(option):
+        option = option.lstrip('--')  # --optional-arg -> optional-arg
+        option = option.lstrip('<').rstrip('>')  # <positional-arg> -> positional-arg
+        option = option.replace('-', '_')  # hyphen-arg -> method_parameter
+        return option
+
+    options = {fix(k): v for k, v in docopt(__doc__).items()}
+    main(**options)
@@ -123,43 +123,13 @@ class Window(object):
 
         Only run this within initialization before running standard window code
         '''
-        # Determine available major/minor compatibility
-        #  This contains init and terminate logic for glfw, so it must be run first
-        ffi = glfw.ffi
-        opengl_version = None
-        versions = [
-            (4, 5), (4, 4), (4, 3), (4, 2), (4, 1), (4, 0),
-            (3, 3), (3, 2), (3, 1), (3, 0),
-            (2, 1), (2, 0),
-            (1, 5), (1, 4), (1, 3), (1, 2), (1, 1), (1, 0),
-        ]
-        farg = ffi.new('char []', bytes(''.encode('utf-8')))
-        title = farg
-
-        if not glfw.core.init():
-            glfw.terminate()
-            raise RuntimeError('Could not initialize GLFW')
-
-        for major, minor in versions:
-            try:
-                glfw.window_hint(glfw.CONTEXT_VERSION_MAJOR, major)
-                glfw.window_hint(glfw.CONTEXT_VERSION_MINOR, minor)
-                glfw.window_hint(glfw.OPENGL_PROFILE, glfw.OPENGL_CORE_PROFILE)
-                glfw.window_hint(glfw.OPENGL_FORWARD_COMPAT, gl.GL_TRUE)
-                glfw.window_hint(glfw.VISIBLE, gl.GL_FALSE)
-                glfw.window_hint(glfw.FOCUSED, gl.GL_FALSE)
-                window = glfw.core.create_window(1, 1, title, ffi.NULL, ffi.NULL)
-                if window != ffi.NULL:
-                    glfw.destroy_window(window)
-                    if opengl_version is None:
-                        opengl_version = (major, minor)
-            except Exception as e:
-                import traceback as tb
-                for line in tb.format_exc(e).split('\n'):
-                    log.error(line)
-
-        glfw.terminate()
-        return opengl_version
+        # Determine the highest core profile version; the result is cached
+        #  in-process and on disk, so this is cheap after the first run
+        info = glfw.probe_context_versions()
+        if info.core is None:
+            raise RuntimeError('Could not create an OpenGL core profile context')
+        log.debug('OpenGL {} ({}: {})'.format(info.version, info.vendor, info.renderer))
+        return info.core
 
     def init(self):
         '''Scene initialization'''
@@ -169,11 +139,10 @@ class Window(object):
         '''Empty scene'''
 
     def loop(self):
-        '''Simplified loop'''
+        '''Renders when the window changes, otherwise waits for events'''
         self.lock.acquire()
-        while not glfw.window_should_close(self.win):
-            self.render()
-            self.handle_buffers_and_events()
+        self.render_loop = glfw.RenderLoop(self.win, self.render)
+        self.render_loop.run()
         self.lock.release()
 
     def handle_buffers_and_events(self):
@@ -198,7 +167,8 @@ class Window(object):
         glfw.core.set_window_iconify_callback(self.win, self.on_window_minimize)
         glfw.core.set_drop_callback(self.win, self.on_file_drag_and_drop)
         glfw.core.set_framebuffer_size_callback(self.win, self.on_framebuffer_resize)
-        glfw.core.set_monitor_callback(self.on_monitor)
+        # Through glfw rather than glfw.core, which keeps monitor information current
+        glfw.set_monitor_callback(self.on_monitor)
 
     @staticmethod
     def cdata_to_pystring(cdata):
@@ -269,7 +239,6 @@ class Window(object):
         log.debug(string)
 
     @staticmethod
-    @glfw.decorators.monitor_callback
     def on_monitor(monitor, event=None):
         '''Handles monitor connect and disconnect'''
         state = 'Connected' if event else 'Disconnected'
@@ -22,61 +22,59 @@ from OpenGL import GL as gl
 def get_opengl_compatibility(logger=None):
     if logger is not None:
         logger.debug("Determining capabilities...")
-    opengl_version = None
     opengl_info = {}
-    versions = [
-        (4, 5), (4, 4), (4, 3), (4, 2), (4, 1), (4, 0),
-        (3, 3), (3, 2), (3, 1), (3, 0),
-        (2, 1), (2, 0),
-        (1, 5), (1, 4), (1, 3), (1, 2), (1, 1), (1, 0),
-    ]
-    farg = ffi.new('char []', bytes(''.encode('utf-8')))
-    title = farg
 
     if not glfw.core.init():
         glfw.terminate()
         raise RuntimeError('Could not initialize GLFW')
 
-    for major, minor in versions:
-        try:
-            glfw.window_hint(glfw.FOCUSED, gl.GL_FALSE)
-            glfw.window_hint(glfw.CONTEXT_VERSION_MAJOR, major)
-            glfw.window_hint(glfw.CONTEXT_VERSION_MINOR, minor)
+    # Finds the highest versions with a handful of hidden windows and
+    #  caches the result
+    info = glfw.probe_context_versions()
+    opengl_version = info.core or info.compat
+    if opengl_version is None:
+        glfw.terminate()
+        return opengl_version
+    if logger is not None:
+        logger.debug('Core profile: {}'.format(info.core))
+        logger.debug('Compatibility profile: {}'.format(info.compat))
+
+    try:
+        major, minor = opengl_version
+        glfw.window_hint(glfw.FOCUSED, gl.GL_FALSE)
+        glfw.window_hint(glfw.CONTEXT_VERSION_MAJOR, major)
+        glfw.window_hint(glfw.CONTEXT_VERSION_MINOR, minor)
+        if info.core is not None:
             glfw.window_hint(glfw.OPENGL_PROFILE, glfw.OPENGL_CORE_PROFILE)
             glfw.window_hint(glfw.OPENGL_FORWARD_COMPAT, gl.GL_TRUE)
-            glfw.window_hint(glfw.VISIBLE, gl.GL_FALSE)
-            window = glfw.core.create_window(1, 1, title, ffi.NULL, ffi.NULL)
-            if window != ffi.NULL:
-                glfw.make_context_current(window)
-                version = '.'.join('{}'.format(v) for v in (major, minor))
-                if logger is not None:
-                    logger.debug('Version "{}" is compatible.'.format(version))
-                if opengl_version is None:
-                    opengl_version = (major, minor)
-                    opengl_info['version'] = gl.get_string(gl.VERSION)
-                    opengl_info['vendor'] = gl.get_string(gl.VENDOR)
-                    opengl_info['renderer'] = gl.get_string(gl.RENDERER)
-                    opengl_info['GLSL'] = gl.get_string(gl.SHADING_LANGUAGE_VERSION)
-
-                    # Display Extension information
-                    if version < (3, 1):
-                        extension_count = gl.glGetIntegerv(gl.EXTENSIONS)
-                        for index in range(extension_count):
-                            extension_string = gl.get_string(gl.EXTENSIONS, index)
-                            opengl_info.setdefault('extensions', []).append(extension_string)
-
-                    # Display GLSL Versions
-                    if version >= (4, 3):
-                        glsl_version_count = gl.glGetIntegerv(gl.NUM_SHADING_LANGUAGE_VERSIONS)
-                        for index in range(glsl_version_count):
-                            glsl_version = gl.get_string(gl.SHADING_LANGUAGE_VERSION, index)
-                            opengl_info.setdefault('glsl_supported', []).append(glsl_version)
-                glfw.destroy_window(window)
-
-        except Exception as e:
-            for line in e.args:
-                line = '{}'.format(line)
-                print('ERROR: ' + line, file=sys.stderr)
+        glfw.window_hint(glfw.VISIBLE, gl.GL_FALSE)
+        window = glfw.create_window(1, 1, '', monitor=ffi.NULL)
+        if window != ffi.NULL:
+            glfw.make_context_current(window)
+            opengl_info['version'] = gl.get_string(gl.VERSION)
+            opengl_info['vendor'] = gl.get_string(gl.VENDOR)
+            opengl_info['renderer'] = gl.get_string(gl.RENDERER)
+            opengl_info['GLSL'] = gl.get_string(gl.SHADING_LANGUAGE_VERSION)
+
+            # Display Extension information
+            if opengl_version < (3, 1):
+                extension_count = gl.glGetIntegerv(gl.EXTENSIONS)
+                for index in range(extension_count):
+                    extension_string = gl.get_string(gl.EXTENSIONS, index)
+                    opengl_info.setdefault('extensions', []).append(extension_string)
+
+            # Display GLSL Versions
+            if opengl_version >= (4, 3):
+                glsl_version_count = gl.glGetIntegerv(gl.NUM_SHADING_LANGUAGE_VERSIONS)
+                for index in range(glsl_version_count):
+                    glsl_version = gl.get_string(gl.SHADING_LANGUAGE_VERSION, index)
+                    opengl_info.setdefault('glsl_supported', []).append(glsl_version)
+            glfw.destroy_window(window)
+
+    except Exception as e:
+        for line in e.args:
+            line = '{}'.format(line)
+            print('ERROR: ' + line, file=sys.stderr)
 
     glfw.terminate()
     return opengl_version
@@ -303,7 +303,7 @@ gl.glBufferData(gl.GL_ELEMENT_ARRAY_BUFFER, indices.flatten(), gl.GL_STATIC_DRAW
 
 # ######################################################################
 # Render
-while not glfw.window_should_close(win):
+def render():
     gl.glClear(gl.GL_COLOR_BUFFER_BIT | gl.GL_DEPTH_BUFFER_BIT)
     gl.glPolygonMode(gl.GL_FRONT_AND_BACK, fills[fill_index])
     gl.glEnable(gl.DEPTH_TEST)
@@ -332,9 +332,10 @@ while not glfw.window_should_close(win):
 
     # Cleanup
     gl.glDisableVertexAttribArray(vao)
-    # Standard Loop Event handling
-    glfw.core.swap_buffers(win)
-    glfw.core.poll_events()
+
+
+# Redraw only after input (e.g. changing the mode) or window changes
+glfw.RenderLoop(win, render).run()
 
 
 # ######################################################################
@@ -192,13 +192,14 @@ def main(**options):
 
     data = [ord(c) for c in text]
 
-    while not glfw.core.window_should_close(win):
+    def render():
         gl.clear(gl.COLOR_BUFFER_BIT)
         # Use the framebuffer height to prevent viewport issues when moving from
         #  LoDPI to HiDPI in a multiple monitor, multiple-dpi display scenario
         on_display(data, fb_height, texid, base)
-        glfw.core.swap_buffers(win)
-        glfw.core.poll_events()
+
+    # The text is static: only redraw after input, resizing or exposure
+    glfw.RenderLoop(win, render).run()
 
     glfw.core.terminate()
 
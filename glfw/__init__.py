@@ -40,3 +40,16 @@ d. in addition, if you believe there can be some benefit in providing
 # import * is preferred.
 from .__metadata__ import *  # noqa
 from .api import *  # noqa
+from .input import InputSnapshot  # noqa
+from .events import EventQueue  # noqa
+from .coalesce import MotionCoalescer  # noqa
+from .probe import ContextInfo, probe_context_versions  # noqa
+from .pool import ContextPool  # noqa
+from .readback import FramebufferReadback  # noqa
+from .recorder import FrameRecorder  # noqa
+from .timing import FrameTimer  # noqa
+from .profiler import GpuProfiler  # noqa
+from .render_thread import RenderThread  # noqa
+from .loop import RenderLoop  # noqa
+from . import joysticks  # noqa
+from .joysticks import set_joystick_callback  # noqa
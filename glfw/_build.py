@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+'''
+cffi build script for the optional, compiled (API mode) glfw extension.
+
+By default, glfw-cffi parses glfw3.h and dlopens the library every time
+the package is imported (ABI mode).  Building this extension ahead of
+time moves the header parsing into the build and lets cffi generate
+real C stubs for every glfw function.  When ``glfw._glfw_cffi`` exists,
+``glfw.raw`` prefers it and falls back to ABI mode otherwise.
+
+Usage:
+
+    $ GLFW_CFFI_COMPILE=1 pip install .   # build while installing
+    $ python glfw/_build.py               # build in-place (development)
+
+Environment:
+
+    GLFW_LIBRARY: path to the glfw library binary
+    GLFW_INCLUDE: folder containing GLFW/glfw3.h
+
+Note:  This file is executed directly by cffi and setup.py, so it must
+not import the glfw package (importing glfw initializes the library).
+'''
+from __future__ import absolute_import, division, print_function, unicode_literals  # noqa
+
+import imp
+import os
+import sys
+
+from cffi import FFI
+
+module_name = 'glfw._glfw_cffi'
+package_path = os.path.dirname(os.path.abspath(__file__))
+cdef = imp.load_source('_glfw_cffi_cdef', os.path.join(package_path, 'cdef.py'))
+event_source = imp.load_source('_glfw_cffi_event_source', os.path.join(package_path, '_event_source.py'))
+
+
+def _find_header():
+    '''Finds a glfw3.h to compile against
+
+    Falls back to the header packaged with glfw-cffi.
+
+    Returns:
+        str: path to glfw3.h
+    '''
+    include_paths = []
+    if os.environ.get('GLFW_INCLUDE'):
+        include_paths.append(os.environ['GLFW_INCLUDE'].strip('"'))
+    if os.environ.get('GLFW_LIBRARY'):
+        library_path = os.path.dirname(os.path.abspath(os.environ['GLFW_LIBRARY'].strip('"')))
+        include_paths.append(os.path.join(library_path, 'include'))
+        include_paths.append(os.path.join(os.path.dirname(library_path), 'include'))
+    include_paths.extend([
+        '/usr/local/include',
+        '/usr/include',
+        '/opt/local/include',
+        '/opt/homebrew/include',
+    ])
+    for include_path in include_paths:
+        header_path = os.path.join(include_path, 'GLFW', 'glfw3.h')
+        if os.path.isfile(header_path):
+            return os.path.abspath(header_path)
+    return os.path.join(package_path, 'glfw3.h')
+
+
+def _link_options():
+    '''Linker options for the glfw library
+
+    Returns:
+        dict: keyword arguments for FFI.set_source
+    '''
+    library_path = os.environ.get('GLFW_LIBRARY', '').strip('"')
+    if not library_path:
+        libraries = ['glfw3'] if sys.platform.startswith('win') else ['glfw']
+        return {'libraries': libraries}
+    library_path = os.path.abspath(library_path)
+    library_folder, library_name = os.path.split(library_path)
+    library_name = library_name.split('.')[0]
+    if library_name.startswith('lib'):
+        library_name = library_name[len('lib'):]
+    options = {
+        'libraries': [library_name],
+        'library_dirs': [library_folder],
+    }
+    if not sys.platform.startswith('win'):
+        options['runtime_library_dirs'] = [library_folder]
+    return options
+
+
+def _c_string(text):
+    '''Converts python text into a C string literal'''
+    lines = text.replace('\\', '\\\\').replace('"', '\\"').split('\n')
+    lines = ['{}\\n'.format(line) for line in lines[:-1]] + lines[-1:]
+    return '\n'.join('"{}"'.format(line) for line in lines)
+
+
+# Batched input polling used by glfw.InputSnapshot
+_batch_source = '''
+static void _glfw_cffi_get_keys(GLFWwindow *window, const int *keys, unsigned char *states, int count) {{
+    int index;
+    for (index = 0; index < count; index++)
+        states[index] = (unsigned char) glfwGetKey(window, keys[index]);
+}}
+
+static void _glfw_cffi_get_mouse_buttons(GLFWwindow *window, const int *buttons, unsigned char *states, int count) {{
+    int index;
+    for (index = 0; index < count; index++)
+        states[index] = (unsigned char) glfwGetMouseButton(window, buttons[index]);
+}}
+'''
+
+
+def build_ffi():
+    '''Creates the FFI builder for the compiled extension
+
+    The extension embeds the path of the header it was compiled against
+    and the glfw function declarations found within it so that
+    ``glfw.raw`` never needs to read the header at import.
+
+    Returns:
+        cffi.FFI: ffi builder with cdef and source set
+    '''
+    header_path = _find_header()
+    with open(header_path, 'r') as fd:
+        source = cdef._fix_source(fd.read())
+    declarations = [
+        line
+        for line in source.split('\n')
+        if cdef._get_function_declaration(line)
+    ]
+    ffibuilder = FFI()
+    ffibuilder.cdef(source)
+    ffibuilder.cdef(event_source._event_cdef)
+    ffibuilder.cdef(event_source._get_event_callback_cdef())
+    ffibuilder.cdef(event_source._motion_cdef)
+    ffibuilder.cdef(event_source._motion_callback_cdef)
+    ffibuilder.cdef('''
+        static char *const _glfw_cffi_header_path;
+        static char *const _glfw_cffi_declarations;
+        void _glfw_cffi_get_keys(GLFWwindow *window, const int *keys, unsigned char *states, int count);
+        void _glfw_cffi_get_mouse_buttons(GLFWwindow *window, const int *buttons, unsigned char *states, int count);
+    ''')
+    c_source = '\n'.join((
+        '#include <stdint.h>',
+        '#include <string.h>',
+        '#include "{header}"',
+        'static char *const _glfw_cffi_header_path = {header_string};',
+        'static char *const _glfw_cffi_declarations =\n{declarations};',
+        _batch_source,
+        event_source._event_cdef.replace('{', '{{').replace('}', '}}'),
+        event_source._get_event_callback_source().replace('{', '{{').replace('}', '}}'),
+        event_source._motion_cdef.replace('{', '{{').replace('}', '}}'),
+        event_source._motion_callback_source.replace('{', '{{').replace('}', '}}'),
+    )).format(
+        header=header_path.replace('\\', '/'),
+        header_string=_c_string(header_path),
+        declarations=_c_string('\n'.join(declarations)),
+    )
+    ffibuilder.set_source(module_name, c_source, **_link_options())
+    return ffibuilder
+
+
+if __name__ == '__main__':
+    # Builds the extension in-place, next to this file
+    build_ffi().compile(tmpdir=os.path.dirname(package_path), verbose=True)
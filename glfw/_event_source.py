@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+# C declarations and source for the event queue and motion coalescing
+# callbacks of the compiled extension (see events.py and coalesce.py).  These
+# have no side-effects so they may be used outside of the package import
+# (e.g. by the cffi build script in _build.py).
+from __future__ import absolute_import, division, print_function, unicode_literals  # noqa
+
+
+###############################################################################
+# Event queue:  fixed-size event records written by glfw callbacks
+###############################################################################
+# (event type, id, callback arguments after the window)
+_event_types = (
+    ('key', 1, ('int key', 'int scancode', 'int action', 'int mods')),
+    ('char', 2, ('unsigned int codepoint', )),
+    ('mouse_button', 3, ('int button', 'int action', 'int mods')),
+    ('cursor_pos', 4, ('double xpos', 'double ypos')),
+    ('cursor_enter', 5, ('int entered', )),
+    ('scroll', 6, ('double xoffset', 'double yoffset')),
+    ('window_pos', 7, ('int xpos', 'int ypos')),
+    ('window_size', 8, ('int width', 'int height')),
+    ('framebuffer_size', 9, ('int width', 'int height')),
+    ('window_close', 10, ()),
+    ('window_focus', 11, ('int focused', )),
+    ('window_iconify', 12, ('int iconified', )),
+    ('window_refresh', 13, ()),
+)
+
+_event_cdef = '''
+typedef struct {
+    double time;
+    unsigned long long window;
+    double doubles[2];
+    int type;
+    int ints[4];
+} glfw_cffi_event;
+
+typedef struct {
+    glfw_cffi_event *events;
+    unsigned int capacity;
+    unsigned int count;
+    unsigned long long dropped;
+} glfw_cffi_event_queue;
+'''
+
+
+def _get_event_callback_name(name):
+    '''Returns the name of the C callback queueing an event type'''
+    return '_glfw_cffi_queue_{}'.format(name)
+
+
+def _get_event_callback_cdef():
+    '''Declarations of the C functions used by the compiled event queue'''
+    lines = ['void _glfw_cffi_set_event_queue(glfw_cffi_event_queue *queue);']
+    for name, _, args in _event_types:
+        lines.append('void {}({});'.format(_get_event_callback_name(name), ', '.join(('GLFWwindow *window', ) + args)))
+    return '\n'.join(lines)
+
+
+def _get_event_callback_source():
+    '''C source for the compiled event queue
+
+    Each callback copies its arguments into the next record of the
+    attached queue; no python code runs per event.
+    '''
+    lines = [
+        'static glfw_cffi_event_queue *_glfw_cffi_event_queue = NULL;',
+        '',
+        'static void _glfw_cffi_set_event_queue(glfw_cffi_event_queue *queue) {',
+        '    _glfw_cffi_event_queue = queue;',
+        '}',
+        '',
+        'static glfw_cffi_event *_glfw_cffi_next_event(GLFWwindow *window, int type) {',
+        '    glfw_cffi_event_queue *queue = _glfw_cffi_event_queue;',
+        '    glfw_cffi_event *event;',
+        '    if (queue == NULL) return NULL;',
+        '    if (queue->count >= queue->capacity) {',
+        '        queue->dropped++;',
+        '        return NULL;',
+        '    }',
+        '    event = &queue->events[queue->count++];',
+        '    memset(event, 0, sizeof(glfw_cffi_event));',
+        '    event->time = glfwGetTime();',
+        '    event->window = (unsigned long long) (uintptr_t) window;',
+        '    event->type = type;',
+        '    return event;',
+        '}',
+    ]
+    for name, event_type, args in _event_types:
+        lines.extend([
+            '',
+            'static void {}({}) {{'.format(_get_event_callback_name(name), ', '.join(('GLFWwindow *window', ) + args)),
+            '    glfw_cffi_event *event = _glfw_cffi_next_event(window, {});'.format(event_type),
+            '    if (event == NULL) return;',
+        ])
+        ints = doubles = 0
+        for arg in args:
+            arg_name = arg.split(' ')[-1]
+            if arg.startswith('double'):
+                lines.append('    event->doubles[{}] = {};'.format(doubles, arg_name))
+                doubles += 1
+            else:
+                lines.append('    event->ints[{}] = (int) {};'.format(ints, arg_name))
+                ints += 1
+        lines.append('}')
+    return '\n'.join(lines)
+
+
+###############################################################################
+# Motion coalescing:  latest cursor position and summed scroll per window
+###############################################################################
+_motion_cdef = '''
+typedef struct {
+    unsigned long long window;
+    double xpos;
+    double ypos;
+    double xoffset;
+    double yoffset;
+    unsigned int cursor_events;
+    unsigned int scroll_events;
+} glfw_cffi_motion;
+
+typedef struct {
+    glfw_cffi_motion *windows;
+    unsigned int count;
+} glfw_cffi_motion_table;
+'''
+
+_motion_callback_cdef = '''
+void _glfw_cffi_set_motion_table(glfw_cffi_motion_table *table);
+void _glfw_cffi_coalesce_cursor_pos(GLFWwindow *window, double xpos, double ypos);
+void _glfw_cffi_coalesce_scroll(GLFWwindow *window, double xoffset, double yoffset);
+'''
+
+_motion_callback_source = '''
+static glfw_cffi_motion_table *_glfw_cffi_motion_table = NULL;
+
+static void _glfw_cffi_set_motion_table(glfw_cffi_motion_table *table) {
+    _glfw_cffi_motion_table = table;
+}
+
+static glfw_cffi_motion *_glfw_cffi_find_motion(GLFWwindow *window) {
+    glfw_cffi_motion_table *table = _glfw_cffi_motion_table;
+    unsigned long long id = (unsigned long long) (uintptr_t) window;
+    unsigned int index;
+    if (table == NULL) return NULL;
+    for (index = 0; index < table->count; index++)
+        if (table->windows[index].window == id) return &table->windows[index];
+    return NULL;
+}
+
+static void _glfw_cffi_coalesce_cursor_pos(GLFWwindow *window, double xpos, double ypos) {
+    glfw_cffi_motion *motion = _glfw_cffi_find_motion(window);
+    if (motion == NULL) return;
+    motion->xpos = xpos;
+    motion->ypos = ypos;
+    motion->cursor_events++;
+}
+
+static void _glfw_cffi_coalesce_scroll(GLFWwindow *window, double xoffset, double yoffset) {
+    glfw_cffi_motion *motion = _glfw_cffi_find_motion(window);
+    if (motion == NULL) return;
+    motion->xoffset += xoffset;
+    motion->yoffset += yoffset;
+    motion->scroll_events++;
+}
+'''
@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+'''
+Cooperative glfw event processing within an asyncio event loop
+
+The event loop returned by new_event_loop() waits for glfw events in
+glfwWaitEventsTimeout instead of blocking in select().  asyncio already
+derives the timeout of every wait from its next scheduled callback, so
+timers fire on time while an idle loop sleeps within glfw and uses no
+CPU.  Sockets, pipes and call_soon_threadsafe() (which writes to the
+loop's self-pipe) are watched by a helper thread which wakes the glfw
+wait with glfwPostEmptyEvent; other threads may also call wake()
+directly.
+
+Usage:
+
+    >>> import glfw.aio
+    >>> async def main(win):
+    ...     async for event in glfw.aio.events(win):
+    ...         if event.type == 'key':
+    ...             key, scancode, action, mods = event.args
+    ...         elif event.type == 'window_close':
+    ...             break
+    >>> glfw.aio.run(main(win))
+
+Each event has the fields:
+
+    type(str): event type name (e.g. 'key', 'cursor_pos')
+    window(ffi.CData): window handle
+    time(float): glfw.get_time() when the event was received
+    args(tuple): arguments of the glfw callback after the window
+
+Glfw requires events to be processed on the main thread, so the loop
+must run on the main thread.  Callbacks set with glfw.decorators run
+while the loop waits, as they would within glfw.wait_events().
+
+Python 3.5 or newer is required; this module is not imported by the
+glfw package.
+'''
+from __future__ import absolute_import, division, print_function, unicode_literals  # noqa
+
+import asyncio
+import collections
+import selectors
+import socket
+import threading
+
+from . import raw
+from .events import Event, _check_types, _get_setter, _set_callbacks
+
+
+def wake():
+    '''Wakes the loop waiting for glfw events; safe to call from any thread'''
+    raw._glfw.glfwPostEmptyEvent()
+
+
+class GlfwSelector(selectors.BaseSelector):
+    '''Selector waiting for glfw events while a helper thread watches files
+
+    Args:
+        selector(selectors.BaseSelector): selector holding the registered
+            files [default: selectors.DefaultSelector()]
+
+    Attributes:
+        counters(dict): waits within glfw, wakes posted by the helper
+            thread, and selects answered without waiting
+    '''
+
+    def __init__(self, selector=None):
+        self._selector = selector or selectors.DefaultSelector()
+        # Interrupts the helper thread once glfw stops waiting
+        self._interrupt, self._interrupter = socket.socketpair()
+        self._interrupt.setblocking(False)
+        self._interrupter.setblocking(False)
+        self._selector.register(self._interrupt, selectors.EVENT_READ)
+        self._condition = threading.Condition()
+        self._request = None
+        self._result = None
+        self._closed = False
+        self._thread = None
+        self.counters = {
+            'waits': 0,
+            'wakes': 0,
+            'polls': 0,
+        }
+
+    def register(self, fileobj, events, data=None):
+        return self._selector.register(fileobj, events, data)
+
+    def unregister(self, fileobj):
+        return self._selector.unregister(fileobj)
+
+    def modify(self, fileobj, events, data=None):
+        return self._selector.modify(fileobj, events, data)
+
+    def get_map(self):
+        return self._selector.get_map()
+
+    def _ready(self, timeout):
+        '''Returns the ready files, leaving out the interrupt socket'''
+        ready = self._selector.select(timeout)
+        return [(key, events) for key, events in ready if key.fileobj is not self._interrupt]
+
+    def _drain_interrupt(self):
+        try:
+            while self._interrupt.recv(4096):
+                pass
+        except (BlockingIOError, InterruptedError):
+            pass
+
+    def _watch(self):
+        '''Helper thread: waits on files for each request of select()'''
+        condition = self._condition
+        while True:
+            with condition:
+                while self._request is None and not self._closed:
+                    condition.wait()
+                if self._closed:
+                    return
+                timeout, self._request = self._request[0], None
+            ready = self._ready(timeout)
+            if ready:
+                self.counters['wakes'] += 1
+                wake()
+            with condition:
+                self._result = ready
+                condition.notify_all()
+
+    def select(self, timeout=None):
+        '''Processes glfw events until a file is ready or timeout expires'''
+        ready = self._ready(0)
+        if ready or (timeout is not None and timeout <= 0):
+            self.counters['polls'] += 1
+            raw._glfw.glfwPollEvents()
+            return ready
+
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._watch, name='glfw-aio-selector')
+            self._thread.daemon = True
+            self._thread.start()
+        with self._condition:
+            self._result = None
+            self._request = (timeout, )
+            self._condition.notify_all()
+
+        self.counters['waits'] += 1
+        if timeout is None:
+            raw._glfw.glfwWaitEvents()
+        else:
+            raw._glfw.glfwWaitEventsTimeout(timeout)
+
+        # Stop the helper thread waiting, then collect what it found
+        try:
+            self._interrupter.send(b'\0')
+        except (BlockingIOError, InterruptedError):
+            pass
+        with self._condition:
+            while self._result is None:
+                self._condition.wait()
+            ready, self._result = self._result, None
+        self._drain_interrupt()
+        return ready
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        try:
+            self._interrupter.send(b'\0')
+        except (BlockingIOError, InterruptedError):
+            pass
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._selector.unregister(self._interrupt)
+        self._selector.close()
+        self._interrupt.close()
+        self._interrupter.close()
+
+
+class GlfwEventLoop(asyncio.SelectorEventLoop):
+    '''asyncio event loop processing glfw events while it waits
+
+    Args:
+        selector(GlfwSelector): [default: GlfwSelector()]
+    '''
+
+    def __init__(self, selector=None):
+        raw._ensure_init()
+        super(GlfwEventLoop, self).__init__(selector or GlfwSelector())
+
+    @property
+    def counters(self):
+        '''dict: counters of the selector (see GlfwSelector)'''
+        return self._selector.counters
+
+
+def new_event_loop():
+    '''Returns a new GlfwEventLoop'''
+    return GlfwEventLoop()
+
+
+def run(coroutine):
+    '''Runs a coroutine to completion within a new GlfwEventLoop
+
+    Returns:
+        the result of the coroutine
+    '''
+    loop = new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        if hasattr(loop, 'shutdown_asyncgens'):  # python 3.6+
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+
+
+class WindowEvents(object):
+    '''Asynchronous iterator over the events of a window
+
+    Sets the glfw callbacks of the event types, replacing any callbacks
+    already set.  Iteration ends after the window_close event has been
+    delivered, or once close() is called.
+
+    Args:
+        window(ffi.CData): window handle
+        types(list): event type names (e.g. ['key', 'cursor_pos'])
+            [default: all]
+        maxlen(int): events kept while the consumer falls behind; the
+            oldest events are dropped beyond it [default: unbounded]
+
+    Attributes:
+        dropped(int): events dropped because maxlen was reached
+    '''
+
+    def __init__(self, window, types=None, maxlen=None):
+        types = _check_types(types)
+        self.window = window
+        self.types = types
+        self.dropped = 0
+        self._events = collections.deque(maxlen=maxlen)
+        self._waiter = None
+        self._closed = False
+        self._callbacks, _ = _set_callbacks(window, types, self._get_handler)
+
+    def _get_handler(self, name):
+        events = self._events
+        get_time = raw._glfw.glfwGetTime
+
+        def handler(window, *args):
+            if len(events) == events.maxlen:
+                self.dropped += 1
+            events.append(Event(name, window, get_time(), args))
+            waiter = self._waiter
+            if waiter is not None and not waiter.done():
+                waiter.set_result(None)
+
+        return handler
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while not self._events:
+            if self._closed:
+                raise StopAsyncIteration
+            self._waiter = asyncio.get_event_loop().create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+        event = self._events.popleft()
+        if event.type == 'window_close':
+            self.close()
+        return event
+
+    def close(self):
+        '''Unsets the callbacks; iteration ends once queued events are consumed'''
+        if self._closed:
+            return
+        self._closed = True
+        for name in self._callbacks:
+            _get_setter(name)(self.window, raw._ffi.NULL)
+        waiter = self._waiter
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    def __repr__(self):
+        cname = self.__class__.__name__
+        string = '<{cname} queued={queued} dropped={dropped}>'
+        return string.format(cname=cname, queued=len(self._events), dropped=self.dropped)
+
+
+def events(window, types=None, maxlen=None):
+    '''Returns an asynchronous iterator over the events of a window
+
+    See WindowEvents.
+    '''
+    return WindowEvents(window, types=types, maxlen=maxlen)
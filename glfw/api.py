@@ -10,7 +10,8 @@ from collections import namedtuple
 # functions as desired within api but still retain the original api if
 # really necessary
 from . import raw
-from .raw import core, decorators, gl, header_path, snake  # noqa
+from .raw import configure, core, decorators, gl, header_path, invalidate_cache, snake  # noqa
+from .input import _numpy
 
 # Add snake-case python-friendly functions to local globals
 for k, v in snake.__dict__.items():
@@ -34,6 +35,59 @@ def get_include():
     return include_path
 
 
+def _resolve_monitor(monitor):
+    '''Returns the monitor handle for create_window's monitor argument
+
+    Monitors are only enumerated when monitor is an index or a name.
+    '''
+    if monitor is None:
+        return _monitors.primary()
+    if isinstance(monitor, Monitor):
+        return monitor.handle
+    if isinstance(monitor, int):
+        # monitor is an index
+        handles = _monitors.handles()
+        if monitor < len(handles):
+            return handles[monitor] or raw._ffi.NULL
+        return monitor
+    if isinstance(monitor, (str, bytes)):
+        # monitor is the name of a monitor
+        if monitor.lower() == 'primary':
+            return _monitors.primary()
+        # Pick the first one on multiple matches
+        for handle in _monitors.handles():
+            if _monitors.monitor(handle).name == monitor:
+                return handle
+        return raw._ffi.NULL
+    return monitor
+
+
+def _resolve_size(width, height):
+    '''Defaults width and height to the resolution of the primary monitor'''
+    if width is None or height is None:
+        resolution = _monitors.attribute(_monitors.primary(), 'resolution', _get_video_mode)
+        width = resolution.width if width is None else width
+        height = resolution.height if height is None else height
+    return width, height
+
+
+def _create_window(width, height, title, monitor, context, raise_exception):
+    '''Creates a window from resolved arguments'''
+    title = b"Untitled" if title is None else title
+    win = raw_glfw.glfwCreateWindow(width, height, string_ffi(title), monitor, context)
+    if win == raw._ffi.NULL and raise_exception:
+        win = None
+        args = {
+            'width': width,
+            'height': height,
+            'title': ffi_string(title),
+            'monitor': monitor,
+            'share': context,
+        }
+        raise RuntimeError('Could not create window with args: {}'.format(args))
+    return win
+
+
 def create_window(width=None, height=None, title=None, monitor=None, context=None, raise_exception=False):
     '''Creates a window
 
@@ -51,65 +105,166 @@ def create_window(width=None, height=None, title=None, monitor=None, context=Non
         height(int): Height of the window [defaults to monitor height]
         title(str): Name of the window [default: Untitled]
         monitor: monitor or monitor handle [default: primary monitor]
+            Use ffi.NULL for a windowed (not full-screen) window.
         context: shared context
 
     Returns:
         ffi.CData: window handle
     '''
-    primary_monitor = core.get_primary_monitor()
-    modes = core.get_video_mode(primary_monitor)[0]
-    width = modes.width if width is None else width
-    height = modes.height if height is None else height
-    title = b"Untitled" if title is None else title
-    monitors = get_monitors()
-
-    if isinstance(monitor, Monitor):
-        monitor = monitor.handle
-    elif isinstance(monitor, int) and monitor < len(monitors):
-        # monitor is an index
-        monitor = monitors[monitor].handle or raw._ffi.NULL
-    elif isinstance(monitor, (str, bytes)):
-        # monitor is the name of a monitor
-        if monitor.lower() == 'primary':
-            monitor = primary_monitor
-        else:
-            monitor_matches = [m for m in monitors if m.name == monitor]
-            # Pick the first one on multiple matches
-            for monitor in monitor_matches:
-                monitor = monitor.handle
-                break
-            if not isinstance(monitor, raw._ffi.CData):
-                monitor = raw._ffi.NULL
-    if monitor is None:
-        monitor = primary_monitor
-    if context is None:
-        context = raw._ffi.NULL
-    args = (
-        width,
-        height,
-        string_ffi(title),
-        monitor or raw._ffi.NULL,
-        context or raw._ffi.NULL
-    )
-    win = core.create_window(*args)
-    if win == raw._ffi.NULL and raise_exception:
-        win = None
-        args = {
-            'width': width,
-            'height': height,
-            'title': ffi_string(title),
-            'monitor': monitor,
-            'share': context,
-        }
-        raise RuntimeError('Could not create window with args: {}'.format(args))
+    raw._ensure_init()
+    monitor = _resolve_monitor(monitor) or raw._ffi.NULL
+    width, height = _resolve_size(width, height)
+    context = context or raw._ffi.NULL
+    win = _create_window(width, height, title, monitor, context, raise_exception)
+    if monitor != raw._ffi.NULL:
+        # Full-screen windows may change the video mode of the monitor
+        _monitors.invalidate()
     return win
 
 
+def create_windows(specs, monitor=None, context=None, hints=None, raise_exception=False):
+    '''Creates many windows sharing one monitor and context configuration
+
+    The monitor, context and window hints are resolved once for all of
+    the windows rather than once per window.
+
+    Args:
+        specs(list): a dict with width, height and title (each optional)
+            or a (width, height[, title]) tuple per window
+        monitor: monitor for every window; see create_window
+        context: shared context for every window
+        hints(dict): window hints set once before creating the windows
+            (e.g. {glfw.VISIBLE: False}); every hint is reset to its
+            default afterwards
+        raise_exception(bool): raise a RuntimeError when a window cannot
+            be created; windows created so far are destroyed
+
+    Returns:
+        list: window handles (ffi.NULL for windows that failed)
+    '''
+    raw._ensure_init()
+    monitor = _resolve_monitor(monitor) or raw._ffi.NULL
+    context = context or raw._ffi.NULL
+    for hint, value in (hints or {}).items():
+        raw_glfw.glfwWindowHint(hint, value)
+    windows = []
+    try:
+        for spec in specs:
+            if not isinstance(spec, dict):
+                spec = dict(zip(('width', 'height', 'title'), spec))
+            width, height = _resolve_size(spec.get('width'), spec.get('height'))
+            windows.append(_create_window(width, height, spec.get('title'), monitor, context, raise_exception))
+    except RuntimeError:
+        for win in windows:
+            raw_glfw.glfwDestroyWindow(win)
+        raise
+    finally:
+        if hints:
+            # Hints would otherwise apply to every later window
+            raw_glfw.glfwDefaultWindowHints()
+        if monitor != raw._ffi.NULL:
+            _monitors.invalidate()
+    return windows
+
+
 Resolution = namedtuple('Resolution', ('width', 'height'))
 Position = namedtuple('Position', ('x', 'y'))
 Size = namedtuple('Size', ('width', 'height'))
 
 
+class _MonitorRegistry(object):
+    '''Caches monitor handles, attributes and Monitor instances
+
+    glfw reports connected and disconnected monitors through the monitor
+    callback, so the registry installs one (see set_monitor_callback) and
+    drops its cache whenever it fires.  The cache is also dropped when glfw
+    is re-initialized or a full-screen window may have changed a video mode.
+    '''
+
+    def __init__(self):
+        self._generation = None
+        self._handles = None
+        self._primary = None
+        self._monitors = {}
+        self._attributes = {}
+        self.user_callback = None
+        self._callback = decorators.monitor_callback(self._on_monitor)
+
+    def _on_monitor(self, handle, event):
+        self.invalidate()
+        if event == snake.DISCONNECTED:
+            self._monitors.pop(handle, None)
+        if self.user_callback is not None:
+            self.user_callback(handle, event)
+
+    def _check(self):
+        '''Resets the registry the first time it is used after glfw init'''
+        if self._generation != raw._init_count[0]:
+            raw._ensure_init()
+            self._generation = raw._init_count[0]
+            self._monitors = {}
+            self.invalidate()
+            raw_glfw.glfwSetMonitorCallback(self._callback)
+
+    def invalidate(self):
+        '''Drops cached handles and attributes'''
+        self._handles = None
+        self._primary = None
+        self._attributes = {}
+
+    def handles(self):
+        '''Returns the handles of connected monitors'''
+        self._check()
+        if self._handles is None:
+            count = ffi.new('int *')
+            handles = raw_glfw.glfwGetMonitors(count)
+            self._handles = tuple(handles[index] for index in range(count[0]))
+        return self._handles
+
+    def primary(self):
+        '''Returns the handle of the primary monitor'''
+        self._check()
+        if self._primary is None:
+            self._primary = raw_glfw.glfwGetPrimaryMonitor()
+        return self._primary
+
+    def attribute(self, handle, name, getter):
+        '''Returns a cached monitor attribute, calling getter on a miss'''
+        self._check()
+        key = (handle, name)
+        try:
+            return self._attributes[key]
+        except KeyError:
+            value = self._attributes[key] = getter(handle)
+            return value
+
+    def monitor(self, handle):
+        '''Returns the Monitor instance for a handle'''
+        self._check()
+        monitor = self._monitors.get(handle)
+        if monitor is None:
+            monitor = self._monitors[handle] = Monitor(handle)
+        return monitor
+
+
+_monitors = _MonitorRegistry()
+
+
+def _get_video_mode(handle):
+    mode = snake.get_video_mode(handle)[0]
+    return Resolution(mode.width, mode.height)
+
+
+def _get_monitor_pos(handle):
+    position = snake.get_monitor_pos(handle)
+    return Position(position[0], position[1])
+
+
+def _get_monitor_physical_size(handle):
+    size = snake.get_monitor_physical_size(handle)
+    return Size(size[0], size[1])
+
+
 class Monitor(object):
     '''Python wrapper for GLFW Monitor
 
@@ -119,22 +274,22 @@ class Monitor(object):
     referencing individual properties.  So this particular data
     structure is meant to be referenced but not created.
 
+    Properties are cached until glfw reports a monitor being connected
+    or disconnected.
+
     Args:
         handle(cffi.cdata): Monitor handle provided by the GLFW api
     '''
 
     def __init__(self, handle=None):
-        core.init()
+        raw._ensure_init()
         if handle is None:
-            handle = snake.get_primary_monitor()
+            handle = _monitors.primary()
         self.handle = handle
 
     @property
     def connected(self):
-        count = ffi.new('int *')
-        monitor_list = core.get_monitors(count)
-        monitor_list = [monitor_list[index] for index in range(count[0])]
-        return self.handle in monitor_list
+        return self.handle in _monitors.handles()
 
     @property
     def height(self):
@@ -144,30 +299,28 @@ class Monitor(object):
     def name(self):
         name = None
         if self.connected:
-            name = snake.get_monitor_name(self.handle)
+            name = _monitors.attribute(self.handle, 'name', snake.get_monitor_name)
         return name
 
     @property
     def position(self):
         position = Position(None, None)
         if self.connected:
-            position = snake.get_monitor_pos(self.handle)
-            position = Position(position[0], position[1])
+            position = _monitors.attribute(self.handle, 'position', _get_monitor_pos)
         return position
 
     @property
     def primary(self):
         primary = None
         if self.connected:
-            primary = True if snake.get_primary_monitor() == self.handle else False
+            primary = _monitors.primary() == self.handle
         return primary
 
     @property
     def resolution(self):
         resolution = Resolution(None, None)
         if self.connected:
-            modes = snake.get_video_mode(self.handle)
-            resolution = Resolution(modes[0].width, modes[0].height)
+            resolution = _monitors.attribute(self.handle, 'resolution', _get_video_mode)
         return resolution
 
     @property
@@ -178,8 +331,7 @@ class Monitor(object):
     def size(self):
         size = Size(None, None)
         if self.connected:
-            size = snake.get_monitor_physical_size(self.handle)
-            size = Size(size[0], size[1])
+            size = _monitors.attribute(self.handle, 'size', _get_monitor_physical_size)
         return size
 
     @property
@@ -197,14 +349,69 @@ class Monitor(object):
 
 
 def get_monitors():
-    '''Returns monitors connected'''
-    count = raw._ffi.new('int *')
-    monitors = []
-    _monitors = snake.get_monitors(count)
-    for index in range(count[0]):
-        monitor = Monitor(_monitors[index])
-        monitors.append(monitor)
-    return monitors
+    '''Returns monitors connected
+
+    The same Monitor instance is returned for a monitor until it is
+    disconnected.
+    '''
+    return [_monitors.monitor(handle) for handle in _monitors.handles()]
+
+
+def set_monitor_callback(cbfun):
+    '''Sets the monitor configuration callback
+
+    glfw-cffi keeps its own monitor callback installed to keep Monitor
+    information current, and calls cbfun from it.
+
+    Args:
+        cbfun: callback taking (monitor, event) or None to remove it
+
+    Returns:
+        the previous callback or None
+    '''
+    _monitors._check()
+    previous, _monitors.user_callback = _monitors.user_callback, cbfun
+    return previous
+
+
+def _set_core_monitor_callback(cbfun):
+    '''Sets the monitor callback for glfw.core through the monitor registry
+
+    Replacing the registry's callback would leave cached Monitor
+    information stale after monitors are connected or disconnected.
+
+    Args:
+        cbfun: ffi.callback taking (monitor, event), or ffi.NULL
+
+    Returns:
+        the previous callback or ffi.NULL
+    '''
+    previous = set_monitor_callback(None if cbfun is None or cbfun == ffi.NULL else cbfun)
+    return ffi.NULL if previous is None else previous
+
+
+core.set_monitor_callback = core.glfwSetMonitorCallback = _set_core_monitor_callback
+snake.set_monitor_callback = set_monitor_callback
+
+
+def destroy_window(window):
+    '''Destroys a window
+
+    A full-screen window restores the video mode of its monitor, so
+    cached monitor information is dropped.
+    '''
+    snake.destroy_window(window)
+    _monitors.invalidate()
+
+
+def set_window_monitor(window, monitor, xpos, ypos, width, height, refresh_rate):
+    '''Sets the mode, monitor, video mode and placement of a window
+
+    Making a window full screen (or windowed again) may change the video
+    mode of a monitor, so cached monitor information is dropped.
+    '''
+    snake.set_window_monitor(window, monitor, xpos, ypos, width, height, refresh_rate)
+    _monitors.invalidate()
 
 
 ###############################################################################
@@ -246,33 +453,117 @@ def string_ffi(string):
     return string
 
 
+###############################################################################
+# Enum name lookup tables
+#  Built once at import; the *_LAST aliases are never used as names
+###############################################################################
+def _get_lookup_tables(prefix, preferred=()):
+    '''Builds value -> name and name -> value tables for glfw constants
+
+    Args:
+        prefix(str): constant prefix (e.g. 'KEY_')
+        preferred(tuple): names that win when several share a value
+
+    Returns:
+        tuple(dict, dict): names by value, values by name
+    '''
+    values = {
+        name[len(prefix):].lower(): value
+        for name, value in snake.__dict__.items()
+        if name.startswith(prefix) and isinstance(value, int)
+        if not name.endswith('_LAST')
+    }
+    names = {}
+    for name, value in sorted(values.items()):
+        if value not in names or name in preferred:
+            names[value] = name
+    return names, values
+
+
+key_names, key_values = _get_lookup_tables('KEY_')
+mod_names, mod_values = _get_lookup_tables('MOD_')
+mouse_button_names, mouse_button_values = _get_lookup_tables('MOUSE_BUTTON_', preferred=('left', 'right', 'middle'))
+action_names = {value: name.lower() for name, value in snake.__dict__.items() if name in ('RELEASE', 'PRESS', 'REPEAT')}
+action_values = {name: value for value, name in action_names.items()}
+
+# Every combination of modifier bits decomposed once:  mod_strings[mods]
+_mod_mask = sum(mod_names)
+mod_strings = tuple(
+    '+'.join(sorted(name for bit, name in mod_names.items() if bit & mods))
+    for mods in range(_mod_mask + 1)
+)
+_mod_strings_by_value = dict(enumerate(mod_strings))
+
+
 def get_key_string(key):
     '''Returns the name of a key'''
-    val = 'KEY_'
-    globs = dict(globals().items())
-    lookup = {v: k.replace(val, '').lower() for k, v in globs.items() if k.startswith(val)}
-    string = lookup.get(key, key)
-    return string
+    return key_names.get(key, key)
 
 
 def get_mod_string(mods):
-    '''Returns the name of a modifier'''
-    val = 'MOD_'
-    lookup = {v: k.replace(val, '').lower() for k, v in globals().items() if k.startswith(val)}
-    string = '+'.join(sorted({v for m, v in lookup.items() if m & mods}))
-    return string
+    '''Returns the names of modifiers joined by "+"'''
+    return mod_strings[mods & _mod_mask]
 
 
 def get_mouse_button_string(button):
-    '''Returns the name of a modifier'''
-    val = 'MOUSE_BUTTON_'
-    lookup = {v: k.replace(val, '').lower() for k, v in sorted(globals().items()) if k.startswith(val)}
-    string = lookup.get(button, button)
-    return string
+    '''Returns the name of a mouse button'''
+    return mouse_button_names.get(button, button)
 
 
 def get_action_string(action):
-    '''Returns the name of a modifier'''
-    options = ['RELEASE', 'PRESS', 'REPEAT']
-    data = {v: k.lower() for k, v in globals().items() if k in options}
-    return data.get(action, action)
+    '''Returns the name of an action'''
+    return action_names.get(action, action)
+
+
+_dense_tables = {}
+
+
+def _get_dense_table(names):
+    '''Returns (offset, table) covering the named values; built once'''
+    np = _numpy()
+    key = id(names)
+    if key not in _dense_tables:
+        offset = min(names)
+        table = np.array([names.get(value, value) for value in range(offset, max(names) + 1)], dtype=object)
+        _dense_tables[key] = offset, table
+    return _dense_tables[key]
+
+
+def _get_strings(names, values):
+    '''Looks up the names of an array of values
+
+    Values without a name are kept as is (like the scalar functions).
+
+    Returns:
+        numpy.ndarray: object array of names, shaped like values
+    '''
+    np = _numpy()
+    offset, table = _get_dense_table(names)
+    values = np.asarray(values)
+    indices = values.astype(np.int64) - offset
+    valid = (indices >= 0) & (indices < len(table))
+    strings = values.astype(object)
+    strings[valid] = table[indices[valid]]
+    return strings
+
+
+def get_key_strings(keys):
+    '''Returns the names of an array of keys (requires numpy)'''
+    return _get_strings(key_names, keys)
+
+
+def get_mod_strings(mods):
+    '''Returns the modifier names of an array of modifier bits (requires numpy)'''
+    np = _numpy()
+    table = _get_dense_table(_mod_strings_by_value)[1]
+    return table[np.asarray(mods).astype(np.int64) & _mod_mask]
+
+
+def get_mouse_button_strings(buttons):
+    '''Returns the names of an array of mouse buttons (requires numpy)'''
+    return _get_strings(mouse_button_names, buttons)
+
+
+def get_action_strings(actions):
+    '''Returns the names of an array of actions (requires numpy)'''
+    return _get_strings(action_names, actions)
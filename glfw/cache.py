@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+'''
+On-disk cache for data that is expensive to compute at import.
+
+Entries are small json documents stored within a user cache folder.  Each
+entry is stored along with the key used to create it, and a load only
+succeeds when the stored key matches the requested key exactly.  So stale
+entries are simply ignored and overwritten.
+
+Environment:
+
+    GLFW_CFFI_CACHE: folder to use for the cache.  Set to "0", "off",
+        "false" or "no" to disable the cache entirely.
+'''
+from __future__ import absolute_import, division, print_function, unicode_literals  # noqa
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+
+disabled_values = ('0', 'off', 'false', 'no')
+
+
+def get_cache_dir():
+    '''Returns the folder used for the cache or None if disabled'''
+    cache_dir = os.environ.get('GLFW_CFFI_CACHE', '').strip('"')
+    if cache_dir.lower() in disabled_values:
+        return None
+    if not cache_dir:
+        if sys.platform.startswith('win'):
+            root = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+            cache_dir = os.path.join(root, 'glfw-cffi', 'cache')
+        elif sys.platform == 'darwin':
+            cache_dir = os.path.join(os.path.expanduser('~'), 'Library', 'Caches', 'glfw-cffi')
+        else:
+            root = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+            cache_dir = os.path.join(root, 'glfw-cffi')
+    return os.path.abspath(cache_dir)
+
+
+def _entry_path(name, key):
+    '''Returns the path for a cache entry or None if caching is disabled'''
+    cache_dir = get_cache_dir()
+    if cache_dir is None:
+        return None
+    digest = hashlib.sha1(json.dumps(key, sort_keys=True).encode('utf-8')).hexdigest()
+    return os.path.join(cache_dir, '{}-{}.json'.format(name, digest))
+
+
+def load(name, key):
+    '''Loads a cache entry
+
+    Args:
+        name(str): category of the entry (used as a filename prefix)
+        key(dict): json-serializable data identifying the entry
+
+    Returns:
+        data stored for the key or None on a miss
+    '''
+    path = _entry_path(name, key)
+    if path is None or not os.path.isfile(path):
+        return None
+    try:
+        with open(path, 'r') as fd:
+            entry = json.load(fd)
+    except (IOError, OSError, ValueError):
+        return None
+    # Round-trip the key through json so tuples and lists compare equal
+    if entry.get('key') != json.loads(json.dumps(key)):
+        return None
+    return entry.get('data')
+
+
+def store(name, key, data):
+    '''Stores a cache entry
+
+    Failures are silent; the cache is only an optimization.
+
+    Args:
+        name(str): category of the entry (used as a filename prefix)
+        key(dict): json-serializable data identifying the entry
+        data: json-serializable data to store
+
+    Returns:
+        str: path to the entry or None if it was not stored
+    '''
+    path = _entry_path(name, key)
+    if path is None:
+        return None
+    try:
+        folder = os.path.dirname(path)
+        if not os.path.isdir(folder):
+            os.makedirs(folder)
+        # Write and then rename so concurrent imports never see partial data
+        fd, temp_path = tempfile.mkstemp(dir=folder, suffix='.tmp')
+        with os.fdopen(fd, 'w') as temp_file:
+            json.dump({'key': key, 'data': data}, temp_file)
+        if sys.platform.startswith('win') and os.path.exists(path):
+            os.remove(path)
+        os.rename(temp_path, path)
+    except (IOError, OSError, TypeError, ValueError):
+        return None
+    return path
+
+
+def invalidate(name=None):
+    '''Removes cache entries
+
+    Args:
+        name(str): category of entries to remove [default: all]
+
+    Returns:
+        int: number of entries removed
+    '''
+    cache_dir = get_cache_dir()
+    if cache_dir is None or not os.path.isdir(cache_dir):
+        return 0
+    prefix = '' if name is None else '{}-'.format(name)
+    removed = 0
+    for filename in os.listdir(cache_dir):
+        if filename.startswith(prefix) and filename.endswith('.json'):
+            try:
+                os.remove(os.path.join(cache_dir, filename))
+                removed += 1
+            except OSError:
+                pass
+    return removed
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+# Helpers for turning glfw3.h into something cffi's cdef can digest.  These
+# have no side-effects so they may be used outside of the package import
+# (e.g. by the cffi build script in _build.py).
+from __future__ import absolute_import, division, print_function, unicode_literals  # noqa
+
+import re
+
+
+# Compiled once; these are run against every line of the header
+_function_declaration_engine = re.compile(''.join((
+    r'^\s*(?P<result>(.*))\s+',
+    r'(?P<func_name>(glfw[A-Za-z_0-9*]+))',
+    r'\((?P<args>(.*))\)\;\s*$'
+)))
+
+_camel_to_snake_patterns = [
+    (r'(.)([0-9]+)', r'\1_\2'),
+    # (r'(.)([A-Z][a-z]+)', r'\1_\2'),
+    # (r'(.)([0-9]+)([a-z]+)', r'\1_\2\3'),
+    (r'([a-z]+)([A-Z])', r'\1_\2'),
+]
+_camel_to_snake_engines = [
+    (pattern, replacement, re.compile(pattern))
+    for pattern, replacement in _camel_to_snake_patterns
+]
+
+
+###############################################################################
+def _get_function_declaration(line):
+    '''Reads a line of C code and then extracts function declarations if found'''
+    found = None
+    eng = _function_declaration_engine
+    if all(_ in line for _ in ('(', ')', ';')):
+        if '@' not in line and not line.lstrip(' ').startswith('typedef'):
+            if eng.search(line.strip()):
+                found = [group.groupdict() for group in eng.finditer(line)][0]
+                func_name = found['func_name']
+                found['snake_name'] = _camelToSnake(func_name.replace('glfw', ''))
+    return found
+
+
+def _get_function_declarations(source):
+    '''Extracts all function declarations from C source
+
+    Args:
+        source(str): C source (typically the output of _fix_source)
+
+    Returns:
+        list: function declarations (see _get_function_declaration)
+    '''
+    declarations = []
+    for line in source.split('\n'):
+        found = _get_function_declaration(line)
+        if found:
+            declarations.append(found)
+    return declarations
+
+
+def _fix_source(data):
+    '''Remove directives since they are not supported.'''
+    lines = []
+    ignored_directives = (
+        '#include',
+        '#if', '#ifdef', '#endif', '#ifndef', '#else', '#elif',
+        '#error', '#undef',
+        'extern',
+    )
+    prev_line = ''
+    defines = {}
+    for lineno, line in enumerate(data.split('\n')):
+        if line.lstrip(' ').startswith(ignored_directives):
+            prev_line = line
+            continue
+        if not line.strip():
+            prev_line = line
+            continue
+        if line.lstrip(' ').startswith('GLFWAPI'):
+            line = line.replace('GLFWAPI ', '')
+        # TODO: Figure out how to add Vulkan support, but until then...
+        # Won't support Vulkan at this point.
+        vulkan_keys = [
+            'GLFWvkproc', 'VkInstance', 'VkPhysicalDevice'
+        ]
+        if any(key in line for key in vulkan_keys):
+            continue
+        if prev_line == '#ifdef __cplusplus':
+            if line.strip() == '}':
+                prev_line = line
+                continue
+        if line.lstrip(' ').startswith('#define'):
+            found = re.search('^(\s*)\#define\s+([0-9A-Za-z_]+)\s*$', line)
+            if found:
+                continue
+            else:
+                found = re.search('^(\s*)\#define\s+([0-9A-Za-z_]+)\s*(.*)$', line)
+                if found:
+                    space, key, value = found.groups()
+                    if ((len(space) > 0) or value.startswith('__')):
+                        continue
+                    elif value in defines:
+                        old_value, value = value, defines[value]
+                        line = line.replace(old_value, value)
+                    defines[key] = value
+        lines.append(line)
+        prev_line = line
+    return '\n'.join(lines)
+
+
+def _camelToSnake(string):
+    '''Converts camelCase to snake_case
+
+    >>> print(_camelToSnake('ACase'))
+    a_case
+    >>> print(_camelToSnake('AnotherCaseHere'))
+    another_case_here
+    >>> print(_camelToSnake('AnotherCaseHereNow'))
+    another_case_here_now
+    >>> print(_camelToSnake('SimpleCase'))
+    simple_case
+    >>> print(_camelToSnake('simpleCase2'))
+    simple_case_2
+    >>> print(_camelToSnake('simpleCase3d'))
+    simple_case_3d
+    >>> print(_camelToSnake('simpleCase4D'))
+    simple_case_4_d
+    >>> print(_camelToSnake('simpleCase5thDimension'))
+    simple_case_5th_dimension
+    >>> print(_camelToSnake('simpleCase66thDimension'))
+    simple_case_66th_dimension
+    '''
+    for data in _camel_to_snake_engines:
+        pattern, replacement, eng = data
+        string = eng.sub(replacement, string)
+    string = string.lower()
+    return string
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+'''
+Cursor motion and scroll coalescing
+
+Between two frames a high frequency mouse can report hundreds of cursor
+positions, while a user interface usually only needs the latest
+position and the total scroll.  A MotionCoalescer records cursor and
+scroll events per window and delivers at most one aggregated event of
+each kind per window when flushed.  Handlers take the same arguments
+as functions decorated with glfw.decorators.cursor_pos_callback and
+glfw.decorators.scroll_callback.
+
+With the compiled extension the raw events are merged by C callbacks,
+so no python code runs per raw event.
+
+Usage:
+
+    >>> coalescer = glfw.MotionCoalescer()
+    >>> @coalescer.cursor_pos_callback
+    ... def on_mouse_move(win, x, y):
+    ...     print(x, y)
+    >>> @coalescer.scroll_callback
+    ... def on_scroll(win, dx, dy):
+    ...     print(dx, dy)
+    >>> coalescer.attach(win)
+    >>> while not glfw.window_should_close(win):
+    ...     coalescer.poll_events()  # glfw.poll_events() then coalescer.flush()
+
+Note:  Cursor motion is delivered before scrolling, so the relative
+order of the two within a frame is not kept.
+'''
+from __future__ import absolute_import, division, print_function, unicode_literals  # noqa
+
+from . import raw
+from ._event_source import _motion_cdef
+
+_attached = [None]
+_struct_defined = [False]
+
+
+def _define_struct():
+    '''Declares the motion types within an ABI mode ffi'''
+    if not _struct_defined[0]:
+        if raw.ffi_mode == 'abi':
+            raw._ffi.cdef(_motion_cdef)
+        _struct_defined[0] = True
+
+
+class MotionCoalescer(object):
+    '''Merges cursor motion and accumulates scrolling per window
+
+    Only one coalescer may be attached to windows at a time.
+
+    Args:
+        max_windows(int): maximum number of windows attached at once
+
+    Attributes:
+        counters(dict): number of raw events received and aggregated
+            events delivered for cursor_pos and scroll
+    '''
+
+    def __init__(self, max_windows=16):
+        _define_struct()
+        ffi = raw._ffi
+        self.max_windows = int(max_windows)
+        self._c_windows = ffi.new('glfw_cffi_motion[]', self.max_windows)
+        self._c_table = ffi.new('glfw_cffi_motion_table *')
+        self._c_table.windows = self._c_windows
+        self._windows = []
+        self._cursor_pos = None
+        self._scroll = None
+        self.counters = {
+            'cursor_pos_events': 0,
+            'cursor_pos_delivered': 0,
+            'scroll_events': 0,
+            'scroll_delivered': 0,
+        }
+        self._compiled = hasattr(raw._glfw, '_glfw_cffi_set_motion_table')
+        if self._compiled:
+            self._cursor_pos_callback = ffi.addressof(raw._glfw, '_glfw_cffi_coalesce_cursor_pos')
+            self._scroll_callback = ffi.addressof(raw._glfw, '_glfw_cffi_coalesce_scroll')
+        else:
+            self._cursor_pos_callback = ffi.callback('void (GLFWwindow*, double, double)', self._on_cursor_pos)
+            self._scroll_callback = ffi.callback('void (GLFWwindow*, double, double)', self._on_scroll)
+
+    @property
+    def merged(self):
+        '''int: raw events that did not need to be delivered'''
+        counters = self.counters
+        return (
+            counters['cursor_pos_events'] - counters['cursor_pos_delivered'] +
+            counters['scroll_events'] - counters['scroll_delivered']
+        )
+
+    def cursor_pos_callback(self, func):
+        '''Decorator setting the handler for coalesced cursor motion'''
+        self._cursor_pos = func
+        return func
+
+    def scroll_callback(self, func):
+        '''Decorator setting the handler for accumulated scrolling'''
+        self._scroll = func
+        return func
+
+    def _find(self, window):
+        '''Returns the motion record of a window or None'''
+        window_id = int(raw._ffi.cast('uintptr_t', window))
+        for index in range(self._c_table.count):
+            motion = self._c_windows[index]
+            if motion.window == window_id:
+                return motion
+        return None
+
+    def _on_cursor_pos(self, window, xpos, ypos):
+        motion = self._find(window)
+        if motion is not None:
+            motion.xpos = xpos
+            motion.ypos = ypos
+            motion.cursor_events += 1
+
+    def _on_scroll(self, window, xoffset, yoffset):
+        motion = self._find(window)
+        if motion is not None:
+            motion.xoffset += xoffset
+            motion.yoffset += yoffset
+            motion.scroll_events += 1
+
+    def attach(self, window):
+        '''Coalesces cursor motion and scrolling of a window
+
+        Replaces any cursor position and scroll callbacks of the window.
+
+        Returns:
+            MotionCoalescer: self
+        '''
+        if _attached[0] not in (None, self):
+            raise RuntimeError('Another MotionCoalescer is attached; detach it first')
+        if self._find(window) is None:
+            if len(self._windows) >= self.max_windows:
+                raise RuntimeError('Cannot attach more than {} windows'.format(self.max_windows))
+            motion = self._c_windows[len(self._windows)]
+            motion.xpos = motion.ypos = motion.xoffset = motion.yoffset = 0.0
+            motion.cursor_events = motion.scroll_events = 0
+            motion.window = int(raw._ffi.cast('uintptr_t', window))
+            self._windows.append(window)
+            self._c_table.count = len(self._windows)
+        if self._compiled:
+            raw._glfw._glfw_cffi_set_motion_table(self._c_table)
+        _attached[0] = self
+        raw._glfw.glfwSetCursorPosCallback(window, self._cursor_pos_callback)
+        raw._glfw.glfwSetScrollCallback(window, self._scroll_callback)
+        return self
+
+    def detach(self, window=None):
+        '''Stops coalescing events of a window [default: all windows]
+
+        Pending events of the window are discarded.
+        '''
+        windows = list(self._windows) if window is None else [window]
+        for handle in windows:
+            if self._find(handle) is None:
+                continue
+            raw._glfw.glfwSetCursorPosCallback(handle, raw._ffi.NULL)
+            raw._glfw.glfwSetScrollCallback(handle, raw._ffi.NULL)
+            index = self._windows.index(handle)
+            last = len(self._windows) - 1
+            # Keep the table packed by moving the last record into the gap
+            self._c_windows[index] = self._c_windows[last]
+            self._windows[index] = self._windows[last]
+            self._windows.pop()
+            self._c_table.count = len(self._windows)
+        if not self._windows and _attached[0] is self:
+            if self._compiled:
+                raw._glfw._glfw_cffi_set_motion_table(raw._ffi.NULL)
+            _attached[0] = None
+
+    def flush(self):
+        '''Delivers one aggregated event per window and kind
+
+        Returns:
+            int: number of events delivered
+        '''
+        delivered = 0
+        counters = self.counters
+        for index, window in enumerate(self._windows):
+            motion = self._c_windows[index]
+            cursor_events = motion.cursor_events
+            if cursor_events:
+                motion.cursor_events = 0
+                counters['cursor_pos_events'] += cursor_events
+                if self._cursor_pos is not None:
+                    counters['cursor_pos_delivered'] += 1
+                    delivered += 1
+                    self._cursor_pos(window, motion.xpos, motion.ypos)
+            scroll_events = motion.scroll_events
+            if scroll_events:
+                xoffset, yoffset = motion.xoffset, motion.yoffset
+                motion.xoffset = motion.yoffset = 0.0
+                motion.scroll_events = 0
+                counters['scroll_events'] += scroll_events
+                if self._scroll is not None:
+                    counters['scroll_delivered'] += 1
+                    delivered += 1
+                    self._scroll(window, xoffset, yoffset)
+        return delivered
+
+    def poll_events(self):
+        '''Processes pending events and then delivers coalesced events'''
+        raw._glfw.glfwPollEvents()
+        return self.flush()
+
+    def __repr__(self):
+        cname = self.__class__.__name__
+        string = '<{cname} windows={windows} merged={merged}>'
+        return string.format(cname=cname, windows=len(self._windows), merged=self.merged)
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+'''
+Event queue:  glfw callbacks append fixed-size records to a preallocated
+buffer which python drains in bulk as a numpy structured array
+
+Rather than calling a python function for every event (thousands per
+second for cursor motion on high frequency mice), attached windows
+record events into the queue while glfw processes events.  With the
+compiled extension the records are written by C callbacks, so no python
+code runs per event; in ABI mode a minimal python callback writes each
+record.
+
+Usage:
+
+    >>> queue = glfw.EventQueue(capacity=4096)
+    >>> queue.attach(win)
+    >>> while not glfw.window_should_close(win):
+    ...     glfw.poll_events()
+    ...     events = queue.drain()
+    ...     keys = events[events['type'] == glfw.events.KEY]
+    ...     motion = events[events['type'] == glfw.events.CURSOR_POS]
+
+Each record has the fields:
+
+    type(int32): event type (e.g. glfw.events.KEY)
+    window(uint64): window id (see window_id)
+    time(float64): glfw.get_time() when the event was queued
+    ints(int32[4]): integer arguments of the callback in order
+        (e.g. key, scancode, action, mods)
+    doubles(float64[2]): double arguments of the callback in order
+        (e.g. xpos, ypos)
+
+numpy is required to use this module, but is only imported when a queue
+is created.
+'''
+from __future__ import absolute_import, division, print_function, unicode_literals  # noqa
+
+import collections
+
+from . import raw
+from ._event_source import _event_cdef, _event_types, _get_event_callback_name
+from .input import _numpy
+
+# Event type ids, e.g. KEY, CURSOR_POS
+event_types = {name: event_type for name, event_type, _ in _event_types}
+globals().update({name.upper(): event_type for name, event_type in event_types.items()})
+event_names = {event_type: name for name, event_type in event_types.items()}
+
+# A single event delivered by a python callback (see glfw.aio and glfw.render_thread)
+Event = collections.namedtuple('Event', 'type window time args')
+
+_attached = [None]
+_struct_defined = [False]
+
+
+def _define_struct():
+    '''Declares the event record types within an ABI mode ffi'''
+    if not _struct_defined[0]:
+        if raw.ffi_mode == 'abi':
+            raw._ffi.cdef(_event_cdef)
+        _struct_defined[0] = True
+
+
+def get_dtype():
+    '''Returns the numpy dtype matching the C event record'''
+    np = _numpy()
+    return np.dtype([
+        ('time', np.float64),
+        ('window', np.uint64),
+        ('doubles', np.float64, (2, )),
+        ('type', np.int32),
+        ('ints', np.int32, (4, )),
+    ], align=True)
+
+
+def window_id(window):
+    '''Returns the id used for a window within event records'''
+    return int(raw._ffi.cast('uintptr_t', window))
+
+
+def _get_signature(args):
+    '''Returns the cffi signature of the callback of an event type'''
+    return 'void ({})'.format(', '.join(('GLFWwindow *', ) + tuple(arg.rsplit(' ', 1)[0] for arg in args)))
+
+
+def _get_setter(name):
+    '''Returns the glfw function setting the callback for an event type'''
+    camel_name = ''.join(part.capitalize() for part in name.split('_'))
+    return getattr(raw._glfw, 'glfwSet{}Callback'.format(camel_name))
+
+
+def _check_types(types):
+    '''Returns the set of event type names [default: all]
+
+    Raises:
+        ValueError: for unknown event type names
+    '''
+    types = set(event_types if types is None else types)
+    unknown = types - set(event_types)
+    if unknown:
+        raise ValueError('Unknown event types: {}'.format(', '.join(sorted(unknown))))
+    return types
+
+
+def _set_callbacks(window, types, make_handler):
+    '''Sets a python callback for each event type of a window
+
+    Args:
+        window(ffi.CData): window handle
+        types(set): event type names
+        make_handler: function called with an event type name returning
+            the function called as handler(window, *args)
+
+    Returns:
+        tuple: the ffi callbacks set and the callbacks they replaced (or
+            None), both keyed by event type name; keep the ffi callbacks
+            alive while they are set
+    '''
+    ffi = raw._ffi
+    callbacks = {}
+    previous = {}
+    for name, _, args in _event_types:
+        if name in types:
+            callback = callbacks[name] = ffi.callback(_get_signature(args), make_handler(name))
+            replaced = _get_setter(name)(window, callback)
+            previous[name] = None if replaced == ffi.NULL else replaced
+    return callbacks, previous
+
+
+class EventQueue(object):
+    '''Preallocated event records filled by glfw callbacks
+
+    Only one queue may be attached to windows at a time.
+
+    Args:
+        capacity(int): maximum number of events held between drains.
+            Events arriving when the queue is full are dropped and counted.
+
+    Attributes:
+        events(numpy.ndarray): every record within the queue
+        dropped(int): number of events dropped because the queue was full
+    '''
+
+    def __init__(self, capacity=4096):
+        np = _numpy()
+        _define_struct()
+        ffi = raw._ffi
+        dtype = get_dtype()
+        if dtype.itemsize != ffi.sizeof('glfw_cffi_event'):
+            raise RuntimeError('Event record layout does not match numpy dtype')
+        self.capacity = int(capacity)
+        self.events = np.zeros(self.capacity, dtype=dtype)
+        self._c_events = ffi.cast('glfw_cffi_event *', ffi.from_buffer(self.events))
+        self._c_queue = ffi.new('glfw_cffi_event_queue *')
+        self._c_queue.events = self._c_events
+        self._c_queue.capacity = self.capacity
+        self._windows = {}
+        self._callbacks = {}
+        self._compiled = hasattr(raw._glfw, '_glfw_cffi_set_event_queue')
+
+    def __len__(self):
+        return self._c_queue.count
+
+    @property
+    def dropped(self):
+        return self._c_queue.dropped
+
+    def _get_callback(self, name, event_type, args):
+        '''Returns the callback to set for an event type'''
+        ffi = raw._ffi
+        if self._compiled:
+            return ffi.addressof(raw._glfw, _get_event_callback_name(name))
+        callback = self._callbacks.get(name)
+        if callback is not None:
+            return callback
+
+        queue = self._c_queue
+        events = self._c_events
+        get_time = raw._glfw.glfwGetTime
+        cast = ffi.cast
+        int_count = len([arg for arg in args if not arg.startswith('double')])
+        double_count = len(args) - int_count
+        padding = ((0, ) * 4, (0.0, ) * 2)
+
+        def record(window, *args):
+            count = queue.count
+            if count >= queue.capacity:
+                queue.dropped += 1
+                return
+            event = events[count]
+            event.time = get_time()
+            event.window = int(cast('uintptr_t', window))
+            event.type = event_type
+            event.ints = args[:int_count] + padding[0][int_count:]
+            event.doubles = args[int_count:] + padding[1][double_count:]
+            queue.count = count + 1
+
+        callback = self._callbacks[name] = ffi.callback(_get_signature(args), record)
+        return callback
+
+    def attach(self, window, types=None):
+        '''Records events of a window within this queue
+
+        Replaces any callbacks set for the event types.
+
+        Args:
+            window(ffi.CData): window handle
+            types(list): event type names (e.g. ['key', 'cursor_pos'])
+                [default: all]
+
+        Returns:
+            EventQueue: self
+        '''
+        if _attached[0] not in (None, self):
+            raise RuntimeError('Another EventQueue is attached; detach it first')
+        types = _check_types(types)
+        if self._compiled:
+            raw._glfw._glfw_cffi_set_event_queue(self._c_queue)
+        _attached[0] = self
+        for name, event_type, args in _event_types:
+            if name in types:
+                _get_setter(name)(window, self._get_callback(name, event_type, args))
+        self._windows[window_id(window)] = (window, types)
+        return self
+
+    def detach(self, window=None):
+        '''Stops recording events of a window [default: all windows]'''
+        windows = list(self._windows) if window is None else [window_id(window)]
+        for key in windows:
+            handle, types = self._windows.pop(key)
+            for name in types:
+                _get_setter(name)(handle, raw._ffi.NULL)
+        if not self._windows and _attached[0] is self:
+            if self._compiled:
+                raw._glfw._glfw_cffi_set_event_queue(raw._ffi.NULL)
+            _attached[0] = None
+
+    def drain(self):
+        '''Returns events queued since the last drain, oldest first
+
+        Callbacks and drain both run on the thread processing events, so
+        the queue is rewound on every drain and the events returned are
+        always one contiguous view.
+
+        Note:  The view is overwritten by events queued after this
+            call (e.g. by the next poll_events); copy it to keep it.
+
+        Returns:
+            numpy.ndarray: structured array view (see get_dtype)
+        '''
+        count = self._c_queue.count
+        self._c_queue.count = 0
+        return self.events[:count]
+
+    def clear(self):
+        '''Discards queued events'''
+        self._c_queue.count = 0
+
+    def __repr__(self):
+        cname = self.__class__.__name__
+        string = '<{cname} {count}/{capacity} dropped={dropped}>'
+        return string.format(cname=cname, count=len(self), capacity=self.capacity, dropped=self.dropped)
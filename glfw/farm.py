@@ -0,0 +1,439 @@
+# -*- coding: utf-8 -*-
+'''
+Rendering independent offscreen jobs on a pool of worker processes
+
+One process with one OpenGL context renders one scene at a time, even
+with a software rasterizer like llvmpipe that could use every core.  A
+RenderPool starts worker processes which each import glfw once, create
+one hidden window with an offscreen framebuffer and keep it warm for
+every job they run.  A job is a picklable function called with its
+parameters while the worker's context is current and its framebuffer
+bound; afterwards the worker reads the framebuffer into a shared memory
+slot owned by the pool, so pixels are never pickled.
+
+The module is not imported by glfw itself, since multiprocessing adds
+to the import time of every program:
+
+    >>> import glfw.farm
+    >>> def render(color):  # defined at module level so it pickles
+    ...     gl.clear_color(*color)
+    ...     gl.clear(gl.COLOR_BUFFER_BIT)
+    >>> with glfw.farm.RenderPool(processes=4, width=256, height=256) as pool:
+    ...     images = pool.map(render, colors)  # (256, 256, 4) uint8 arrays
+    ...     for result in pool.imap_unordered(render, colors):
+    ...         print(result.index, result.error or result.pixels.shape)
+
+A job that raises, crashes its worker or runs longer than the timeout
+fails on its own: a crashed or timed out worker is replaced and the
+other jobs carry on.  Results have the fields:
+
+    index(int): position of the job's parameters
+    pixels(numpy.ndarray): (height, width, 4) uint8 RGBA, bottom row
+        first unless the pool flips rows; None if the job failed
+    value: value returned by the job function
+    error(str): None, or why the job failed
+
+Workers are started with the 'spawn' method where available, so they
+never inherit the parent's display connection; run batches under Xvfb
+with e.g. xvfb-run -s '-screen 0 1280x1024x24'.  numpy is required in
+the parent process.
+'''
+from __future__ import absolute_import, division, print_function, unicode_literals  # noqa
+
+import collections
+import multiprocessing
+import multiprocessing.connection
+import time
+import traceback
+from timeit import default_timer as _timer
+
+from . import api, raw
+from .input import _numpy
+from .pool import _GL_FRAMEBUFFER, _get_gl_functions
+from .raw import snake
+
+Result = collections.namedtuple('Result', 'index pixels value error')
+
+# OpenGL enumerations used by the workers
+_GL_RENDERBUFFER = 0x8D41
+_GL_FRAMEBUFFER_COMPLETE = 0x8CD5
+_GL_COLOR_ATTACHMENT0 = 0x8CE0
+_GL_DEPTH_STENCIL_ATTACHMENT = 0x821A
+_GL_RGBA8 = 0x8058
+_GL_DEPTH24_STENCIL8 = 0x88F0
+_GL_RGBA = 0x1908
+_GL_UNSIGNED_BYTE = 0x1401
+
+_gl_functions = (
+    ('glGenFramebuffers', 'void (*)(int, unsigned int *)'),
+    ('glBindFramebuffer', 'void (*)(unsigned int, unsigned int)'),
+    ('glGenRenderbuffers', 'void (*)(int, unsigned int *)'),
+    ('glBindRenderbuffer', 'void (*)(unsigned int, unsigned int)'),
+    ('glRenderbufferStorage', 'void (*)(unsigned int, unsigned int, int, int)'),
+    ('glFramebufferRenderbuffer', 'void (*)(unsigned int, unsigned int, unsigned int, unsigned int)'),
+    ('glCheckFramebufferStatus', 'unsigned int (*)(unsigned int)'),
+    ('glViewport', 'void (*)(int, int, int, int)'),
+    ('glReadPixels', 'void (*)(int, int, int, int, unsigned int, unsigned int, void *)'),
+)
+
+
+def _create_framebuffer(functions, width, height):
+    '''Creates a framebuffer with RGBA8 color and depth/stencil renderbuffers'''
+    ffi = raw._ffi
+    framebuffer = ffi.new('unsigned int *')
+    renderbuffers = ffi.new('unsigned int[2]')
+    functions['glGenFramebuffers'](1, framebuffer)
+    functions['glGenRenderbuffers'](2, renderbuffers)
+    functions['glBindFramebuffer'](_GL_FRAMEBUFFER, framebuffer[0])
+    attachments = ((_GL_COLOR_ATTACHMENT0, _GL_RGBA8), (_GL_DEPTH_STENCIL_ATTACHMENT, _GL_DEPTH24_STENCIL8))
+    for renderbuffer, (attachment, internal_format) in zip(renderbuffers, attachments):
+        functions['glBindRenderbuffer'](_GL_RENDERBUFFER, renderbuffer)
+        functions['glRenderbufferStorage'](_GL_RENDERBUFFER, internal_format, width, height)
+        functions['glFramebufferRenderbuffer'](_GL_FRAMEBUFFER, attachment, _GL_RENDERBUFFER, renderbuffer)
+    functions['glBindRenderbuffer'](_GL_RENDERBUFFER, 0)
+    status = functions['glCheckFramebufferStatus'](_GL_FRAMEBUFFER)
+    if status != _GL_FRAMEBUFFER_COMPLETE:
+        raise RuntimeError('Framebuffer is incomplete: 0x{:04x}'.format(status))
+    return framebuffer[0]
+
+
+def _worker(connection, slot, width, height, hints):
+    '''Worker process: renders jobs received over connection into slot'''
+    glfw = raw._glfw
+    try:
+        if not raw._ensure_init():
+            raise RuntimeError('Could not initialize GLFW')
+        glfw.glfwDefaultWindowHints()
+        glfw.glfwWindowHint(snake.VISIBLE, 0)
+        glfw.glfwWindowHint(snake.FOCUSED, 0)
+        for hint, value in hints.items():
+            glfw.glfwWindowHint(hint, value)
+        window = api.create_window(width, height, 'RenderPool', monitor=raw._ffi.NULL, raise_exception=True)
+        glfw.glfwMakeContextCurrent(window)
+        # Framebuffer objects require OpenGL 3.0
+        functions = _get_gl_functions(_gl_functions, required=True)
+        framebuffer = _create_framebuffer(functions, width, height)
+        pixels = raw._ffi.from_buffer(slot)
+    except Exception:
+        connection.send(('error', traceback.format_exc()))
+        return
+    connection.send(('ready', None))
+
+    while True:
+        try:
+            message = connection.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+        function, args, kwargs = message
+        try:
+            functions['glBindFramebuffer'](_GL_FRAMEBUFFER, framebuffer)
+            functions['glViewport'](0, 0, width, height)
+            value = function(*args, **kwargs)
+            functions['glBindFramebuffer'](_GL_FRAMEBUFFER, framebuffer)
+            functions['glReadPixels'](0, 0, width, height, _GL_RGBA, _GL_UNSIGNED_BYTE, pixels)
+            connection.send(('done', value))
+        except Exception:
+            connection.send(('error', traceback.format_exc()))
+    glfw.glfwDestroyWindow(window)
+
+
+def _wait(connections, timeout):
+    '''Returns the connections ready to be read within timeout seconds'''
+    wait = getattr(multiprocessing.connection, 'wait', None)  # python 3.3+
+    if wait is not None:
+        return wait(connections, timeout)
+    deadline = None if timeout is None else _timer() + timeout
+    while True:
+        ready = [connection for connection in connections if connection.poll()]
+        if ready or (deadline is not None and _timer() >= deadline):
+            return ready
+        time.sleep(0.001)
+
+
+class _Worker(object):
+    '''A worker process with its connection and shared pixel slot'''
+
+    def __init__(self, context, width, height, hints):
+        self.slot = context.RawArray('B', width * height * 4)
+        self.connection, child = context.Pipe()
+        self.process = context.Process(
+            target=_worker, args=(child, self.slot, width, height, hints), name='glfw-render-worker')
+        self.process.daemon = True
+        self.process.start()
+        child.close()
+        self.ready = False
+        self.started = _timer()
+        # (index, start time) of the running job
+        self.job = None
+
+    def stop(self, timeout=None):
+        try:
+            self.connection.send(None)
+        except (IOError, OSError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.connection.close()
+
+    def kill(self):
+        self.process.terminate()
+        self.process.join()
+        self.connection.close()
+
+
+class RenderPool(object):
+    '''Pool of worker processes each rendering jobs with a hidden context
+
+    Args:
+        processes(int): number of workers [default: number of cpus]
+        width(int): width of the framebuffer of every worker
+        height(int): height of the framebuffer of every worker
+        hints(dict): window hints applied before creating the hidden
+            windows (e.g. the context version)
+        timeout(float): seconds a job may run before its worker is
+            killed and replaced; None disables the timeout
+        flip(bool): return pixels with the top row first
+        start_method(str): multiprocessing start method; the default
+            spawn starts workers without the parent's glfw state
+        start_timeout(float): seconds allowed for a worker to start
+
+    Attributes:
+        counters(dict): jobs submitted, completed and failed, jobs that
+            timed out or crashed their worker, and workers started
+    '''
+
+    def __init__(self, processes=None, width=256, height=256, hints=None, timeout=60.0, flip=False,
+                 start_method='spawn', start_timeout=60.0):
+        self.processes = int(processes or multiprocessing.cpu_count())
+        self.width = int(width)
+        self.height = int(height)
+        self.hints = dict(hints or {})
+        self.timeout = timeout
+        self.flip = flip
+        self.start_timeout = start_timeout
+        if hasattr(multiprocessing, 'get_context'):  # python 3.4+
+            self._context = multiprocessing.get_context(start_method)
+        else:
+            self._context = multiprocessing
+        self.counters = {
+            'jobs': 0,
+            'completed': 0,
+            'failed': 0,
+            'timeouts': 0,
+            'crashes': 0,
+            'started': 0,
+        }
+        self._workers = []
+        try:
+            for _ in range(self.processes):
+                self._start_worker()
+            self._wait_ready()
+        except BaseException:
+            self.close()
+            raise
+
+    def _start_worker(self):
+        worker = _Worker(self._context, self.width, self.height, self.hints)
+        self._workers.append(worker)
+        self.counters['started'] += 1
+        return worker
+
+    def _replace(self, worker):
+        worker.kill()
+        self._workers.remove(worker)
+        return self._start_worker()
+
+    def _on_ready(self, worker, kind, value):
+        '''Handles the first message of a worker'''
+        if kind != 'ready':
+            raise RuntimeError('RenderPool worker failed to start:\n{}'.format(value))
+        worker.ready = True
+
+    def _wait_ready(self):
+        '''Waits until every worker has created its context'''
+        deadline = _timer() + self.start_timeout
+        starting = [worker for worker in self._workers if not worker.ready]
+        while starting:
+            remaining = deadline - _timer()
+            if remaining <= 0:
+                raise RuntimeError('RenderPool workers did not start within {}s'.format(self.start_timeout))
+            connections = _wait([worker.connection for worker in starting], remaining)
+            for worker in starting:
+                if worker.connection in connections:
+                    try:
+                        kind, value = worker.connection.recv()
+                    except EOFError:
+                        kind, value = 'error', 'exit code {}'.format(worker.process.exitcode)
+                    self._on_ready(worker, kind, value)
+            starting = [worker for worker in starting if not worker.ready]
+
+    @property
+    def pids(self):
+        '''list: process ids of the workers'''
+        return [worker.process.pid for worker in self._workers]
+
+    def _pixels(self, worker):
+        '''Copies the pixels of a worker's slot'''
+        np = _numpy()
+        pixels = np.frombuffer(worker.slot, dtype=np.uint8).reshape(self.height, self.width, 4)
+        return (pixels[::-1] if self.flip else pixels).copy()
+
+    def _fail(self, worker, error, counter=None):
+        index = worker.job[0]
+        worker.job = None
+        self.counters['failed'] += 1
+        if counter is not None:
+            self.counters[counter] += 1
+        return Result(index, None, None, error)
+
+    def _receive(self, worker):
+        '''Returns the result of a worker's job, or None if it is starting'''
+        try:
+            kind, value = worker.connection.recv()
+        except (EOFError, IOError, OSError):
+            worker.process.join()
+            error = 'Worker crashed (exit code {})'.format(worker.process.exitcode)
+            if not worker.ready:
+                self._workers.remove(worker)
+                worker.kill()
+                raise RuntimeError('RenderPool worker failed to start: {}'.format(error))
+            result = self._fail(worker, error, 'crashes')
+            self._replace(worker)
+            return result
+        if not worker.ready:
+            self._on_ready(worker, kind, value)
+            return None
+        if kind == 'done':
+            index = worker.job[0]
+            worker.job = None
+            self.counters['completed'] += 1
+            return Result(index, self._pixels(worker), value, None)
+        return self._fail(worker, value)
+
+    def _deadline(self, worker):
+        '''Returns when a worker's job (or start) runs out of time'''
+        if not worker.ready:
+            return worker.started + self.start_timeout
+        if worker.job is not None and self.timeout is not None:
+            return worker.job[1] + self.timeout
+        return None
+
+    def _expire(self, now):
+        '''Kills and replaces workers whose job ran out of time'''
+        results = []
+        for worker in list(self._workers):
+            deadline = self._deadline(worker)
+            if deadline is None or now <= deadline:
+                continue
+            if not worker.ready:
+                raise RuntimeError('RenderPool worker did not start within {}s'.format(self.start_timeout))
+            results.append(self._fail(worker, 'Job timed out after {}s'.format(self.timeout), 'timeouts'))
+            self._replace(worker)
+        return results
+
+    def _run(self, jobs):
+        '''Yields the Result of each (function, args, kwargs) job as it completes'''
+        jobs = enumerate(jobs)
+        # Jobs sent to workers which had died while idle
+        retry = collections.deque()
+        exhausted = False
+        try:
+            while True:
+                for worker in list(self._workers):
+                    if (exhausted and not retry) or not worker.ready or worker.job is not None:
+                        continue
+                    if retry:
+                        index, job = retry.popleft()
+                    else:
+                        try:
+                            index, job = next(jobs)
+                        except StopIteration:
+                            exhausted = True
+                            break
+                    try:
+                        worker.connection.send(job)
+                    except (IOError, OSError):
+                        # The job never ran; it goes to the next idle worker
+                        retry.append((index, job))
+                        self._replace(worker)
+                        continue
+                    worker.job = (index, _timer())
+                    self.counters['jobs'] += 1
+                busy = [worker for worker in self._workers if worker.job is not None or not worker.ready]
+                if exhausted and not retry and not any(worker.job is not None for worker in busy):
+                    return
+
+                deadlines = [deadline for deadline in map(self._deadline, busy) if deadline is not None]
+                timeout = max(0.0, min(deadlines) - _timer()) if deadlines else None
+                connections = _wait([worker.connection for worker in busy], timeout)
+                for worker in busy:
+                    if worker.connection in connections:
+                        result = self._receive(worker)
+                        if result is not None:
+                            yield result
+                for result in self._expire(_timer()):
+                    yield result
+        finally:
+            self._abandon()
+
+    def _abandon(self):
+        '''Replaces workers still running jobs of an abandoned batch'''
+        for worker in list(self._workers):
+            if worker.job is not None:
+                worker.job = None
+                self._replace(worker)
+
+    def imap_unordered(self, function, iterable):
+        '''Renders function(item) for each item, yielding Results as they complete'''
+        return self._run((function, (item, ), {}) for item in iterable)
+
+    def map(self, function, iterable):
+        '''Renders function(item) for each item
+
+        Returns:
+            list: pixels of each job in the order of the items
+
+        Raises:
+            RuntimeError: if a job failed
+        '''
+        items = list(iterable)
+        pixels = [None] * len(items)
+        for result in self.imap_unordered(function, items):
+            if result.error is not None:
+                raise RuntimeError('RenderPool job {} failed: {}'.format(result.index, result.error))
+            pixels[result.index] = result.pixels
+        return pixels
+
+    def render(self, function, *args, **kwargs):
+        '''Renders function(*args, **kwargs) on a worker
+
+        Returns:
+            Result: pixels, the value returned by the function and any error
+        '''
+        for result in self._run([(function, args, kwargs)]):
+            return result
+
+    def close(self):
+        '''Stops the workers'''
+        for worker in self._workers:
+            worker.stop(timeout=5.0)
+        self._workers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self._workers)
+
+    def __repr__(self):
+        cname = self.__class__.__name__
+        string = '<{cname} processes={processes} {width}x{height} completed={completed}>'
+        return string.format(cname=cname, processes=len(self._workers), width=self.width, height=self.height,
+                             completed=self.counters['completed'])
@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+'''
+Batched, per-frame input polling into preallocated numpy arrays
+
+Rather than calling get_key for each key of interest every frame,
+an InputSnapshot polls a fixed set of keys, the mouse buttons and the
+cursor position in one pass.  States are written into buffers that are
+reused every frame, and questions like "which keys were pressed since
+the last frame" are answered by comparing arrays.
+
+Usage:
+
+    >>> snapshot = glfw.InputSnapshot.capture(win, keys=[glfw.KEY_W, glfw.KEY_A])
+    >>> while not glfw.window_should_close(win):
+    ...     glfw.poll_events()
+    ...     snapshot.update()
+    ...     for key in snapshot.pressed_keys():
+    ...         print(glfw.get_key_string(key))
+
+numpy is required to use this module, but is only imported when a
+snapshot is created.
+'''
+from __future__ import absolute_import, division, print_function, unicode_literals  # noqa
+
+from . import raw
+
+np = None
+
+
+def _numpy():
+    '''Imports numpy on first use'''
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError('numpy is required for this feature:  pip install numpy')
+        np = numpy
+    return np
+
+
+def get_keys():
+    '''Returns every named glfw key'''
+    keys = {
+        value
+        for name, value in raw.snake.__dict__.items()
+        if name.startswith('KEY_') and name not in ('KEY_UNKNOWN', 'KEY_LAST')
+    }
+    return sorted(keys)
+
+
+def get_mouse_buttons():
+    '''Returns every glfw mouse button'''
+    return list(range(raw.snake.MOUSE_BUTTON_1, raw.snake.MOUSE_BUTTON_LAST + 1))
+
+
+class _StateBuffers(object):
+    '''Current and previous uint8 states for a fixed set of glfw inputs
+
+    Both buffers are cffi arrays viewed by numpy so they can be filled by
+    glfw without copies.  update swaps them rather than copying current
+    into previous.
+    '''
+
+    def __init__(self, values):
+        np = _numpy()
+        ffi = raw._ffi
+        self.values = np.array(values, dtype=np.int32)
+        count = len(self.values)
+        self._values = [int(value) for value in self.values]
+        self._c_values = ffi.new('int[]', self._values or [0])
+        self._c_states = [ffi.new('unsigned char[]', max(count, 1)) for _ in range(2)]
+        self._views = [
+            np.frombuffer(ffi.buffer(c_states), dtype=np.uint8)[:count]
+            for c_states in self._c_states
+        ]
+        self._index = 0
+
+    def swap(self):
+        '''Makes the current states the previous states; returns the new current buffer'''
+        self._index ^= 1
+        return self._c_states[self._index]
+
+    @property
+    def current(self):
+        return self._views[self._index]
+
+    @property
+    def previous(self):
+        return self._views[self._index ^ 1]
+
+    def down(self):
+        return self.values[self.current != 0]
+
+    def changed(self):
+        return self.values[self.current != self.previous]
+
+    def pressed(self):
+        return self.values[(self.current != 0) & (self.previous == 0)]
+
+    def released(self):
+        return self.values[(self.current == 0) & (self.previous != 0)]
+
+
+class InputSnapshot(object):
+    '''Polls keys, mouse buttons and the cursor position of a window
+
+    Args:
+        window(ffi.CData): window handle
+        keys(list): keys to poll [default: every named key]
+        mouse_buttons(list): mouse buttons to poll [default: all]
+
+    Attributes:
+        keys(numpy.ndarray): keys polled (int32)
+        mouse_buttons(numpy.ndarray): mouse buttons polled (int32)
+        frame(int): number of updates so far
+    '''
+
+    def __init__(self, window, keys=None, mouse_buttons=None):
+        np = _numpy()
+        ffi = raw._ffi
+        self.window = window
+        self._keys = _StateBuffers(get_keys() if keys is None else keys)
+        self._buttons = _StateBuffers(get_mouse_buttons() if mouse_buttons is None else mouse_buttons)
+        self.keys = self._keys.values
+        self.mouse_buttons = self._buttons.values
+        self._c_cursor = [ffi.new('double[2]') for _ in range(2)]
+        self._cursor = [np.frombuffer(ffi.buffer(c_cursor), dtype=np.float64) for c_cursor in self._c_cursor]
+        self._cursor_index = 0
+        self.frame = 0
+
+        # The compiled extension polls states in C; otherwise loop in python
+        self._get_key = raw._glfw.glfwGetKey
+        self._get_mouse_button = raw._glfw.glfwGetMouseButton
+        self._get_cursor_pos = raw._glfw.glfwGetCursorPos
+        self._get_keys = getattr(raw._glfw, '_glfw_cffi_get_keys', None)
+        self._get_mouse_buttons = getattr(raw._glfw, '_glfw_cffi_get_mouse_buttons', None)
+
+    @classmethod
+    def capture(cls, window, keys=None, mouse_buttons=None):
+        '''Creates a snapshot and polls the current input state
+
+        Call update on the returned snapshot every frame afterwards.
+        '''
+        snapshot = cls(window, keys=keys, mouse_buttons=mouse_buttons)
+        snapshot.update()
+        return snapshot
+
+    def _poll(self, buffers, batch_func, func):
+        '''Fills the next buffer of states'''
+        window = self.window
+        c_states = buffers.swap()
+        count = len(buffers.values)
+        if batch_func is not None:
+            batch_func(window, buffers._c_values, c_states, count)
+        else:
+            c_states[0:count] = [func(window, value) for value in buffers._values]
+
+    def update(self):
+        '''Polls input; the previous states become available for comparison
+
+        Note:  glfw only updates its input state while processing events,
+            so this is usually called after poll_events.
+
+        Returns:
+            InputSnapshot: self
+        '''
+        self._poll(self._keys, self._get_keys, self._get_key)
+        self._poll(self._buttons, self._get_mouse_buttons, self._get_mouse_button)
+        self._cursor_index ^= 1
+        c_cursor = self._c_cursor[self._cursor_index]
+        self._get_cursor_pos(self.window, c_cursor, c_cursor + 1)
+        if not self.frame:
+            # No movement on the first update
+            self.previous_cursor[:] = self.cursor
+        self.frame += 1
+        return self
+
+    @property
+    def key_states(self):
+        '''numpy.ndarray: uint8 state (glfw.PRESS or glfw.RELEASE) per key'''
+        return self._keys.current
+
+    @property
+    def previous_key_states(self):
+        return self._keys.previous
+
+    @property
+    def mouse_button_states(self):
+        '''numpy.ndarray: uint8 state (glfw.PRESS or glfw.RELEASE) per mouse button'''
+        return self._buttons.current
+
+    @property
+    def previous_mouse_button_states(self):
+        return self._buttons.previous
+
+    @property
+    def cursor(self):
+        '''numpy.ndarray: cursor position [x, y] (float64)'''
+        return self._cursor[self._cursor_index]
+
+    @property
+    def previous_cursor(self):
+        return self._cursor[self._cursor_index ^ 1]
+
+    @property
+    def cursor_delta(self):
+        '''numpy.ndarray: cursor movement since the last update'''
+        return self.cursor - self.previous_cursor
+
+    def keys_down(self):
+        '''Returns keys currently held down'''
+        return self._keys.down()
+
+    def changed_keys(self):
+        '''Returns keys whose state changed since the last update'''
+        return self._keys.changed()
+
+    def pressed_keys(self):
+        '''Returns keys pressed since the last update'''
+        return self._keys.pressed()
+
+    def released_keys(self):
+        '''Returns keys released since the last update'''
+        return self._keys.released()
+
+    def mouse_buttons_down(self):
+        '''Returns mouse buttons currently held down'''
+        return self._buttons.down()
+
+    def changed_mouse_buttons(self):
+        '''Returns mouse buttons whose state changed since the last update'''
+        return self._buttons.changed()
+
+    def pressed_mouse_buttons(self):
+        '''Returns mouse buttons pressed since the last update'''
+        return self._buttons.pressed()
+
+    def released_mouse_buttons(self):
+        '''Returns mouse buttons released since the last update'''
+        return self._buttons.released()
+
+    def __repr__(self):
+        cname = self.__class__.__name__
+        string = '<{cname} frame={frame} keys={keys} mouse_buttons={buttons} cursor={cursor}>'
+        return string.format(
+            cname=cname,
+            frame=self.frame,
+            keys=len(self.keys),
+            buttons=len(self.mouse_buttons),
+            cursor=tuple(float(value) for value in self.cursor),
+        )
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+'''
+Bulk joystick polling into preallocated numpy arrays
+
+Polling every joystick slot with glfw.joystick_present,
+glfw.get_joystick_axes and glfw.get_joystick_buttons takes 48 calls per
+frame, each converting its C array element by element.  A
+JoystickPoller keeps which slots are connected (and their names) cached
+until glfw reports a connection change, and copies the axes and buttons
+of connected joysticks straight from glfw's arrays into preallocated
+numpy arrays with ffi.memmove.
+
+Usage:
+
+    >>> state = glfw.joysticks.poll_all()
+    >>> for joy in state.present.nonzero()[0]:
+    ...     print(state.names[joy], state.axes[joy], state.buttons[joy])
+
+Attributes of a poller (and of the state returned by poll_all):
+
+    axes(numpy.ndarray): (16, max_axes) float32 axis positions
+    buttons(numpy.ndarray): (16, max_buttons) uint8 button states
+    present(numpy.ndarray): (16, ) bool connected joysticks
+    axis_counts(numpy.ndarray): (16, ) int32 axes copied per joystick
+    button_counts(numpy.ndarray): (16, ) int32 buttons copied per joystick
+    names(list): name of each connected joystick, or None
+
+The arrays are overwritten by the next poll; copy them to keep them.
+
+glfw-cffi keeps its own joystick callback installed to know when to
+refresh the cache; use glfw.set_joystick_callback to be notified too.
+numpy is required to use this module, but is only imported when a
+poller is created.
+'''
+from __future__ import absolute_import, division, print_function, unicode_literals  # noqa
+
+from . import raw
+from .input import _numpy
+from .raw import decorators, snake
+
+count = snake.JOYSTICK_LAST + 1
+
+
+class _JoystickRegistry(object):
+    '''Installs the joystick callback and counts connection changes'''
+
+    def __init__(self):
+        self._generation = None
+        self.changes = 0
+        self.user_callback = None
+        self._callback = decorators.joystick_callback(self._on_joystick)
+
+    def _on_joystick(self, joy, event):
+        self.changes += 1
+        if self.user_callback is not None:
+            self.user_callback(joy, event)
+
+    def check(self):
+        '''Installs the callback the first time it is used after glfw init
+
+        Returns:
+            int: a number which changes whenever joysticks may have been
+                connected or disconnected
+        '''
+        if self._generation != raw._init_count[0]:
+            raw._ensure_init()
+            self._generation = raw._init_count[0]
+            self.changes += 1
+            raw._glfw.glfwSetJoystickCallback(self._callback)
+        return self.changes
+
+
+_joysticks = _JoystickRegistry()
+
+
+def set_joystick_callback(cbfun):
+    '''Sets the joystick configuration callback
+
+    glfw-cffi keeps its own joystick callback installed to keep cached
+    joystick information current, and calls cbfun from it.  Setting the
+    callback through glfw.core bypasses this.
+
+    Args:
+        cbfun: callback taking (joy, event) or None to remove it
+
+    Returns:
+        the previous callback or None
+    '''
+    _joysticks.check()
+    previous, _joysticks.user_callback = _joysticks.user_callback, cbfun
+    return previous
+
+
+class JoystickPoller(object):
+    '''Polls every joystick slot into preallocated arrays
+
+    Args:
+        max_axes(int): axes kept per joystick; extra axes are ignored
+        max_buttons(int): buttons kept per joystick; extra buttons are ignored
+        rescan(int): polls between re-checking which slots are connected,
+            for platforms which only report connections when a joystick
+            is queried; 0 relies on the joystick callback alone
+
+    Attributes:
+        counters(dict): polls, scans of the connected slots, and glfw
+            calls made
+    '''
+
+    def __init__(self, max_axes=8, max_buttons=32, rescan=60):
+        np = _numpy()
+        ffi = raw._ffi
+        self.max_axes = int(max_axes)
+        self.max_buttons = int(max_buttons)
+        self.rescan = int(rescan)
+        self.axes = np.zeros((count, self.max_axes), dtype=np.float32)
+        self.buttons = np.zeros((count, self.max_buttons), dtype=np.uint8)
+        self.present = np.zeros(count, dtype=bool)
+        self.axis_counts = np.zeros(count, dtype=np.int32)
+        self.button_counts = np.zeros(count, dtype=np.int32)
+        self.names = [None] * count
+        self._axes = ffi.cast('float *', ffi.from_buffer(self.axes))
+        self._buttons = ffi.cast('unsigned char *', ffi.from_buffer(self.buttons))
+        self._count = ffi.new('int *')
+        self._connected = ()
+        self._changes = None
+        self._polls_since_scan = 0
+        self.counters = {
+            'polls': 0,
+            'scans': 0,
+            'calls': 0,
+        }
+
+    def scan(self):
+        '''Refreshes which slots are connected and their names'''
+        glfw = raw._glfw
+        ffi = raw._ffi
+        connected = []
+        for joy in range(count):
+            present = bool(glfw.glfwJoystickPresent(joy))
+            if present:
+                connected.append(joy)
+                if not self.present[joy] or self.names[joy] is None:
+                    name = glfw.glfwGetJoystickName(joy)
+                    self.names[joy] = ffi.string(name).decode('utf-8') if name != ffi.NULL else ''
+            else:
+                self.names[joy] = None
+                self._clear(joy)
+            self.present[joy] = present
+        self._connected = tuple(connected)
+        self._polls_since_scan = 0
+        self.counters['scans'] += 1
+        self.counters['calls'] += count
+
+    def _clear(self, joy):
+        self.axes[joy] = 0.0
+        self.buttons[joy] = 0
+        self.axis_counts[joy] = 0
+        self.button_counts[joy] = 0
+
+    def _copy(self, joy, source, size, array, pointer, counts, itemsize):
+        '''Copies an array returned by glfw into the row of a joystick'''
+        limit = array.shape[1]
+        copied = min(size, limit)
+        if source != raw._ffi.NULL and copied:
+            raw._ffi.memmove(pointer + joy * limit, source, copied * itemsize)
+        if counts[joy] > copied:
+            # Zero inputs left over from a joystick with more of them
+            array[joy, copied:counts[joy]] = 0
+        counts[joy] = copied
+
+    def poll(self):
+        '''Copies the axes and buttons of every connected joystick
+
+        Returns:
+            JoystickPoller: self
+        '''
+        changes = _joysticks.check()
+        if changes != self._changes or (self.rescan and self._polls_since_scan >= self.rescan):
+            self._changes = changes
+            self.scan()
+        glfw = raw._glfw
+        count_pointer = self._count
+        disconnected = []
+        for joy in self._connected:
+            axes = glfw.glfwGetJoystickAxes(joy, count_pointer)
+            if axes == raw._ffi.NULL:
+                disconnected.append(joy)
+                continue
+            self._copy(joy, axes, count_pointer[0], self.axes, self._axes, self.axis_counts, 4)
+            buttons = glfw.glfwGetJoystickButtons(joy, count_pointer)
+            self._copy(joy, buttons, count_pointer[0], self.buttons, self._buttons, self.button_counts, 1)
+        self.counters['calls'] += 2 * len(self._connected)
+        if disconnected:
+            # Disconnected between scans
+            for joy in disconnected:
+                self.present[joy] = False
+                self.names[joy] = None
+                self._clear(joy)
+            self._connected = tuple(joy for joy in self._connected if joy not in disconnected)
+        self._polls_since_scan += 1
+        self.counters['polls'] += 1
+        return self
+
+    def __repr__(self):
+        cname = self.__class__.__name__
+        string = '<{cname} present={present} polls={polls}>'
+        return string.format(cname=cname, present=list(self._connected), polls=self.counters['polls'])
+
+
+_poller = [None]
+
+
+def poll_all():
+    '''Polls every joystick slot with a shared JoystickPoller
+
+    Returns:
+        JoystickPoller: the shared poller holding the arrays
+    '''
+    if _poller[0] is None:
+        _poller[0] = JoystickPoller()
+    return _poller[0].poll()
+
+
+def get_names():
+    '''Returns the cached name of each joystick slot, or None if disconnected'''
+    if _poller[0] is None:
+        poll_all()
+    return list(_poller[0].names)
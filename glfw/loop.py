@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+'''
+Render loop which only redraws when something changed
+
+The usual loop (render, swap_buffers, poll_events) redraws static
+content as fast as it can and keeps a core busy.  A RenderLoop keeps a
+dirty flag instead: it is set by the window's input, resize and refresh
+callbacks, by timers and by invalidate().  A frame is rendered only
+when the flag is set; otherwise the loop sleeps in glfw.wait_events, or
+glfw.wait_events_timeout until the next timer is due.
+
+Usage:
+
+    >>> loop = glfw.RenderLoop(win, render)  # render() draws a frame
+    >>> loop.call_every(1.0, update_clock)  # redraws every second
+    >>> loop.run()  # until the window should close
+    >>> loop.counters
+    {'rendered': 12, 'skipped': 0, 'waits': 12, 'timers': 10}
+
+The loop chains the callbacks set on the window when attached: they are
+still called, after the loop marks itself dirty.  Callbacks set after
+the loop is attached replace the loop's; such callbacks (and code on
+other threads) call invalidate() to request a frame.
+'''
+from __future__ import absolute_import, division, print_function, unicode_literals  # noqa
+
+import heapq
+import itertools
+import threading
+
+from . import raw
+from .events import _check_types, _get_setter, _set_callbacks
+
+
+class Timer(object):
+    '''A function scheduled by RenderLoop.call_later or call_every
+
+    Attributes:
+        when(float): glfw time at which the timer is due
+        interval(float): seconds between calls; None for a single call
+        cancelled(bool): the timer will not be called again
+    '''
+
+    def __init__(self, when, interval, function, args):
+        self.when = when
+        self.interval = interval
+        self.function = function
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class RenderLoop(object):
+    '''Renders a window only when it is dirty
+
+    Args:
+        window(ffi.CData): window handle; its context must be current
+        render: function called without arguments to draw a frame
+        types(list): event type names marking the window dirty
+            [default: all]
+        swap(bool): call swap_buffers after each frame
+
+    Attributes:
+        dirty(bool): a frame will be rendered on the next step
+        counters(dict): frames rendered, wakes which did not need a
+            frame (skipped), waits for events and timers called
+    '''
+
+    def __init__(self, window, render, types=None, swap=True):
+        types = _check_types(types)
+        self.window = window
+        self.types = types
+        self.swap = swap
+        self.dirty = True
+        self._render = render
+        self._timers = []
+        self._sequence = itertools.count()
+        self._callbacks = {}
+        self._previous = {}
+        self._thread = threading.current_thread()
+        self.counters = {
+            'rendered': 0,
+            'skipped': 0,
+            'waits': 0,
+            'timers': 0,
+        }
+
+    def invalidate(self):
+        '''Marks the window dirty; safe to call from any thread'''
+        self.dirty = True
+        if threading.current_thread() is not self._thread:
+            raw._glfw.glfwPostEmptyEvent()
+
+    def _get_handler(self, name):
+        def handler(window, *args):
+            self.dirty = True
+            chained = self._previous.get(name)
+            if chained is not None:
+                chained(window, *args)
+
+        return handler
+
+    def attach(self):
+        '''Sets the callbacks marking the window dirty, chaining those already set'''
+        if not self._callbacks:
+            self._callbacks, self._previous = _set_callbacks(self.window, self.types, self._get_handler)
+        return self
+
+    def detach(self):
+        '''Restores the callbacks set before attach'''
+        for name, previous in self._previous.items():
+            _get_setter(name)(self.window, raw._ffi.NULL if previous is None else previous)
+        self._callbacks = {}
+        self._previous = {}
+
+    def call_later(self, delay, function=None, *args):
+        '''Calls function(*args) after delay seconds and marks the window dirty
+
+        Returns:
+            Timer: call cancel() to stop it
+        '''
+        return self._schedule(delay, None, function, args)
+
+    def call_every(self, interval, function=None, *args):
+        '''Calls function(*args) every interval seconds and marks the window dirty
+
+        Returns:
+            Timer: call cancel() to stop it
+        '''
+        return self._schedule(interval, interval, function, args)
+
+    def _schedule(self, delay, interval, function, args):
+        timer = Timer(raw._glfw.glfwGetTime() + delay, interval, function, args)
+        heapq.heappush(self._timers, (timer.when, next(self._sequence), timer))
+        return timer
+
+    def _next_timeout(self, now):
+        '''Returns seconds until the next timer is due, or None without timers'''
+        timers = self._timers
+        while timers and timers[0][2].cancelled:
+            heapq.heappop(timers)
+        if not timers:
+            return None
+        return max(0.0, timers[0][0] - now)
+
+    def _run_timers(self, now):
+        '''Calls the timers which are due'''
+        timers = self._timers
+        while timers and timers[0][0] <= now:
+            _, _, timer = heapq.heappop(timers)
+            if timer.cancelled:
+                continue
+            if timer.function is not None:
+                timer.function(*timer.args)
+            self.counters['timers'] += 1
+            self.dirty = True
+            if timer.interval is not None and not timer.cancelled:
+                # Skip missed intervals rather than firing them in a burst
+                timer.when += timer.interval * (int((now - timer.when) // timer.interval) + 1)
+                heapq.heappush(timers, (timer.when, next(self._sequence), timer))
+
+    def step(self):
+        '''Renders a frame if dirty, otherwise waits for events or timers
+
+        Returns:
+            bool: True if a frame was rendered
+        '''
+        glfw = raw._glfw
+        self._run_timers(glfw.glfwGetTime())
+        if self.dirty:
+            self.dirty = False
+            self._render()
+            if self.swap:
+                glfw.glfwSwapBuffers(self.window)
+            self.counters['rendered'] += 1
+            # Events arriving while rendering mark the next frame dirty
+            glfw.glfwPollEvents()
+            return True
+
+        timeout = self._next_timeout(glfw.glfwGetTime())
+        self.counters['waits'] += 1
+        if timeout is None:
+            glfw.glfwWaitEvents()
+        else:
+            glfw.glfwWaitEventsTimeout(timeout)
+        self._run_timers(glfw.glfwGetTime())
+        if not self.dirty:
+            self.counters['skipped'] += 1
+        return False
+
+    def run(self):
+        '''Runs until the window should close'''
+        self._thread = threading.current_thread()
+        self.attach()
+        try:
+            while not raw._glfw.glfwWindowShouldClose(self.window):
+                self.step()
+        finally:
+            self.detach()
+
+    def __repr__(self):
+        cname = self.__class__.__name__
+        string = '<{cname} rendered={rendered} skipped={skipped}>'
+        return string.format(cname=cname, **self.counters)
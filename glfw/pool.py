@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+'''
+Pool of hidden windows for short-lived offscreen rendering
+
+Creating an OpenGL context is expensive (especially with Mesa), so jobs
+that render a little offscreen and throw the window away spend most of
+their time in glfw.create_window.  A ContextPool keeps warm hidden
+windows whose contexts share objects (textures, buffers, shaders) with
+one another and hands them out with the context made current.  When a
+window is returned, the default framebuffer, viewport and common
+capabilities are reset so the next job starts from a known state.
+
+Usage:
+
+    >>> pool = glfw.ContextPool(size=4, width=256, height=256)
+    >>> with pool.context() as win:
+    ...     render()
+    >>> pool.metrics
+    {'hits': 1, 'misses': 0, ...}
+    >>> pool.close()
+
+Note:  glfw only allows windows to be created and destroyed on the main
+thread; contexts leased from a pool may be used on any thread.  Only
+the state listed in ContextPool.reset is restored; jobs that change
+other state must restore it themselves.
+'''
+from __future__ import absolute_import, division, print_function, unicode_literals  # noqa
+
+import contextlib
+import threading
+from timeit import default_timer as _timer
+
+from . import api, raw
+from .raw import snake
+
+# OpenGL enumerations used to reset state
+_GL_FRAMEBUFFER = 0x8D40
+_GL_COLOR_BUFFER_BIT = 0x4000
+_GL_DEPTH_BUFFER_BIT = 0x0100
+_GL_STENCIL_BUFFER_BIT = 0x0400
+_GL_CAPABILITIES = (
+    0x0B71,  # GL_DEPTH_TEST
+    0x0BE2,  # GL_BLEND
+    0x0C11,  # GL_SCISSOR_TEST
+    0x0B90,  # GL_STENCIL_TEST
+    0x0B44,  # GL_CULL_FACE
+)
+
+_gl_functions = (
+    ('glBindFramebuffer', 'void (*)(unsigned int, unsigned int)'),
+    ('glBindVertexArray', 'void (*)(unsigned int)'),
+    ('glUseProgram', 'void (*)(unsigned int)'),
+    ('glViewport', 'void (*)(int, int, int, int)'),
+    ('glDisable', 'void (*)(unsigned int)'),
+    ('glClearColor', 'void (*)(float, float, float, float)'),
+    ('glClear', 'void (*)(unsigned int)'),
+)
+
+
+def _get_gl_functions(gl_functions=_gl_functions, required=False):
+    '''Returns OpenGL functions of the current context by name
+
+    Also used by the workers of glfw.farm.
+
+    Args:
+        gl_functions(tuple): (name, cffi function pointer type) pairs
+        required(bool): raise for functions the context does not
+            provide rather than leaving them out
+
+    Raises:
+        RuntimeError: if a required function is not available
+    '''
+    functions = {}
+    for name, ctype in gl_functions:
+        proc = raw._glfw.glfwGetProcAddress(name.encode('utf-8'))
+        if proc != raw._ffi.NULL:
+            functions[name] = raw._ffi.cast(ctype, proc)
+        elif required:
+            raise RuntimeError('{} is not available in the current OpenGL context'.format(name))
+    return functions
+
+
+class ContextPool(object):
+    '''Keeps warm hidden windows sharing one OpenGL share group
+
+    Args:
+        size(int): number of idle windows kept warm
+        width(int): width of the windows
+        height(int): height of the windows
+        hints(dict): window hints applied before creating each window
+        share: window whose context objects are shared [default: the
+            first window of the pool]
+        warm(bool): create size windows immediately
+
+    Attributes:
+        metrics(dict): leases served from idle windows (hits), leases
+            that created a window (misses), windows created and
+            destroyed, and the total and maximum creation latency
+    '''
+
+    def __init__(self, size=4, width=1, height=1, hints=None, share=None, warm=True):
+        self.size = int(size)
+        self.width = width
+        self.height = height
+        self.hints = dict(hints or {})
+        self.share = share
+        self._owns_share = share is None
+        self._idle = []
+        self._leased = set()
+        self._lock = threading.Lock()
+        self._gl = {}
+        self.metrics = {
+            'hits': 0,
+            'misses': 0,
+            'created': 0,
+            'destroyed': 0,
+            'creation_seconds': 0.0,
+            'max_creation_seconds': 0.0,
+        }
+        if warm:
+            self.warm()
+
+    @property
+    def mean_creation_seconds(self):
+        '''float: average time spent creating a window'''
+        created = self.metrics['created']
+        return self.metrics['creation_seconds'] / created if created else 0.0
+
+    def _create(self):
+        '''Creates a hidden window within the share group'''
+        raw._glfw.glfwDefaultWindowHints()
+        raw._glfw.glfwWindowHint(snake.VISIBLE, 0)
+        raw._glfw.glfwWindowHint(snake.FOCUSED, 0)
+        for hint, value in self.hints.items():
+            raw._glfw.glfwWindowHint(hint, value)
+        start = _timer()
+        try:
+            win = api.create_window(
+                self.width, self.height, 'ContextPool', monitor=raw._ffi.NULL, context=self.share,
+                raise_exception=True)
+        finally:
+            raw._glfw.glfwDefaultWindowHints()
+        elapsed = _timer() - start
+        metrics = self.metrics
+        metrics['created'] += 1
+        metrics['creation_seconds'] += elapsed
+        metrics['max_creation_seconds'] = max(metrics['max_creation_seconds'], elapsed)
+        if self.share is None:
+            self.share = win
+        return win
+
+    def warm(self):
+        '''Creates idle windows until size windows are idle'''
+        with self._lock:
+            missing = self.size - len(self._idle)
+        for _ in range(missing):
+            win = self._create()
+            with self._lock:
+                self._idle.append(win)
+        return self
+
+    def acquire(self):
+        '''Leases a window; creates one when none are idle
+
+        Returns:
+            ffi.CData: window handle; not made current
+        '''
+        with self._lock:
+            win = self._idle.pop() if self._idle else None
+            if win is not None:
+                self.metrics['hits'] += 1
+            else:
+                self.metrics['misses'] += 1
+        if win is None:
+            win = self._create()
+        with self._lock:
+            self._leased.add(win)
+        return win
+
+    def reset(self, win):
+        '''Restores the default state of the current context of win
+
+        Binds the default framebuffer, vertex array and program, sets the
+        viewport to the framebuffer size, disables depth, blend, scissor,
+        stencil and face culling tests and clears to transparent black.
+        '''
+        gl = self._gl
+        if not gl:
+            gl.update(_get_gl_functions())
+        if 'glBindFramebuffer' in gl:
+            gl['glBindFramebuffer'](_GL_FRAMEBUFFER, 0)
+        if 'glBindVertexArray' in gl:
+            gl['glBindVertexArray'](0)
+        if 'glUseProgram' in gl:
+            gl['glUseProgram'](0)
+        if 'glViewport' in gl:
+            width, height = raw._ffi.new('int *'), raw._ffi.new('int *')
+            raw._glfw.glfwGetFramebufferSize(win, width, height)
+            gl['glViewport'](0, 0, width[0], height[0])
+        if 'glDisable' in gl:
+            for capability in _GL_CAPABILITIES:
+                gl['glDisable'](capability)
+        if 'glClearColor' in gl:
+            gl['glClearColor'](0.0, 0.0, 0.0, 0.0)
+        if 'glClear' in gl:
+            gl['glClear'](_GL_COLOR_BUFFER_BIT | _GL_DEPTH_BUFFER_BIT | _GL_STENCIL_BUFFER_BIT)
+
+    def release(self, win):
+        '''Returns a leased window to the pool
+
+        The window state is reset and the window is kept idle, or
+        destroyed when size windows are already idle.
+        '''
+        with self._lock:
+            self._leased.discard(win)
+        current = raw._glfw.glfwGetCurrentContext()
+        raw._glfw.glfwMakeContextCurrent(win)
+        try:
+            self.reset(win)
+        finally:
+            raw._glfw.glfwMakeContextCurrent(raw._ffi.NULL if current == win else current)
+        with self._lock:
+            keep = len(self._idle) < self.size or win == self.share
+            if keep:
+                self._idle.append(win)
+        if not keep:
+            self._destroy(win)
+
+    @contextlib.contextmanager
+    def context(self):
+        '''Leases a window with its context made current
+
+        The previously current context is made current again afterwards.
+
+        Yields:
+            ffi.CData: window handle
+        '''
+        current = raw._glfw.glfwGetCurrentContext()
+        win = self.acquire()
+        try:
+            raw._glfw.glfwMakeContextCurrent(win)
+            yield win
+        finally:
+            self.release(win)
+            raw._glfw.glfwMakeContextCurrent(current)
+
+    def _destroy(self, win):
+        api.destroy_window(win)
+        self.metrics['destroyed'] += 1
+
+    def close(self):
+        '''Destroys the idle windows and the share window of the pool
+
+        Leased windows are left to their users.
+        '''
+        with self._lock:
+            idle, self._idle = self._idle, []
+        share = self.share if self._owns_share else None
+        for win in idle:
+            if win != share:
+                self._destroy(win)
+        if share is not None and share not in self._leased:
+            self._destroy(share)
+            self.share = None
+        self._gl.clear()
+
+    def __len__(self):
+        return len(self._idle)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __repr__(self):
+        cname = self.__class__.__name__
+        string = '<{cname} idle={idle} leased={leased} hits={hits} misses={misses}>'
+        return string.format(
+            cname=cname, idle=len(self._idle), leased=len(self._leased),
+            hits=self.metrics['hits'], misses=self.metrics['misses'])
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+'''
+OpenGL context capability probe
+
+Finding the highest OpenGL version a machine supports used to mean
+creating a window for every (major, minor) pair from 4.5 down to 1.0
+until one succeeded.  probe_context_versions reads the version of the
+context glfw actually created, which drivers commonly report as the
+highest version they support, and then binary searches the versions
+above it.  Results are cached in-process per display and glfw version,
+and on disk (see glfw.cache) per display, glfw version and driver.
+
+Usage:
+
+    >>> info = glfw.probe_context_versions()
+    >>> major, minor = info.core or info.compat
+    >>> glfw.window_hint(glfw.CONTEXT_VERSION_MAJOR, major)
+    >>> glfw.window_hint(glfw.CONTEXT_VERSION_MINOR, minor)
+
+Note:  Probing creates hidden windows, so it must run on the main
+thread.  The window hints are reset to their defaults afterwards.
+'''
+from __future__ import absolute_import, division, print_function, unicode_literals  # noqa
+
+import os
+import sys
+from collections import namedtuple
+
+from . import cache, raw
+from .raw import snake
+
+ContextInfo = namedtuple('ContextInfo', ['core', 'compat', 'vendor', 'renderer', 'version'])
+
+versions = (
+    (1, 0), (1, 1), (1, 2), (1, 3), (1, 4), (1, 5),
+    (2, 0), (2, 1),
+    (3, 0), (3, 1), (3, 2), (3, 3),
+    (4, 0), (4, 1), (4, 2), (4, 3), (4, 4), (4, 5), (4, 6),
+)
+core_versions = tuple(version for version in versions if version >= (3, 2))
+
+_GL_VENDOR = 0x1F00
+_GL_RENDERER = 0x1F01
+_GL_VERSION = 0x1F02
+
+_results = {}
+_cache_name = 'context-versions'
+
+
+def _get_key():
+    '''Returns what identifies a probe result before any context exists'''
+    display = os.environ.get('WAYLAND_DISPLAY') or os.environ.get('DISPLAY') or ''
+    return {
+        'platform': sys.platform,
+        'display': display,
+        'glfw': raw._ffi.string(raw._glfw.glfwGetVersionString()).decode('utf-8'),
+    }
+
+
+def _get_strings():
+    '''Returns vendor, renderer and version of the current context'''
+    proc = raw._glfw.glfwGetProcAddress(b'glGetString')
+    if proc == raw._ffi.NULL:
+        return {}
+    gl_get_string = raw._ffi.cast('const unsigned char *(*)(unsigned int)', proc)
+    strings = {}
+    for name, value in (('vendor', _GL_VENDOR), ('renderer', _GL_RENDERER), ('version', _GL_VERSION)):
+        string = gl_get_string(value)
+        if string != raw._ffi.NULL:
+            strings[name] = raw._ffi.string(raw._ffi.cast('char *', string)).decode('utf-8', 'replace')
+    return strings
+
+
+def _try_version(version, core, strings=None):
+    '''Creates a hidden 1x1 window with an OpenGL context
+
+    Args:
+        version(tuple): requested (major, minor) version
+        core(bool): request a core profile instead of a compatibility one
+        strings(dict): filled with vendor, renderer and version strings
+            of the created context when given and empty
+
+    Returns:
+        tuple: (major, minor) of the created context or None on failure
+    '''
+    glfw = raw._glfw
+    major, minor = version
+    if core:
+        profile = snake.OPENGL_CORE_PROFILE
+    else:
+        profile = snake.OPENGL_ANY_PROFILE if version < (3, 2) else snake.OPENGL_COMPAT_PROFILE
+    glfw.glfwDefaultWindowHints()
+    glfw.glfwWindowHint(snake.VISIBLE, 0)
+    glfw.glfwWindowHint(snake.FOCUSED, 0)
+    glfw.glfwWindowHint(snake.CLIENT_API, snake.OPENGL_API)
+    glfw.glfwWindowHint(snake.CONTEXT_VERSION_MAJOR, major)
+    glfw.glfwWindowHint(snake.CONTEXT_VERSION_MINOR, minor)
+    glfw.glfwWindowHint(snake.OPENGL_PROFILE, profile)
+    glfw.glfwWindowHint(snake.OPENGL_FORWARD_COMPAT, 1 if core else 0)
+    window = glfw.glfwCreateWindow(1, 1, b'', raw._ffi.NULL, raw._ffi.NULL)
+    if window == raw._ffi.NULL:
+        return None
+    try:
+        created = (
+            glfw.glfwGetWindowAttrib(window, snake.CONTEXT_VERSION_MAJOR),
+            glfw.glfwGetWindowAttrib(window, snake.CONTEXT_VERSION_MINOR),
+        )
+        if strings is not None and not strings:
+            glfw.glfwMakeContextCurrent(window)
+            strings.update(_get_strings())
+    finally:
+        glfw.glfwDestroyWindow(window)
+    return max(created, version)
+
+
+def _search(candidates, core, best):
+    '''Binary searches candidates above best for the highest version
+
+    Args:
+        candidates(tuple): ascending versions
+        core(bool): search core profile versions
+        best(tuple): highest version known to work or None
+
+    Returns:
+        tuple: highest (major, minor) that could be created or None
+    '''
+    if best is None:
+        return None
+    higher = [version for version in candidates if version > best]
+    low, high = 0, len(higher) - 1
+    while low <= high:
+        middle = (low + high) // 2
+        created = _try_version(higher[middle], core)
+        if created is None:
+            high = middle - 1
+        else:
+            best = max(best, created)
+            low = middle + 1
+            # The driver may have created an even newer context
+            while low <= high and higher[low] <= best:
+                low += 1
+    return best
+
+
+def probe_context_versions(disk_cache=True, refresh=False):
+    '''Finds the highest OpenGL core and compatibility versions available
+
+    Args:
+        disk_cache(bool): load and store results within glfw.cache
+        refresh(bool): ignore cached results
+
+    Returns:
+        ContextInfo: core and compat (major, minor) tuples, which are None
+            when unavailable, along with the vendor, renderer and version
+            strings of the first context created
+    '''
+    raw._ensure_init()
+    key = _get_key()
+    in_process_key = tuple(sorted(key.items()))
+    if not refresh and in_process_key in _results:
+        return _results[in_process_key]
+
+    glfw = raw._glfw
+    current = glfw.glfwGetCurrentContext()
+    strings = {}
+    try:
+        compat = _try_version(versions[0], False, strings)
+        core = _try_version(core_versions[0], True, strings)
+        key.update(strings)
+        info = None
+        if disk_cache and not refresh and strings:
+            data = cache.load(_cache_name, key)
+            if data is not None:
+                info = ContextInfo(**data)
+                info = info._replace(
+                    core=tuple(info.core) if info.core else None,
+                    compat=tuple(info.compat) if info.compat else None,
+                )
+        if info is None:
+            info = ContextInfo(
+                core=_search(core_versions, True, core),
+                compat=_search(versions, False, compat),
+                vendor=strings.get('vendor'),
+                renderer=strings.get('renderer'),
+                version=strings.get('version'),
+            )
+            if disk_cache and strings:
+                cache.store(_cache_name, key, info._asdict())
+    finally:
+        glfw.glfwMakeContextCurrent(current)
+        glfw.glfwDefaultWindowHints()
+    _results[in_process_key] = info
+    return info
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+'''
+Reports where `import glfw` spends its time.
+
+Each run imports glfw within a fresh interpreter with GLFW_CFFI_PROFILE
+set and then prints the per-phase wall time and object counts recorded
+in `glfw.raw.init_stats`.
+
+Usage:
+
+    $ python -m glfw.profile_import [--repeat N] [--json]
+'''
+from __future__ import absolute_import, division, print_function, unicode_literals  # noqa
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import OrderedDict
+
+# Runs within the child interpreter
+_child_script = '''
+import json, sys
+from timeit import default_timer as timer
+start = timer()
+import glfw
+total = timer() - start
+stats = [[k, v] for k, v in glfw.raw.init_stats.items()]
+sys.stdout.write(json.dumps({"total": total, "ffi_mode": glfw.raw.ffi_mode, "stats": stats}))
+'''
+
+
+def profile_import(repeat=1, python=None):
+    '''Imports glfw in fresh interpreters and collects init_stats
+
+    Args:
+        repeat(int): number of imports to run
+        python(str): python interpreter to use [default: current]
+
+    Returns:
+        list: one dict per run with total, ffi_mode and stats
+    '''
+    python = python or sys.executable
+    env = dict(os.environ)
+    env['GLFW_CFFI_PROFILE'] = '1'
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.check_output([python, '-c', _child_script], env=env)
+        data = json.loads(output.decode('utf-8').strip().splitlines()[-1])
+        data['stats'] = OrderedDict(data['stats'])
+        runs.append(data)
+    return runs
+
+
+def format_table(runs):
+    '''Formats profiled runs into a table of per-phase averages'''
+    phases = OrderedDict()
+    for run in runs:
+        for name, stats in run['stats'].items():
+            phases.setdefault(name, []).append(stats)
+    header = '{:<28} {:>10} {:>8} {:>10}'.format('phase', 'time (ms)', 'calls', 'count')
+    lines = [header, '-' * len(header)]
+    for name, all_stats in phases.items():
+        depth = all_stats[0]['depth']
+        lines.append('{:<28} {:>10.2f} {:>8} {:>10}'.format(
+            '  ' * depth + name,
+            1000.0 * sum(s['time'] for s in all_stats) / len(all_stats),
+            all_stats[0]['calls'],
+            all_stats[0]['count'],
+        ))
+    lines.append('-' * len(header))
+    total = 1000.0 * sum(run['total'] for run in runs) / len(runs)
+    lines.append('{:<28} {:>10.2f}'.format('import glfw', total))
+    modes = ', '.join(sorted(set(run['ffi_mode'] for run in runs)))
+    lines.append('runs: {}   ffi mode: {}'.format(len(runs), modes))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Profiles `import glfw`')
+    parser.add_argument('-r', '--repeat', type=int, default=1, help='number of imports to average')
+    parser.add_argument('--json', action='store_true', help='print raw json results')
+    options = parser.parse_args(argv)
+    runs = profile_import(repeat=options.repeat)
+    if options.json:
+        print(json.dumps(runs, indent=2))
+    else:
+        print(format_table(runs))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+'''
+GPU timings of named sections with OpenGL timer queries
+
+A GpuProfiler records a GL_TIMESTAMP query before and after each named
+section.  Results become available a few frames later; collect() only
+reads queries whose GL_QUERY_RESULT_AVAILABLE is set, so profiling never
+waits for the GPU.  Query objects are recycled through a pool and the
+GPU time of every section is kept in a rolling numpy history.
+
+Timestamps are used instead of GL_TIME_ELAPSED queries so that sections
+may be nested (only one GL_TIME_ELAPSED query may be active at a time).
+
+The profiler is available within the gl namespace:
+
+    >>> from glfw import gl
+    >>> profiler = gl.GpuProfiler()
+    >>> while not glfw.window_should_close(win):
+    ...     with profiler.section('shadows'):
+    ...         render_shadows()
+    ...     with profiler.section('scene'):
+    ...         render_scene()
+    ...     glfw.swap_buffers(win)
+    ...     profiler.collect()
+    >>> profiler.stats('scene')
+    {'count': 120, 'mean': 0.0021, 'p50': 0.0020, 'p95': 0.0026, 'p99': 0.0031}
+    >>> counts, edges = profiler.histogram('scene', bins=20)
+
+OpenGL 3.3 (or ARB_timer_query) and numpy are required; an OpenGL
+context must be current whenever a GpuProfiler is used.
+'''
+from __future__ import absolute_import, division, print_function, unicode_literals  # noqa
+
+import contextlib
+import ctypes
+
+from .input import _numpy
+from .raw import gl
+
+
+class GpuProfiler(object):
+    '''Times named sections on the GPU without stalling
+
+    Args:
+        queries(int): query objects allocated up front; the pool grows
+            when every query is pending
+        history(int): GPU times kept per section
+
+    Attributes:
+        counters(dict): sections begun and collected, and query objects
+            allocated
+    '''
+
+    def __init__(self, queries=64, history=120):
+        self.history = int(history)
+        self._free = []
+        self._allocated = []
+        # (name, begin query, end query) in the order sections ended
+        self._pending = []
+        self._active = []
+        self._histories = {}
+        self._counts = {}
+        self._available = ctypes.c_int()
+        self._result = ctypes.c_uint64()
+        self.counters = {
+            'sections': 0,
+            'collected': 0,
+            'queries': 0,
+        }
+        self._allocate(queries)
+
+    def _allocate(self, count):
+        np = _numpy()
+        queries = [int(query) for query in np.atleast_1d(gl.gen_queries(count))]
+        self._allocated.extend(queries)
+        self._free.extend(queries)
+        self.counters['queries'] += count
+
+    def _query(self):
+        if not self._free:
+            self._allocate(max(len(self._allocated), 1))
+        return self._free.pop()
+
+    def begin(self, name):
+        '''Starts timing a section; sections may be nested'''
+        query = self._query()
+        gl.query_counter(query, gl.TIMESTAMP)
+        self._active.append((name, query))
+
+    def end(self, name=None):
+        '''Stops timing the innermost section'''
+        active_name, begin = self._active.pop()
+        if name is not None and name != active_name:
+            self._active.append((active_name, begin))
+            raise ValueError('Section {!r} ended within section {!r}'.format(name, active_name))
+        end = self._query()
+        gl.query_counter(end, gl.TIMESTAMP)
+        self._pending.append((active_name, begin, end))
+        self.counters['sections'] += 1
+
+    @contextlib.contextmanager
+    def section(self, name):
+        '''Times the GPU commands issued within the context'''
+        self.begin(name)
+        try:
+            yield
+        finally:
+            self.end(name)
+
+    def _get_result(self, query):
+        gl.glGetQueryObjectui64v(query, gl.QUERY_RESULT, ctypes.byref(self._result))
+        return self._result.value
+
+    def _is_available(self, query):
+        gl.get_query_objectiv(query, gl.QUERY_RESULT_AVAILABLE, ctypes.byref(self._available))
+        return bool(self._available.value)
+
+    def _record(self, name, seconds):
+        np = _numpy()
+        history = self._histories.get(name)
+        if history is None:
+            history = self._histories[name] = np.zeros(self.history, dtype=np.float64)
+            self._counts[name] = 0
+        history[self._counts[name] % self.history] = seconds
+        self._counts[name] += 1
+
+    def collect(self):
+        '''Records the sections whose results are available
+
+        Queries complete in order, so collection stops at the first
+        section that is still pending.
+
+        Returns:
+            int: number of sections collected
+        '''
+        collected = 0
+        for name, begin, end in self._pending:
+            if not self._is_available(end):
+                break
+            self._record(name, (self._get_result(end) - self._get_result(begin)) / 1e9)
+            self._free.extend((begin, end))
+            collected += 1
+        if collected:
+            del self._pending[:collected]
+            self.counters['collected'] += collected
+        return collected
+
+    @property
+    def sections(self):
+        '''list: names of the sections with recorded times'''
+        return sorted(self._histories)
+
+    def times(self, name):
+        '''Returns the recorded GPU seconds of a section, oldest first'''
+        np = _numpy()
+        history = self._histories[name]
+        count = self._counts[name]
+        if count <= self.history:
+            return history[:count]
+        start = count % self.history
+        return np.concatenate([history[start:], history[:start]])
+
+    def histogram(self, name, bins=20, range=None):
+        '''Returns a histogram of the recorded GPU seconds of a section
+
+        Returns:
+            tuple: counts and bin edges; see numpy.histogram
+        '''
+        return _numpy().histogram(self.times(name), bins=bins, range=range)
+
+    def stats(self, name):
+        '''Returns the count, mean and percentiles of a section in seconds'''
+        np = _numpy()
+        times = self.times(name)
+        p50, p95, p99 = np.percentile(times, (50, 95, 99))
+        return {
+            'count': len(times),
+            'mean': float(times.mean()),
+            'p50': float(p50),
+            'p95': float(p95),
+            'p99': float(p99),
+        }
+
+    def delete(self):
+        '''Deletes the query objects of the profiler'''
+        if self._allocated:
+            gl.delete_queries(len(self._allocated), self._allocated)
+        self._allocated = []
+        self._free = []
+        self._pending = []
+        self._active = []
+
+    def __repr__(self):
+        cname = self.__class__.__name__
+        string = '<{cname} sections={sections} pending={pending}>'
+        return string.format(cname=cname, sections=len(self._histories), pending=len(self._pending))
+
+
+# Make the profiler available as gl.GpuProfiler
+gl.__dict__['GpuProfiler'] = GpuProfiler
@@ -4,111 +4,230 @@
 from __future__ import absolute_import, division, print_function, unicode_literals  # noqa
 
 import atexit
+import contextlib
 import fnmatch
 import functools
 import imp
+import importlib
+import keyword
 import os
 import re
 import sys
+import threading
+import types
+from collections import OrderedDict
 from ctypes.util import find_library as _ctypes_find_library
 from textwrap import dedent as dd
+from timeit import default_timer as _timer
 
-import OpenGL.GL as _gl
 from cffi import FFI
 
+from . import cache
+from .__metadata__ import __versionstr__
+from .cdef import _camelToSnake, _fix_source, _get_function_declaration, _get_function_declarations  # noqa
+
 if sys.version.startswith('2'):
     range = xrange  # noqa
 
 pkgname = os.path.basename(os.path.dirname(__file__))
 modname = '.'.join((pkgname, os.path.basename(__file__)))
 
+# Import profiling is opt-in:  GLFW_CFFI_PROFILE=1 python -m glfw.profile_import
+_profiling = os.environ.get('GLFW_CFFI_PROFILE', '').lower() in ('1', 'true', 'yes', 'on')
+_phase_depth = [0]
+init_stats = OrderedDict()
+
+# Automatic initialization may be deferred until the first call that needs
+#  it with GLFW_CFFI_AUTO_INIT=0 or glfw.configure(auto_init=False).  Output
+#  pointers are reused with GLFW_CFFI_REUSE_BUFFERS=1 or
+#  glfw.configure(reuse_buffers=True)
+options = {
+    'auto_init': os.environ.get('GLFW_CFFI_AUTO_INIT', '').lower() not in ('0', 'false', 'no', 'off'),
+    'reuse_buffers': os.environ.get('GLFW_CFFI_REUSE_BUFFERS', '').lower() in ('1', 'true', 'yes', 'on'),
+}
+_reuse_buffers = [options['reuse_buffers']]
+_initialized = [False]
+# Incremented each time glfw becomes initialized; caches of glfw objects
+#  (e.g. the monitor registry in api) compare against it to detect re-init
+_init_count = [0]
+# Set by an explicit glfw.terminate(); glfw is not initialized automatically
+#  again until glfw.init() (or configure(auto_init=True)) is called
+_terminated = [False]
+_init_lock = threading.Lock()
+_terminate_registered = [False]
+_identifier = re.compile(r'^[A-Za-z][A-Za-z0-9_]*$')
+
+# These may be called before glfw is initialized
+_pre_init_functions = (
+    'glfwInit',
+    'glfwInitHint',
+    'glfwTerminate',
+    'glfwGetError',
+    'glfwGetVersion',
+    'glfwGetVersionString',
+    'glfwSetErrorCallback',
+)
+
 
 ###############################################################################
-def _get_function_declaration(line):
-    '''Reads a line of C code and then extracts function declarations if found'''
-    found = None
-    pattern = ''.join((
-        r'^\s*(?P<result>(.*))\s+',
-        r'(?P<func_name>(glfw[A-Za-z_0-9*]+))',
-        r'\((?P<args>(.*))\)\;\s*$'
-    ))
-    eng = re.compile(pattern)
-    if all(_ in line for _ in ('(', ')', ';')):
-        if '@' not in line and not line.lstrip(' ').startswith('typedef'):
-            if eng.search(line.strip()):
-                found = [group.groupdict() for group in eng.finditer(line)][0]
-                func_name = found['func_name']
-                found['snake_name'] = _camelToSnake(func_name.replace('glfw', ''))
-    return found
-
-
-def _fix_source(data):
-    '''Remove directives since they are not supported.'''
-    lines = []
-    ignored_directives = (
-        '#include',
-        '#if', '#ifdef', '#endif', '#ifndef', '#else', '#elif',
-        '#error', '#undef',
-        'extern',
-    )
-    prev_line = ''
-    defines = {}
-    for lineno, line in enumerate(data.split('\n')):
-        if line.lstrip(' ').startswith(ignored_directives):
-            prev_line = line
-            continue
-        if not line.strip():
-            prev_line = line
-            continue
-        if line.lstrip(' ').startswith('GLFWAPI'):
-            line = line.replace('GLFWAPI ', '')
-        # TODO: Figure out how to add Vulkan support, but until then...
-        # Won't support Vulkan at this point.
-        vulkan_keys = [
-            'GLFWvkproc', 'VkInstance', 'VkPhysicalDevice'
-        ]
-        if any(key in line for key in vulkan_keys):
-            continue
-        if prev_line == '#ifdef __cplusplus':
-            if line.strip() == '}':
-                prev_line = line
-                continue
-        if line.lstrip(' ').startswith('#define'):
-            found = re.search('^(\s*)\#define\s+([0-9A-Za-z_]+)\s*$', line)
-            if found:
-                continue
-            else:
-                found = re.search('^(\s*)\#define\s+([0-9A-Za-z_]+)\s*(.*)$', line)
-                if found:
-                    space, key, value = found.groups()
-                    if ((len(space) > 0) or value.startswith('__')):
-                        continue
-                    elif value in defines:
-                        old_value, value = value, defines[value]
-                        line = line.replace(old_value, value)
-                    defines[key] = value
-        lines.append(line)
-        prev_line = line
-    return '\n'.join(lines)
+# Import profiling
+###############################################################################
+def _get_phase_stats(name):
+    '''Returns the stats for an initialization phase, creating them if needed'''
+    stats = init_stats.get(name)
+    if stats is None:
+        stats = {'time': 0.0, 'calls': 0, 'count': 0, 'depth': _phase_depth[0]}
+        init_stats[name] = stats
+    return stats
+
+
+@contextlib.contextmanager
+def _phase(name):
+    '''Records wall time for an initialization phase when profiling'''
+    if not _profiling:
+        yield
+        return
+    stats = _get_phase_stats(name)
+    _phase_depth[0] += 1
+    start = _timer()
+    try:
+        yield
+    finally:
+        stats['time'] += _timer() - start
+        stats['calls'] += 1
+        _phase_depth[0] -= 1
 
 
-def _wrap_func(ffi, func_decl, func):
-    '''Wraps glfw functions with snake skins'''
+def _count(name, count=1):
+    '''Records the number of objects handled by an initialization phase'''
+    if _profiling:
+        _get_phase_stats(name)['count'] += count
+
+
+###############################################################################
+# Initialization
+###############################################################################
+def _register_terminate():
+    '''Registers glfw terminate to run at exit (once)'''
+    if not _terminate_registered[0]:
+        _terminate_registered[0] = True
+        atexit.register(_glfw.glfwTerminate)
+
+
+def _ensure_init():
+    '''Initializes glfw if it has not been initialized yet
+
+    Safe to call from multiple threads; glfwInit runs at most once until
+    glfw is terminated.  A failed initialization is retried on the next
+    call.  After an explicit glfw.terminate() glfw is left terminated
+    until glfw.init() is called again.
+
+    Returns:
+        bool: True if glfw is initialized
+    '''
+    if _initialized[0]:
+        return True
+    with _init_lock:
+        if not _initialized[0] and not _terminated[0]:
+            with _phase('init'):
+                _initialized[0] = bool(_glfw.glfwInit())
+            if _initialized[0]:
+                _init_count[0] += 1
+                _register_terminate()
+    return _initialized[0]
+
+
+def configure(auto_init=None, reuse_buffers=None):
+    '''Configures glfw-cffi runtime behavior
+
+    Args:
+        auto_init(bool): When False, glfw is initialized on the first call
+            that requires it rather than at import.  This is meant to be
+            called before glfw is used; if glfw was initialized automatically
+            it is terminated so that it may be initialized lazily later.
+            When True, glfw is initialized immediately.
+        reuse_buffers(bool): When True, functions with output pointers
+            (e.g. get_cursor_pos, get_window_size) reuse thread-local
+            output pointers instead of allocating new ones on every call
+            and return tuples rather than lists.
+
+    Returns:
+        dict: the current options
+    '''
+    if auto_init is not None:
+        auto_init = bool(auto_init)
+        if auto_init:
+            _terminated[0] = False
+            _ensure_init()
+        elif options['auto_init'] and _initialized[0]:
+            with _init_lock:
+                _glfw.glfwTerminate()
+                _initialized[0] = False
+        options['auto_init'] = auto_init
+    if reuse_buffers is not None:
+        options['reuse_buffers'] = _reuse_buffers[0] = bool(reuse_buffers)
+    return dict(options)
+
+
+def _wrap_init(init_func, terminate_func):
+    '''Keeps track of initialization when init and terminate are called'''
+
+    @functools.wraps(init_func)
+    def init():
+        with _init_lock:
+            retval = init_func()
+            if retval and not _initialized[0]:
+                _init_count[0] += 1
+            _initialized[0] = bool(retval)
+            if retval:
+                _terminated[0] = False
+        if retval:
+            _register_terminate()
+        return retval
+
+    @functools.wraps(terminate_func)
+    def terminate():
+        with _init_lock:
+            retval = terminate_func()
+            _initialized[0] = False
+            _terminated[0] = True
+        return retval
+
+    return init, terminate
+
+
+###############################################################################
+def _get_func_fields(ffi, func_decl, func):
+    '''Pairs the argument names found in a declaration with their ctypes'''
     func_type = ffi.typeof(func)
-    func_args = func_type.args
-    func_res = func_type.result
     decl_args = func_decl['args']
     func_fields = []
-    for ctype, arg in zip(func_args, decl_args.split(',')):
+    for ctype, arg in zip(func_type.args, decl_args.split(',')):
         arg = arg.replace(ctype.cname, '').replace(ctype.cname.replace(' ', ''), '')
         arg = arg.strip()
         arg = arg.split(' ')[-1]  # to capture the field name without the type data
         func_fields.append((arg, ctype))
-    # fields = dict(func_fields)
+    return func_fields
+
+
+def _wrap_func_generic(ffi, func_decl, func):
+    '''Wraps glfw functions with a generic *args wrapper
+
+    Every call inspects its arguments, allocates missing pointer
+    arguments and converts the return value.  _wrap_func uses this for
+    less common calls (e.g. only some output pointers provided).
+    '''
+    func_type = ffi.typeof(func)
+    func_args = func_type.args
+    func_res = func_type.result
+    func_fields = _get_func_fields(ffi, func_decl, func)
+    needs_init = func_decl['func_name'] not in _pre_init_functions
 
     # Auto-wrapper for cffi function call
     @functools.wraps(func)
     def wrapper(*args, **kwds):
+        if needs_init and not _initialized[0]:
+            _ensure_init()
         retval = []
         if func_args:
             new_args = []
@@ -146,46 +265,155 @@ def _wrap_func(ffi, func_decl, func):
                 retval = ffi.string(retval)
         return retval
 
-    def rename_code_object(func, new_name):
-        '''Magic bit so a stack trace and profiling doesn't identify wrapper
-        as the function'''
-        new_name = str(new_name)  # python2 needs non-unicode
-        code_object = func.__code__
-        function, code = type(func), type(code_object)
-        code_objects = [
-            code_object.co_argcount,
-            code_object.co_nlocals,
-            code_object.co_stacksize,
-            code_object.co_flags,
-            code_object.co_code,
-            code_object.co_consts,
-            code_object.co_names,
-            code_object.co_varnames,
-            code_object.co_filename,
-            new_name,
-            code_object.co_firstlineno,
-            code_object.co_lnotab,
-            code_object.co_freevars,
-            code_object.co_cellvars
-        ]
-        if sys.version.startswith('3'):
-            # CodeType changed between python2 and python3
-            code_objects.insert(1, code_object.co_kwonlyargcount)
-        # TODO: modify code *args, **kwds to use actual variables
-        # varnames = tuple(f[0] for f in func_fields)
-        # argcount = len(varnames)
-        # _display(code_object)
-        new_func = function(
-            code(*code_objects),
-            func.__globals__, new_name, func.__defaults__, func.__closure__
-        )
-        return new_func
+    return wrapper
+
+
+def _can_allocate(ffi, ctype):
+    '''True if a pointer argument may be allocated with ffi.new'''
+    if ctype.kind != 'pointer':
+        return False
+    try:
+        ffi.new(ctype)
+    except TypeError:
+        return False
+    return True
+
+
+def _is_output(ffi, ctype, declaration):
+    '''True if a pointer argument is an output allocated when omitted
+
+    cffi drops const qualifiers from ctypes, so pointers to const data
+    (e.g. const GLFWimage *) are found in the declaration.  Strings
+    (char *, e.g. the window title) are always inputs; pointers to
+    strings (const char **) are outputs.
+    '''
+    if not _can_allocate(ffi, ctype):
+        return False
+    if ctype.item.kind == 'pointer':
+        return True
+    return 'const' not in declaration.split() and ctype.item.cname != 'char'
+
+
+def _get_wrapper_source(func_name, params, outputs, result, needs_init):
+    '''Generates the source for a snake-case wrapper
+
+    All decisions (which arguments are allocated, how the result is
+    converted) are made here rather than per call.
+
+    Args:
+        func_name(str): name of the wrapper
+        params(list): argument names
+        outputs(dict): argument name -> True when the argument is an output
+            pointer allocated when omitted and whose dereferenced value is
+            a char * to convert to a string
+        result(str): one of 'void', 'value', 'pointer' or 'string'
+        needs_init(bool): ensure glfw is initialized before the call
+
+    Returns:
+        str: python source defining the wrapper
+    '''
+    first_output = min([params.index(name) for name in outputs] or [len(params)])
+    signature = params[:first_output] + ['{}=None'.format(name) for name in params[first_output:]]
+    call = '_func({})'.format(', '.join(params))
+    returns = {
+        'void': ['{call}'],
+        'value': ['return {call}'],
+        'pointer': ['retval = {call}', 'return None if retval == _NULL else retval'],
+        'string': ['retval = {call}', 'return None if retval == _NULL else _string(retval)'],
+    }[result]
+    lines = ['def {}({}):'.format(func_name, ', '.join(signature))]
+    if needs_init:
+        lines.extend(['    if not _initialized[0]:', '        _ensure_init()'])
+    if not outputs:
+        lines.extend('    ' + line.format(call=call) for line in returns)
+        return '\n'.join(lines)
+
+    # Fast path:  every output pointer omitted (the common case)
+    output_names = [name for name in params if name in outputs]
+    values = [
+        '_string({}[0])'.format(name) if outputs[name] else '{}[0]'.format(name)
+        for name in output_names
+    ]
+    buffers = ', '.join(output_names) + ','
+    lines.append('    if {}:'.format(' and '.join('{} is None'.format(name) for name in output_names)))
+    # Opt-in:  reuse thread-local output pointers rather than allocating
+    lines.extend([
+        '        if _reuse_buffers[0]:',
+        '            try:',
+        '                {} = _local.buffers'.format(buffers),
+        '            except AttributeError:',
+        '                {} = _local.buffers = ({})'.format(
+            buffers, ', '.join('_new(_ctype_{})'.format(name) for name in output_names) + ','),
+    ])
+    if result == 'void':
+        lines.append('            ' + call)
+        lines.append('            return ({},)'.format(', '.join(values)))
+    else:
+        lines.extend('            ' + line.format(call=call) for line in returns)
+    for name in output_names:
+        lines.append('        {name} = _new(_ctype_{name})'.format(name=name))
+    if result == 'void':
+        lines.append('        ' + call)
+        lines.append('        return [{}]'.format(', '.join(values)))
+    else:
+        lines.extend('        ' + line.format(call=call) for line in returns)
+    lines.append('    return _generic({})'.format(', '.join(params)))
+    return '\n'.join(lines)
+
+
+def _wrap_func(ffi, func_decl, func):
+    '''Wraps glfw functions with snake skins
+
+    Generates a wrapper with a real signature for each glfw function.
+    Output pointers (e.g. xpos and ypos for get_cursor_pos) are optional;
+    when all are omitted they are allocated and their values returned.
+    '''
+    func_type = ffi.typeof(func)
+    func_args = func_type.args
+    func_res = func_type.result
+    func_fields = _get_func_fields(ffi, func_decl, func)
+    needs_init = func_decl['func_name'] not in _pre_init_functions
+
+    params = []
+    outputs = {}
+    namespace = {
+        '__name__': modname,
+        '_func': func,
+        '_generic': _wrap_func_generic(ffi, func_decl, func),
+        '_new': ffi.new,
+        '_NULL': ffi.NULL,
+        '_string': ffi.string,
+        '_initialized': _initialized,
+        '_ensure_init': _ensure_init,
+        '_reuse_buffers': _reuse_buffers,
+        '_local': threading.local(),
+    }
+    declarations = func_decl['args'].split(',')
+    for index, (name, ctype) in enumerate(func_fields):
+        if not _identifier.match(name) or keyword.iskeyword(name) or name in params:
+            name = 'arg{}'.format(index)
+        params.append(name)
+        if _is_output(ffi, ctype, declarations[index]):
+            outputs[name] = ctype.item.kind == 'pointer' and 'char' in ctype.cname
+            namespace['_ctype_{}'.format(name)] = ctype
+    if func_res.kind == 'void':
+        result = 'void'
+    elif func_res.kind != 'pointer':
+        result = 'value'
+    elif 'char' in func_res.cname:
+        result = 'string'
+    else:
+        result = 'pointer'
 
     # Newly wrapped function
-    new_func = rename_code_object(wrapper, func_decl['snake_name'])
+    snake_name = str(func_decl['snake_name'])  # python2 needs non-unicode
+    source = _get_wrapper_source(snake_name, params, outputs, result, needs_init)
+    code = compile(source, '<{} {}>'.format(modname, snake_name), 'exec')
+    exec(code, namespace)
+    new_func = namespace[snake_name]
 
     docstring = func.__doc__
-    if not docstring:
+    if not docstring or docstring == ffi.CData.__doc__:
         docstring = '"{snake_name}" wrapps a glfw c-library function:.\n'
         docstring += 'The c-function declaration can be found below:\n\n'
         if func_args:
@@ -203,43 +431,86 @@ def _wrap_func(ffi, func_decl, func):
     return new_func
 
 
-def _camelToSnake(string):
-    '''Converts camelCase to snake_case
-
-    >>> print(_camelToSnake('ACase'))
-    a_case
-    >>> print(_camelToSnake('AnotherCaseHere'))
-    another_case_here
-    >>> print(_camelToSnake('AnotherCaseHereNow'))
-    another_case_here_now
-    >>> print(_camelToSnake('SimpleCase'))
-    simple_case
-    >>> print(_camelToSnake('simpleCase2'))
-    simple_case_2
-    >>> print(_camelToSnake('simpleCase3d'))
-    simple_case_3d
-    >>> print(_camelToSnake('simpleCase4D'))
-    simple_case_4_d
-    >>> print(_camelToSnake('simpleCase5thDimension'))
-    simple_case_5th_dimension
-    >>> print(_camelToSnake('simpleCase66thDimension'))
-    simple_case_66th_dimension
+class _LazyGLModule(types.ModuleType):
+    '''Module providing a snake_case python-esque interface to OpenGL
+
+    Names are resolved against the OpenGL module the first time they are
+    accessed and then cached on this module, so OpenGL is only imported
+    (and only the names actually used are translated) when needed:
+
+        >>> gl.COLOR_BUFFER_BIT  # GL_COLOR_BUFFER_BIT
+        >>> gl.clear_color  # glClearColor
+        >>> gl.glClearColor  # glClearColor
+
+    Args:
+        name(str): name of the module
+        library_name(str): name of the module providing OpenGL
     '''
-    patterns = [
-        (r'(.)([0-9]+)', r'\1_\2'),
-        # (r'(.)([A-Z][a-z]+)', r'\1_\2'),
-        # (r'(.)([0-9]+)([a-z]+)', r'\1_\2\3'),
-        (r'([a-z]+)([A-Z])', r'\1_\2'),
-    ]
-    engines = [
-        (pattern, replacement, re.compile(pattern))
-        for pattern, replacement in patterns
-    ]
-    for data in engines:
-        pattern, replacement, eng = data
-        string = eng.sub(replacement, string)
-    string = string.lower()
-    return string
+
+    def __init__(self, name, library_name):
+        super(_LazyGLModule, self).__init__(str(name))
+        self.__dict__['_library_name'] = library_name
+        self.__dict__['_library'] = None
+        self.__dict__['_snake_index'] = None
+
+    def _get_library(self):
+        '''Imports the OpenGL module'''
+        library = self.__dict__['_library']
+        if library is None:
+            library = importlib.import_module(self._library_name)
+            self.__dict__['_library'] = library
+        return library
+
+    def _get_snake_index(self):
+        '''Maps every snake_case name to its OpenGL name.  Built at most once.'''
+        index = self.__dict__['_snake_index']
+        if index is None:
+            index = {
+                _camelToSnake(d.replace('gl', '')): d
+                for d in dir(self._get_library())
+                if not d.upper() == d
+                if not d.startswith('GL_')
+            }
+            self.__dict__['_snake_index'] = index
+        return index
+
+    def _resolve(self, name):
+        '''Finds the OpenGL object for a name'''
+        library = self._get_library()
+        missing = object()
+        value = missing
+        if name.upper() == name:
+            # Enumerations drop their GL_ prefix
+            value = getattr(library, 'GL_' + name, missing)
+        elif name.lower() == name:
+            # Try the obvious camelCase name before building the full index
+            camel_name = 'gl' + ''.join(part[:1].upper() + part[1:] for part in name.split('_'))
+            if _camelToSnake(camel_name.replace('gl', '')) == name:
+                value = getattr(library, camel_name, missing)
+        if value is missing:
+            value = getattr(library, name, missing)
+        if value is missing and name.lower() == name:
+            camel_name = self._get_snake_index().get(name)
+            if camel_name is not None:
+                value = getattr(library, camel_name, missing)
+        if value is missing:
+            raise AttributeError('module {!r} has no attribute {!r}'.format(self.__name__, name))
+        return value
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        value = self._resolve(name)
+        self.__dict__[name] = value
+        return value
+
+    def __dir__(self):
+        library = self._get_library()
+        names = set(self.__dict__)
+        names.update(dir(library))
+        names.update(self._get_snake_index())
+        names.update(d.replace('GL_', '') for d in dir(library) if d.upper() == d if d.startswith('GL_'))
+        return sorted(names)
 
 
 def _load_header(header_path, ffi):
@@ -254,8 +525,13 @@ def _load_header(header_path, ffi):
     '''
     source = ''
     with open(header_path, 'r') as fd:
-        source = _fix_source(fd.read())
-    ffi.cdef(source)
+        data = fd.read()
+    with _phase('fix_source'):
+        source = _fix_source(data)
+    _count('fix_source', data.count('\n'))
+    with _phase('cdef'):
+        ffi.cdef(source)
+    _count('cdef', len(source))
     return source
 
 
@@ -351,14 +627,108 @@ def _find_library_header(library_name, library_path, ffi):
     return header_path, source
 
 
-# Modifies the module directly by introspection and loading up glfw
-#  library and parsing glfw header file
-def _initialize_module(ffi):
+def _load_compiled_module():
+    '''Loads the compiled (API mode) extension if it has been built
+
+    The extension is optional and built by glfw/_build.py.  Setting the
+    GLFW_CFFI_MODE environment variable to "abi" ignores the extension.
+
+    Returns:
+        tuple: (ffi, lib, library path, header path, declarations) or None
+    '''
+    if os.environ.get('GLFW_CFFI_MODE', '').lower() == 'abi':
+        return None
+    try:
+        from . import _glfw_cffi
+    except ImportError:
+        return None
+    ffi, lib = _glfw_cffi.ffi, _glfw_cffi.lib
+    header_path = ffi.string(lib._glfw_cffi_header_path).decode('utf-8')
+    declarations = ffi.string(lib._glfw_cffi_declarations).decode('utf-8')
+    declarations = _get_function_declarations(declarations)
+    return ffi, lib, _glfw_cffi.__file__, header_path, declarations
+
+
+def _file_signature(path):
+    '''Returns (mtime, size) of a path; used to detect stale cache entries'''
+    stat = os.stat(path)
+    return [stat.st_mtime, stat.st_size]
+
+
+def _header_cache_key(library_path):
+    '''Identifies the cache entry for a library binary'''
+    return {
+        'library_path': library_path,
+        'library': _file_signature(library_path),
+        'version': __versionstr__,
+    }
+
+
+def _load_cached_header(library_path, ffi):
+    '''Loads the preprocessed header for a library from the on-disk cache
+
+    This skips searching for the header, cleaning it up and extracting
+    function declarations.  The entry is ignored if the library, header
+    or glfw-cffi version changed since it was stored.
+
+    Returns:
+        tuple: (header path, function declarations) or None on a miss
+    '''
+    key = _header_cache_key(library_path)
+    data = cache.load('header', key)
+    if not data:
+        return None
+    header_path = data['header_path']
+    try:
+        if _file_signature(header_path) != data['header']:
+            return None
+    except OSError:
+        return None
+    with _phase('cdef'):
+        ffi.cdef(data['source'])
+    _count('cdef', len(data['source']))
+    return header_path, data['declarations']
+
+
+def _store_cached_header(library_path, header_path, source, declarations):
+    '''Stores the preprocessed header for a library in the on-disk cache'''
+    key = _header_cache_key(library_path)
+    data = {
+        'header_path': header_path,
+        'header': _file_signature(header_path),
+        'source': source,
+        'declarations': declarations,
+    }
+    return cache.store('header', key, data)
+
+
+def invalidate_cache(name=None):
+    '''Removes entries from the on-disk cache
+
+    The cache location may be changed (or the cache disabled) using the
+    GLFW_CFFI_CACHE environment variable.
+
+    Args:
+        name(str): category of entries to remove [default: all]
+
+    Returns:
+        int: number of entries removed
+    '''
+    return cache.invalidate(name)
+
+
+def _load_abi_module(ffi):
+    '''Finds and dlopens the glfw library and parses its header (ABI mode)
+
+    Returns:
+        tuple: (ffi, lib, library path, header path, function declarations)
+    '''
     glfw_library_path = os.environ.get('GLFW_LIBRARY', None)
     # Find and load library using GLFW_LIBRARY hint
     # glfw is often used on linux, mac and windows use glfw3
     library_names = ('glfw3', 'glfw')
-    _glfw, glfw_path = _find_library(library_names, ffi, glfw_library_path)
+    with _phase('find_library'):
+        _glfw, glfw_path = _find_library(library_names, ffi, glfw_library_path)
     if not _glfw:
         err = dd('''
         Could not find glfw library.
@@ -366,10 +736,16 @@ def _initialize_module(ffi):
         Update GLFW_LIBRARY environment variable with path to library binary.
         '''.format(glfw_library_path))
         raise RuntimeError(err)
-    globals()['library_path'] = glfw_path
 
-    # Find and load library header
-    header_path, source = _find_library_header('glfw3', glfw_path, ffi)
+    # Load library header from cache or find, load and cache the header
+    with _phase('header_cache'):
+        cached = _load_cached_header(glfw_path, ffi)
+    if cached:
+        header_path, declarations = cached
+        return ffi, _glfw, glfw_path, header_path, declarations
+
+    with _phase('find_header'):
+        header_path, source = _find_library_header('glfw3', glfw_path, ffi)
     if not header_path:
         err = dd('''
         Could not find glfw library include files.  They must exist within
@@ -377,36 +753,61 @@ def _initialize_module(ffi):
         GLFW Path = "{}"
         '''.format(glfw_path))
         raise RuntimeError(err)
+    with _phase('declarations'):
+        declarations = _get_function_declarations(source)
+    _count('declarations', len(declarations))
+    _store_cached_header(glfw_path, header_path, source, declarations)
+    return ffi, _glfw, glfw_path, header_path, declarations
+
+
+# Modifies the module directly by introspection and loading up glfw
+#  library and parsing glfw header file
+def _initialize_module(ffi=None):
+    # Prefer the compiled extension (API mode) and fallback to ABI mode
+    with _phase('compiled_module'):
+        compiled = _load_compiled_module()
+    if not compiled:
+        # Creating an FFI imports cffi's parser, which API mode never needs
+        with _phase('create_ffi'):
+            ffi = FFI() if ffi is None else ffi
+    ffi, _glfw, glfw_path, header_path, declarations = compiled or _load_abi_module(ffi)
+    globals()['ffi_mode'] = 'api' if compiled else 'abi'
+    globals()['library_path'] = glfw_path
     globals()['header_path'] = header_path
 
     # Create python equivalents of glfw functions
-    camelCase = {
-        _camelToSnake(d.replace('glfw', '')): getattr(_glfw, d)
-        for d in dir(_glfw)
-        if hasattr(_glfw, d)
-        if not d.startswith('_')
-        if hasattr(getattr(_glfw, d), '__call__')
-    }
-
-    funcs = {
-        _camelToSnake(k.replace('glfw', '')): v
-        for k, v in camelCase.items()
-    }
+    with _phase('lookup_functions'):
+        camelCase = {
+            _camelToSnake(d.replace('glfw', '')): getattr(_glfw, d)
+            for d in dir(_glfw)
+            if hasattr(_glfw, d)
+            if not d.startswith('_')
+            if hasattr(getattr(_glfw, d), '__call__')
+        }
+
+        funcs = {
+            _camelToSnake(k.replace('glfw', '')): v
+            for k, v in camelCase.items()
+        }
 
     # Auto-wrap functions to make them friendly to Python
-    for line in source.split('\n'):
-        func_decl = _get_function_declaration(line)
-        if func_decl:
+    with _phase('wrap_functions'):
+        for func_decl in declarations:
             snake_name = func_decl['snake_name']
             if snake_name in funcs:
                 some_func = funcs[snake_name]
                 funcs[snake_name] = _wrap_func(ffi, func_decl, some_func)
+                _count('wrap_functions')
             else:
                 decl_func_name = func_decl['func_name']
                 func = getattr(_glfw, decl_func_name) if hasattr(_glfw, decl_func_name) else None
                 if func:
                     funcs[snake_name] = _wrap_func(ffi, func_decl, func)
                     camelCase[decl_func_name] = func
+                    _count('wrap_functions')
+
+    # Track initialization through the python-friendly init and terminate
+    funcs['init'], funcs['terminate'] = _wrap_init(funcs['init'], funcs['terminate'])
 
     # Add python-friendly, snake-case functions to module
     # Snake provides
@@ -431,89 +832,69 @@ def _initialize_module(ffi):
     #  paste from online C examples;  this is a straight pass-through
     # camelCase = {}
 
-    camelCase = {
-        d: getattr(_glfw, d)
-        for d in dir(_glfw)
-        if hasattr(_glfw, d)
-    }
-
-    easy_translate = {
-        _camelToSnake(d.replace('glfw', '')): getattr(_glfw, d)
-        for d in dir(_glfw)
-        if hasattr(_glfw, d)
-    }
-
-    # Core provides direct access to c-libraries rather than a wrapped function
-    core = imp.new_module('core')
-    sys.modules['{}.core'.format(modname)] = core
-    core.__dict__.update(camelCase)
-    core.__dict__.update(easy_translate)
+    with _phase('core_module'):
+        camelCase = {
+            d: getattr(_glfw, d)
+            for d in dir(_glfw)
+            if hasattr(_glfw, d)
+        }
+
+        easy_translate = {
+            _camelToSnake(d.replace('glfw', '')): getattr(_glfw, d)
+            for d in dir(_glfw)
+            if hasattr(_glfw, d)
+        }
+
+        # Core provides direct access to c-libraries rather than a wrapped function
+        core = imp.new_module('core')
+        sys.modules['{}.core'.format(modname)] = core
+        core.__dict__.update(camelCase)
+        core.__dict__.update(easy_translate)
 
     # Add standard API to module.  Note the lack of wrapping
     globals()['core'] = core
 
-    # gl provides a snake_case python-esque interface to opengl
-    opengl_camelCase = {
-        d: getattr(_gl, d)
-        for d in dir(_gl)
-        if hasattr(_gl, d)
-    }
-
-    opengl_snake_case = {
-        _camelToSnake(d.replace('gl', '')): getattr(_gl, d)
-        for d in dir(_gl)
-        if hasattr(_gl, d)
-        if not d.upper() == d
-        if not d.startswith('GL_')
-    }
-
-    opengl_enums = {
-        d.replace('GL_', ''): getattr(_gl, d)
-        for d in dir(_gl)
-        if hasattr(_gl, d)
-        if d.upper() == d
-        if d.startswith('GL_')
-    }
-
-    gl = imp.new_module('gl')
-    sys.modules['{}.gl'.format(modname)] = gl
-    gl.__dict__.update(opengl_camelCase)
-    gl.__dict__.update(opengl_snake_case)
-    gl.__dict__.update(opengl_enums)
+    # gl provides a snake_case python-esque interface to opengl.  OpenGL is
+    #  large, so names are resolved (and OpenGL imported) on first access
+    with _phase('gl_module'):
+        gl = _LazyGLModule('gl', 'OpenGL.GL')
+        sys.modules['{}.gl'.format(modname)] = gl
 
     # Add standard API to module.  Note the lack of wrapping
     globals()['gl'] = gl
 
     # Update decorators
-    decorators = imp.new_module('decorators')
-    sys.modules['{}.decorators'.format(modname)] = decorators
-    decorators.__dict__.update(
-        dict(
-            # Error callback
-            error_callback=ffi.callback('void (int, const char*)'),
-            # Text Input
-            char_callback=ffi.callback('void (GLFWwindow*, unsigned int)'),
-            char_mods_callback=ffi.callback('void (GLFWwindow*, unsigned int, int)'),
-            # Mouse Input
-            cursor_pos_callback=ffi.callback('void (GLFWwindow*, double, double)'),
-            scroll_callback=ffi.callback('void (GLFWwindow*, double, double)'),
-            mouse_button_callback=ffi.callback('void (GLFWwindow*, int, int, int)'),
-            # Keyboard Input
-            key_callback=ffi.callback('void (GLFWwindow*, int, int, int, int)'),
-            # Window Callbacks
-            cursor_enter_callback=ffi.callback('void (GLFWwindow*, int)'),
-            framebuffer_size_callback=ffi.callback('void (GLFWwindow*, int, int)'),
-            window_close_callback=ffi.callback('void (GLFWwindow*)'),
-            window_focus_callback=ffi.callback('void (GLFWwindow*, int)'),
-            window_iconify_callback=ffi.callback('void (GLFWwindow*, int)'),
-            window_pos_callback=ffi.callback('void (GLFWwindow*, int, int)'),
-            window_refresh_callback=ffi.callback('void (GLFWwindow*)'),
-            window_size_callback=ffi.callback('void (GLFWwindow*, int, int)'),
-            # Misc Callbacks
-            drop_callback=ffi.callback('void (GLFWwindow* window, int, const char**)'),
-            monitor_callback=ffi.callback('void (GLFWmonitor*, int)'),
+    with _phase('decorators'):
+        decorators = imp.new_module('decorators')
+        sys.modules['{}.decorators'.format(modname)] = decorators
+        decorators.__dict__.update(
+            dict(
+                # Error callback
+                error_callback=ffi.callback('void (int, const char*)'),
+                # Text Input
+                char_callback=ffi.callback('void (GLFWwindow*, unsigned int)'),
+                char_mods_callback=ffi.callback('void (GLFWwindow*, unsigned int, int)'),
+                # Mouse Input
+                cursor_pos_callback=ffi.callback('void (GLFWwindow*, double, double)'),
+                scroll_callback=ffi.callback('void (GLFWwindow*, double, double)'),
+                mouse_button_callback=ffi.callback('void (GLFWwindow*, int, int, int)'),
+                # Keyboard Input
+                key_callback=ffi.callback('void (GLFWwindow*, int, int, int, int)'),
+                # Window Callbacks
+                cursor_enter_callback=ffi.callback('void (GLFWwindow*, int)'),
+                framebuffer_size_callback=ffi.callback('void (GLFWwindow*, int, int)'),
+                window_close_callback=ffi.callback('void (GLFWwindow*)'),
+                window_focus_callback=ffi.callback('void (GLFWwindow*, int)'),
+                window_iconify_callback=ffi.callback('void (GLFWwindow*, int)'),
+                window_pos_callback=ffi.callback('void (GLFWwindow*, int, int)'),
+                window_refresh_callback=ffi.callback('void (GLFWwindow*)'),
+                window_size_callback=ffi.callback('void (GLFWwindow*, int, int)'),
+                # Misc Callbacks
+                drop_callback=ffi.callback('void (GLFWwindow* window, int, const char**)'),
+                monitor_callback=ffi.callback('void (GLFWmonitor*, int)'),
+                joystick_callback=ffi.callback('void (int, int)'),
+            )
         )
-    )
 
     # Add decorators module.  Note the lack of wrapping
     globals()['decorators'] = decorators
@@ -521,7 +902,8 @@ def _initialize_module(ffi):
 
 
 # Cleanup namespace
-_ffi, _glfw = _initialize_module(FFI())
+with _phase('initialize_module'):
+    _ffi, _glfw = _initialize_module()
 globs = {k: v for k, v in globals().items()}
 for func in globs:
     if func not in ['_ffi', '_glfw']:
@@ -532,10 +914,6 @@ for func in globs:
 globals().pop('globs')
 globals().pop('func')
 
-# Automatic initialization
-# `init` is available and will not register on static analysis
-init()
-
-# Automatic teardown
-# `core.terminate` is available and will not register on static analysis
-atexit.register(core.terminate)
+# Automatic initialization and teardown (see: _ensure_init and configure)
+if options['auto_init']:
+    _ensure_init()
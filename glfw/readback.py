@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+'''
+Asynchronous framebuffer readback through a ring of pixel buffer objects
+
+glReadPixels into client memory waits for the GPU to finish rendering
+the frame, which stalls the pipeline every frame.  A FramebufferReadback
+instead starts a readback of frame N into a pixel buffer object (PBO)
+and only maps the PBO of frame N - latency, which the GPU has long
+finished by then.  Mapped pixels are copied straight into preallocated
+numpy arrays, so no arrays are allocated per frame.
+
+Usage:
+
+    >>> readback = glfw.FramebufferReadback(width, height, buffers=3)
+    >>> while rendering:
+    ...     with readback.target():  # renders into an offscreen framebuffer
+    ...         render()
+    ...     completed = readback.read()
+    ...     if completed is not None:
+    ...         index, pixels = completed  # frame index - readback.latency
+    ...         save(index, pixels)
+    >>> for index, pixels in readback.flush():
+    ...     save(index, pixels)
+    >>> readback.delete()
+
+Returned arrays are rows of RGBA pixels, bottom row first like OpenGL
+(see flip), and are reused: an array is only valid until the readback
+has read buffers more frames.
+
+OpenGL 3.2 (for fences) or newer and numpy are required; an OpenGL
+context must be current whenever a FramebufferReadback is used.
+'''
+from __future__ import absolute_import, division, print_function, unicode_literals  # noqa
+
+import contextlib
+import ctypes
+from timeit import default_timer as _timer
+
+from . import raw
+from .input import _numpy
+from .raw import gl
+
+
+class FramebufferReadback(object):
+    '''Reads frames back asynchronously through a ring of PBOs
+
+    Args:
+        width(int): width of the frames
+        height(int): height of the frames
+        buffers(int): number of PBOs; frames complete buffers - 1 frames
+            after they are read
+        offscreen(bool): render into a framebuffer object owned by the
+            readback; otherwise frames are read from the framebuffer
+            bound for reading (e.g. the back buffer of a window)
+        depth(bool): add a depth/stencil attachment to the offscreen
+            framebuffer
+        flip(bool): return frames top row first (as a view)
+
+    Attributes:
+        frames(numpy.ndarray): (buffers, height, width, 4) uint8 arrays
+            that completed frames are copied into
+        counters(dict): frames read (submitted) and completed, readbacks
+            that had to wait for the GPU (stalls), bytes completed and
+            seconds from the first read until the last completion
+    '''
+
+    def __init__(self, width, height, buffers=3, offscreen=True, depth=True, flip=False):
+        np = _numpy()
+        if buffers < 1:
+            raise ValueError('At least one buffer is required')
+        self.width = int(width)
+        self.height = int(height)
+        self.buffers = int(buffers)
+        self.flip = flip
+        self.size = self.width * self.height * 4
+        self.frames = np.zeros((self.buffers, self.height, self.width, 4), dtype=np.uint8)
+        self._flat_frames = self.frames.reshape(self.buffers, self.size)
+        self._pbos = [int(pbo) for pbo in np.atleast_1d(gl.gen_buffers(self.buffers))]
+        for pbo in self._pbos:
+            gl.bind_buffer(gl.PIXEL_PACK_BUFFER, pbo)
+            gl.buffer_data(gl.PIXEL_PACK_BUFFER, self.size, None, gl.STREAM_READ)
+        gl.bind_buffer(gl.PIXEL_PACK_BUFFER, 0)
+        # Frame index and fence of the readback pending within each PBO
+        self._pending = [None] * self.buffers
+        self._head = 0
+        self._start = None
+        self.counters = {
+            'submitted': 0,
+            'completed': 0,
+            'stalls': 0,
+            'bytes': 0,
+            'seconds': 0.0,
+        }
+        self.framebuffer = None
+        self._renderbuffers = []
+        if offscreen:
+            self._create_framebuffer(depth)
+
+    @property
+    def latency(self):
+        '''int: frames between reading a frame and it completing'''
+        return self.buffers - 1
+
+    @property
+    def fps(self):
+        '''float: completed frames per second'''
+        seconds = self.counters['seconds']
+        return self.counters['completed'] / seconds if seconds else 0.0
+
+    @property
+    def bytes_per_second(self):
+        '''float: completed bytes per second'''
+        seconds = self.counters['seconds']
+        return self.counters['bytes'] / seconds if seconds else 0.0
+
+    def _create_framebuffer(self, depth):
+        '''Creates the offscreen framebuffer with its renderbuffers'''
+        np = _numpy()
+        attachments = [(gl.COLOR_ATTACHMENT0, gl.RGBA8)]
+        if depth:
+            attachments.append((gl.DEPTH_STENCIL_ATTACHMENT, gl.DEPTH24_STENCIL8))
+        self.framebuffer = int(gl.gen_framebuffers(1))
+        self._renderbuffers = [int(rb) for rb in np.atleast_1d(gl.gen_renderbuffers(len(attachments)))]
+        gl.bind_framebuffer(gl.FRAMEBUFFER, self.framebuffer)
+        for renderbuffer, (attachment, internal_format) in zip(self._renderbuffers, attachments):
+            gl.bind_renderbuffer(gl.RENDERBUFFER, renderbuffer)
+            gl.renderbuffer_storage(gl.RENDERBUFFER, internal_format, self.width, self.height)
+            gl.framebuffer_renderbuffer(gl.FRAMEBUFFER, attachment, gl.RENDERBUFFER, renderbuffer)
+        gl.bind_renderbuffer(gl.RENDERBUFFER, 0)
+        status = gl.check_framebuffer_status(gl.FRAMEBUFFER)
+        gl.bind_framebuffer(gl.FRAMEBUFFER, 0)
+        if status != gl.FRAMEBUFFER_COMPLETE:
+            self.delete()
+            raise RuntimeError('Framebuffer is incomplete: 0x{:04X}'.format(int(status)))
+
+    def bind(self):
+        '''Binds the offscreen framebuffer and sets the viewport to it'''
+        gl.bind_framebuffer(gl.FRAMEBUFFER, self.framebuffer or 0)
+        gl.viewport(0, 0, self.width, self.height)
+
+    def unbind(self):
+        '''Binds the default framebuffer'''
+        gl.bind_framebuffer(gl.FRAMEBUFFER, 0)
+
+    @contextlib.contextmanager
+    def target(self):
+        '''Renders into the offscreen framebuffer within the context'''
+        self.bind()
+        try:
+            yield self
+        finally:
+            self.unbind()
+
+    def _frame(self, slot):
+        frame = self.frames[slot]
+        return frame[::-1] if self.flip else frame
+
+    def _complete(self, slot):
+        '''Copies the pixels of a pending readback into its frame array'''
+        np = _numpy()
+        index, fence = self._pending[slot]
+        self._pending[slot] = None
+        if fence is not None:
+            status = gl.client_wait_sync(fence, 0, 0)
+            if status not in (gl.ALREADY_SIGNALED, gl.CONDITION_SATISFIED):
+                self.counters['stalls'] += 1
+            gl.delete_sync(fence)
+        gl.bind_buffer(gl.PIXEL_PACK_BUFFER, self._pbos[slot])
+        pointer = gl.map_buffer_range(gl.PIXEL_PACK_BUFFER, 0, self.size, gl.MAP_READ_BIT)
+        address = getattr(pointer, 'value', pointer)
+        if not address:
+            gl.bind_buffer(gl.PIXEL_PACK_BUFFER, 0)
+            raise RuntimeError('Could not map pixel buffer object {}'.format(self._pbos[slot]))
+        try:
+            mapped = raw._ffi.buffer(raw._ffi.cast('char *', address), self.size)
+            np.copyto(self._flat_frames[slot], np.frombuffer(mapped, dtype=np.uint8))
+        finally:
+            gl.unmap_buffer(gl.PIXEL_PACK_BUFFER)
+            gl.bind_buffer(gl.PIXEL_PACK_BUFFER, 0)
+        counters = self.counters
+        counters['completed'] += 1
+        counters['bytes'] += self.size
+        counters['seconds'] = _timer() - self._start
+        return index, self._frame(slot)
+
+    def read(self):
+        '''Starts reading the current frame back
+
+        Reads from the offscreen framebuffer, or from the framebuffer
+        bound for reading when the readback is not offscreen.
+
+        Returns:
+            tuple: (index, pixels) of frame index - latency, or None until
+                latency frames have been read
+        '''
+        if self._start is None:
+            self._start = _timer()
+        slot = self._head
+        if self.framebuffer is not None:
+            gl.bind_framebuffer(gl.READ_FRAMEBUFFER, self.framebuffer)
+        gl.bind_buffer(gl.PIXEL_PACK_BUFFER, self._pbos[slot])
+        gl.pixel_storei(gl.PACK_ALIGNMENT, 1)
+        gl.read_pixels(0, 0, self.width, self.height, gl.RGBA, gl.UNSIGNED_BYTE, ctypes.c_void_p(0))
+        gl.bind_buffer(gl.PIXEL_PACK_BUFFER, 0)
+        if self.framebuffer is not None:
+            gl.bind_framebuffer(gl.READ_FRAMEBUFFER, 0)
+        fence = gl.fence_sync(gl.SYNC_GPU_COMMANDS_COMPLETE, 0)
+        self._pending[slot] = (self.counters['submitted'], fence)
+        self.counters['submitted'] += 1
+        # Complete the oldest readback so the next read finds its PBO free
+        self._head = (slot + 1) % self.buffers
+        if self._pending[self._head] is not None:
+            return self._complete(self._head)
+        return None
+
+    def flush(self):
+        '''Completes every pending readback in frame order
+
+        Arrays are reused, so each frame must be consumed before the next
+        is requested.
+
+        Yields:
+            tuple: (index, pixels) of each pending frame
+        '''
+        for offset in range(self.buffers):
+            slot = (self._head + offset) % self.buffers
+            if self._pending[slot] is not None:
+                yield self._complete(slot)
+
+    def delete(self):
+        '''Deletes the OpenGL objects of the readback'''
+        for slot, pending in enumerate(self._pending):
+            if pending is not None and pending[1] is not None:
+                gl.delete_sync(pending[1])
+            self._pending[slot] = None
+        if self._pbos:
+            gl.delete_buffers(len(self._pbos), self._pbos)
+            self._pbos = []
+        if self.framebuffer is not None:
+            gl.delete_framebuffers(1, [self.framebuffer])
+            self.framebuffer = None
+        if self._renderbuffers:
+            gl.delete_renderbuffers(len(self._renderbuffers), self._renderbuffers)
+            self._renderbuffers = []
+
+    def __repr__(self):
+        cname = self.__class__.__name__
+        string = '<{cname} {width}x{height} buffers={buffers} completed={completed}>'
+        return string.format(
+            cname=cname, width=self.width, height=self.height, buffers=self.buffers,
+            completed=self.counters['completed'])
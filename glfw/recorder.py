@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+'''
+Streaming frame capture from a background thread
+
+A FrameRecorder reads the frames of a window back asynchronously (see
+glfw.FramebufferReadback) and hands them to a worker thread that writes
+them as raw RGBA, as a sequence of PNG images or into the standard input
+of an encoder process.  Rendering only waits for the worker when the
+queue is full and the policy is 'block'; with the 'drop' policy frames
+that do not fit in the queue are dropped and counted instead.
+
+Usage:
+
+    >>> command = ['ffmpeg', '-y', '-f', 'rawvideo', '-pix_fmt', 'rgba',
+    ...            '-s', '640x480', '-i', '-', 'out.mp4']
+    >>> with glfw.FrameRecorder(command, 640, 480, format='pipe') as recorder:
+    ...     while not glfw.window_should_close(win):
+    ...         render()
+    ...         recorder.swap_buffers(win)  # captures, then swaps
+    ...         glfw.poll_events()
+    >>> recorder.counters
+    {'captured': ..., 'written': ..., 'dropped': ..., ...}
+
+Formats:
+
+    raw: frames are appended to one file, top row first
+    png: path is formatted with the frame index, e.g. 'frame-{:06d}.png'
+    pipe: path is a command (list) started with its standard input piped
+
+numpy is required, and OpenGL 3.2 for capturing from a window.
+'''
+from __future__ import absolute_import, division, print_function, unicode_literals  # noqa
+
+import struct
+import subprocess
+import threading
+import zlib
+
+try:
+    import queue
+except ImportError:  # pragma: no cover
+    import Queue as queue
+
+from . import api
+from .input import _numpy
+from .readback import FramebufferReadback
+
+formats = ('raw', 'png', 'pipe')
+policies = ('drop', 'block')
+
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+def _png_chunk(kind, data):
+    '''Returns a PNG chunk with its length and crc'''
+    crc = zlib.crc32(kind)
+    crc = zlib.crc32(data, crc) & 0xffffffff
+    return struct.pack(b'>I', len(data)) + kind + data + struct.pack(b'>I', crc)
+
+
+class FrameRecorder(object):
+    '''Streams frames to disk or an encoder from a worker thread
+
+    Args:
+        path: file for raw, filename pattern for png or command for pipe
+        width(int): width of the frames
+        height(int): height of the frames
+        format(str): one of raw, png or pipe
+        queue_size(int): frames that may wait for the worker
+        policy(str): 'drop' frames or 'block' rendering when the queue
+            is full
+        buffers(int): readback buffers; see glfw.FramebufferReadback
+        compression(int): zlib level for png [default: 1 (fastest)]
+
+    Attributes:
+        counters(dict): frames captured from the window, written, dropped
+            because the queue was full or writing failed, bytes written and
+            the highest number of frames waiting (max_queued)
+    '''
+
+    def __init__(self, path, width, height, format='raw', queue_size=8, policy='drop', buffers=3, compression=1):
+        np = _numpy()
+        if format not in formats:
+            raise ValueError('Unknown format {!r}; expected one of {}'.format(format, ', '.join(formats)))
+        if policy not in policies:
+            raise ValueError('Unknown policy {!r}; expected one of {}'.format(policy, ', '.join(policies)))
+        self.path = path
+        self.width = int(width)
+        self.height = int(height)
+        self.format = format
+        self.policy = policy
+        self.buffers = buffers
+        self.compression = compression
+        self.counters = {
+            'captured': 0,
+            'written': 0,
+            'dropped': 0,
+            'bytes': 0,
+            'max_queued': 0,
+        }
+        self.readback = None
+        self._error = None
+        self._closed = False
+        # Frames are dropped by both the rendering and the worker thread
+        self._dropped_lock = threading.Lock()
+        # Frames are copied into preallocated arrays that travel between
+        #  the free and the work queues, so nothing is allocated per frame
+        self._free = queue.Queue()
+        for _ in range(int(queue_size)):
+            self._free.put(np.zeros((self.height, self.width, 4), dtype=np.uint8))
+        self._work = queue.Queue()
+        self._open()
+        self._thread = threading.Thread(target=self._run, name='FrameRecorder')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _open(self):
+        np = _numpy()
+        self._file = None
+        self._process = None
+        if self.format == 'raw':
+            self._file = open(self.path, 'wb')
+        elif self.format == 'pipe':
+            # Unbuffered, so frames only count as written once the encoder has them
+            self._process = subprocess.Popen(self.path, stdin=subprocess.PIPE, bufsize=0)
+            self._file = self._process.stdin
+        else:
+            # Each PNG row starts with its filter type (0: none)
+            self._rows = np.zeros((self.height, self.width * 4 + 1), dtype=np.uint8)
+            header = struct.pack(b'>IIBBBBB', self.width, self.height, 8, 6, 0, 0, 0)
+            self._png_header = _PNG_SIGNATURE + _png_chunk(b'IHDR', header)
+            self._png_end = _png_chunk(b'IEND', b'')
+
+    def _write_frame(self, index, frame):
+        '''Writes one frame; runs on the worker thread
+
+        Returns:
+            int: bytes written
+        '''
+        if self.format == 'png':
+            self._rows[:, 1:] = frame.reshape(self.height, self.width * 4)
+            data = self._png_header
+            data += _png_chunk(b'IDAT', zlib.compress(self._rows.data, self.compression))
+            data += self._png_end
+            with open(self.path.format(index), 'wb') as fd:
+                fd.write(data)
+            return len(data)
+        if self._process is None:
+            self._file.write(frame.data)
+            return frame.nbytes
+        data = frame.reshape(-1).data
+        while len(data):
+            # Unbuffered pipes may accept part of a frame
+            written = self._file.write(data)
+            if written is None:  # python 2 files write everything
+                break
+            data = data[written:]
+        return frame.nbytes
+
+    def _run(self):
+        while True:
+            item = self._work.get()
+            if item is None:
+                break
+            index, frame = item
+            try:
+                if self._error is None:
+                    self.counters['bytes'] += self._write_frame(index, frame)
+                    self.counters['written'] += 1
+                else:
+                    self._drop()
+            except Exception as error:
+                self._error = error
+                self._drop()
+            finally:
+                self._free.put(frame)
+
+    def _drop(self):
+        with self._dropped_lock:
+            self.counters['dropped'] += 1
+
+    def _check(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def write(self, index, pixels, flip=False):
+        '''Queues a frame for the worker
+
+        Args:
+            index(int): frame index (used to name png files)
+            pixels(numpy.ndarray): (height, width, 4) uint8 frame; copied
+            flip(bool): reverse the rows (OpenGL frames are bottom row first)
+
+        Returns:
+            bool: False when the frame was dropped
+        '''
+        self._check()
+        try:
+            frame = self._free.get(block=self.policy == 'block')
+        except queue.Empty:
+            self._drop()
+            return False
+        _numpy().copyto(frame, pixels[::-1] if flip else pixels)
+        self._work.put((index, frame))
+        queued = self._work.qsize()
+        if queued > self.counters['max_queued']:
+            self.counters['max_queued'] = queued
+        return True
+
+    def capture(self):
+        '''Starts reading the back buffer of the current context
+
+        Call after rendering a frame and before swapping buffers.  Frames
+        are queued once their readback completes, a few frames later.
+        '''
+        if self.readback is None:
+            self.readback = FramebufferReadback(self.width, self.height, buffers=self.buffers, offscreen=False)
+        self.counters['captured'] += 1
+        completed = self.readback.read()
+        if completed is not None:
+            self.write(completed[0], completed[1], flip=True)
+
+    def swap_buffers(self, window):
+        '''Captures the frame of window, then swaps its buffers'''
+        self.capture()
+        api.swap_buffers(window)
+
+    def close(self):
+        '''Writes pending frames and waits for the worker to finish
+
+        Raises:
+            subprocess.CalledProcessError: the encoder exited with an error
+        '''
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            if self.readback is not None:
+                try:
+                    for index, pixels in self.readback.flush():
+                        self.write(index, pixels, flip=True)
+                finally:
+                    self.readback.delete()
+                    self.readback = None
+        finally:
+            # Stops the worker and the encoder even when a write failed
+            self._work.put(None)
+            self._thread.join()
+            try:
+                if self._file is not None:
+                    self._file.close()
+            finally:
+                if self._process is not None and self._process.wait():
+                    # Explains the broken pipe errors of a failing encoder
+                    self._error = subprocess.CalledProcessError(self._process.returncode, self.path)
+        self._check()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __repr__(self):
+        cname = self.__class__.__name__
+        string = '<{cname} {format} written={written} dropped={dropped}>'
+        return string.format(cname=cname, format=self.format, **self.counters)
@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+'''
+Rendering on a dedicated thread while the main thread processes events
+
+Glfw must process events on the main thread, so a render loop sharing
+that thread (swap_buffers followed by poll_events) only sees input once
+per frame: with a 30 ms frame, input waits 15 ms on average before any
+code runs.  A RenderThread splits the loop in two:
+
+    * the main thread sleeps in glfw.wait_events, forwards input and
+      window events to the render thread as they arrive, and executes
+      window operations (set title, resize, close) requested by it
+    * the render thread owns the OpenGL context and renders frames,
+      receiving the events which arrived since its previous frame
+
+Each direction uses a bounded CommandQueue.  A queue is a deque whose
+append and popleft are atomic, so neither thread takes a lock to queue
+or drain; the render thread sleeps on a threading.Event only when it is
+not rendering continuously, and the main thread is woken with
+glfwPostEmptyEvent.
+
+Usage:
+
+    >>> def render(thread, events):
+    ...     for event in events:
+    ...         if event.type == 'key':
+    ...             thread.set_title('Key {}'.format(event.args[0]))
+    ...     gl.clear(gl.COLOR_BUFFER_BIT)
+    >>> thread = glfw.RenderThread(win, render)
+    >>> thread.run()  # returns once the window is closed
+
+Events are glfw.events.Event tuples.  A window_close event stops the
+render thread after the frame receiving it, unless handle_close=False
+(then call thread.close() to stop).
+'''
+from __future__ import absolute_import, division, print_function, unicode_literals  # noqa
+
+import collections
+import threading
+
+from . import raw
+from .events import Event, _check_types, _get_setter, _set_callbacks
+
+
+class CommandQueue(object):
+    '''Bounded queue without locks for passing items between threads
+
+    Items put while the queue holds capacity items are dropped; put may
+    be called from any thread, but concurrent producers may overshoot
+    the capacity by one item each.
+
+    Args:
+        capacity(int): maximum number of queued items
+        wake: function called after an item is queued
+
+    Attributes:
+        dropped(int): items dropped because the queue was full
+    '''
+
+    def __init__(self, capacity=256, wake=None):
+        self.capacity = int(capacity)
+        self.dropped = 0
+        self._items = collections.deque()
+        self._wake = wake
+
+    def __len__(self):
+        return len(self._items)
+
+    def put(self, item):
+        '''Queues an item
+
+        Returns:
+            bool: False if the item was dropped
+        '''
+        if len(self._items) >= self.capacity:
+            self.dropped += 1
+            return False
+        self._items.append(item)
+        if self._wake is not None:
+            self._wake()
+        return True
+
+    def drain(self):
+        '''Returns the queued items, oldest first'''
+        items = []
+        popleft = self._items.popleft
+        try:
+            while True:
+                items.append(popleft())
+        except IndexError:
+            pass
+        return items
+
+    def __repr__(self):
+        cname = self.__class__.__name__
+        string = '<{cname} {count}/{capacity} dropped={dropped}>'
+        return string.format(cname=cname, count=len(self), capacity=self.capacity, dropped=self.dropped)
+
+
+class RenderThread(object):
+    '''Renders a window on a thread owning its context
+
+    Args:
+        window(ffi.CData): window handle; its context must not be current
+            on another thread when run() is called
+        render: function called as render(thread, events) for each frame
+            with the events received since the previous frame; frames
+            are presented with swap_buffers after it returns
+        setup: function called as setup(thread) once the context is
+            current on the render thread
+        types(list): event type names forwarded to the render thread
+            [default: all]
+        capacity(int): capacity of the queue in each direction
+        continuous(bool): render frames continuously; if False, a frame
+            is rendered only when events arrive or invalidate() is called
+        swap_interval(int): swap interval set on the render thread
+        handle_close(bool): stop after a window_close event
+
+    Attributes:
+        events(CommandQueue): events queued for the render thread
+        commands(CommandQueue): window operations queued for the main thread
+        error: exception raised on the render thread, re-raised by run()
+        counters(dict): frames rendered, events forwarded and main thread
+            commands executed
+    '''
+
+    def __init__(self, window, render, setup=None, types=None, capacity=256, continuous=True, swap_interval=1,
+                 handle_close=True):
+        types = _check_types(types)
+        self.window = window
+        self.types = types
+        self._render = render
+        self._setup = setup
+        self.continuous = continuous
+        self.swap_interval = swap_interval
+        self.handle_close = handle_close
+        self._ready = threading.Event()
+        self.events = CommandQueue(capacity, wake=self._ready.set)
+        self.commands = CommandQueue(capacity, wake=raw._glfw.glfwPostEmptyEvent)
+        self.error = None
+        self._running = False
+        self._thread = None
+        self._callbacks = {}
+        self.counters = {
+            'frames': 0,
+            'events': 0,
+            'commands': 0,
+        }
+
+    def _get_handler(self, name):
+        put = self.events.put
+        get_time = raw._glfw.glfwGetTime
+        counters = self.counters
+
+        def handler(window, *args):
+            counters['events'] += 1
+            put(Event(name, window, get_time(), args))
+
+        return handler
+
+    def _run(self):
+        glfw = raw._glfw
+        try:
+            glfw.glfwMakeContextCurrent(self.window)
+            glfw.glfwSwapInterval(self.swap_interval)
+            if self._setup is not None:
+                self._setup(self)
+            while self._running:
+                if not self.continuous:
+                    self._ready.wait()
+                self._ready.clear()
+                events = self.events.drain()
+                self._render(self, events)
+                glfw.glfwSwapBuffers(self.window)
+                self.counters['frames'] += 1
+                if self.handle_close and any(event.type == 'window_close' for event in events):
+                    self._running = False
+        except Exception as error:
+            self.error = error
+        finally:
+            self._running = False
+            glfw.glfwMakeContextCurrent(raw._ffi.NULL)
+            glfw.glfwPostEmptyEvent()
+
+    def invalidate(self):
+        '''Requests a frame when not rendering continuously'''
+        self._ready.set()
+
+    def call(self, function, *args):
+        '''Queues function(*args) to be called on the main thread
+
+        Returns:
+            bool: False if the command queue was full
+        '''
+        return self.commands.put((function, args))
+
+    def set_title(self, title):
+        '''Queues glfw.set_window_title on the main thread'''
+        return self.call(raw._glfw.glfwSetWindowTitle, self.window, title.encode('utf-8'))
+
+    def set_size(self, width, height):
+        '''Queues glfw.set_window_size on the main thread'''
+        return self.call(raw._glfw.glfwSetWindowSize, self.window, width, height)
+
+    def close(self):
+        '''Stops the render thread and marks the window to be closed'''
+        self._running = False
+        self._ready.set()
+        return self.call(raw._glfw.glfwSetWindowShouldClose, self.window, 1)
+
+    def process_commands(self):
+        '''Executes the window operations queued by the render thread
+
+        Called on the main thread whenever it wakes; override to do more
+        work on the main thread.
+
+        Returns:
+            int: number of commands executed
+        '''
+        commands = self.commands.drain()
+        for function, args in commands:
+            function(*args)
+        self.counters['commands'] += len(commands)
+        return len(commands)
+
+    def start(self):
+        '''Sets the window callbacks and starts the render thread'''
+        if self._thread is not None:
+            raise RuntimeError('The render thread is already running')
+        glfw = raw._glfw
+        if glfw.glfwGetCurrentContext() == self.window:
+            glfw.glfwMakeContextCurrent(raw._ffi.NULL)
+        self._callbacks, _ = _set_callbacks(self.window, self.types, self._get_handler)
+        self.error = None
+        self._running = True
+        self._ready.set()  # the first frame
+        self._thread = threading.Thread(target=self._run, name='glfw-render')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        '''Stops the render thread and unsets the window callbacks'''
+        self._running = False
+        self._ready.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.process_commands()
+        for name in self._callbacks:
+            _get_setter(name)(self.window, raw._ffi.NULL)
+
+    def run(self, timeout=None):
+        '''Processes events on the main thread until the render thread stops
+
+        Args:
+            timeout(float): longest wait for events in seconds
+                [default: wait until an event arrives]
+        '''
+        glfw = raw._glfw
+        self.start()
+        try:
+            while self._running:
+                if timeout is None:
+                    glfw.glfwWaitEvents()
+                else:
+                    glfw.glfwWaitEventsTimeout(timeout)
+                self.process_commands()
+        finally:
+            self.stop()
+        if self.error is not None:
+            raise self.error
+
+    def __repr__(self):
+        cname = self.__class__.__name__
+        string = '<{cname} running={running} frames={frames}>'
+        return string.format(cname=cname, running=self._running, frames=self.counters['frames'])
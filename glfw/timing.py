@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+'''
+Frame timing instrumentation built on glfwGetTime
+
+A FrameTimer records the CPU time of every frame split into phases,
+by default render, swap (swap_buffers) and poll (poll_events), into a
+fixed-size numpy ring buffer.  Recording a frame only writes into the
+ring; percentiles, jank and frames per second are computed from the
+ring when asked for.
+
+Usage:
+
+    >>> timer = glfw.FrameTimer(size=600)
+    >>> while not glfw.window_should_close(win):
+    ...     render()
+    ...     timer.swap_buffers(win)  # ends the render phase, times the swap
+    ...     timer.poll_events()  # times the poll and ends the frame
+    >>> timer.percentiles()
+    {50: 0.0166, 95: 0.0171, 99: 0.0334}
+    >>> timer.summary()['jank']
+    2
+
+Phases may also be marked by hand:
+
+    >>> timer.mark('render')  # time since the previous mark
+    >>> timer.end_frame()
+
+numpy is required to use this module, but is only imported when a
+timer is created.
+'''
+from __future__ import absolute_import, division, print_function, unicode_literals  # noqa
+
+from . import raw
+from .input import _numpy
+
+phases = ('render', 'swap', 'poll')
+
+
+class FrameTimer(object):
+    '''Records per-frame phase timings into a ring buffer
+
+    Args:
+        size(int): number of frames kept
+        phases(tuple): names of the phases of a frame
+        clock: function returning seconds [default: glfwGetTime]
+
+    Attributes:
+        times(numpy.ndarray): (size, len(phases) + 1) seconds per phase
+            with the frame total in the last column; use frames() for the
+            recorded rows in order
+        count(int): frames recorded since the timer was created or reset
+    '''
+
+    def __init__(self, size=600, phases=phases, clock=None):
+        np = _numpy()
+        self.size = int(size)
+        self.phases = tuple(phases)
+        self._columns = {phase: column for column, phase in enumerate(self.phases)}
+        self._total = len(self.phases)
+        self.times = np.zeros((self.size, len(self.phases) + 1), dtype=np.float64)
+        self._current = np.zeros(len(self.phases) + 1, dtype=np.float64)
+        if clock is None:
+            # glfwGetTime is called directly, so glfw must be initialized first
+            raw._ensure_init()
+            clock = raw._glfw.glfwGetTime
+        self._clock = clock
+        self.reset()
+
+    def reset(self):
+        '''Forgets recorded frames and starts a new frame'''
+        self.times[:] = 0.0
+        self._current[:] = 0.0
+        self.count = 0
+        self._row = 0
+        self._frame_start = self._last = self._clock()
+
+    def mark(self, phase):
+        '''Adds the time since the previous mark to a phase of this frame'''
+        now = self._clock()
+        self._current[self._columns[phase]] += now - self._last
+        self._last = now
+
+    def end_frame(self):
+        '''Records the current frame and starts the next one'''
+        now = self._clock()
+        current = self._current
+        current[self._total] = now - self._frame_start
+        self.times[self._row] = current
+        current[:] = 0.0
+        self._frame_start = self._last = now
+        self.count += 1
+        self._row = (self._row + 1) % self.size
+
+    def swap_buffers(self, window):
+        '''Marks the render phase and times glfw.swap_buffers as swap'''
+        self.mark('render')
+        raw._glfw.glfwSwapBuffers(window)
+        self.mark('swap')
+
+    def poll_events(self):
+        '''Times glfw.poll_events as poll and ends the frame'''
+        self._last = self._clock()
+        raw._glfw.glfwPollEvents()
+        self.mark('poll')
+        self.end_frame()
+
+    def frames(self, phase=None):
+        '''Returns the recorded frames, oldest first
+
+        Args:
+            phase(str): only return the column of a phase, or 'total'
+
+        Returns:
+            numpy.ndarray: seconds per frame (and phase)
+        '''
+        np = _numpy()
+        if self.count <= self.size:
+            rows = self.times[:self.count]
+        else:
+            rows = np.concatenate([self.times[self._row:], self.times[:self._row]])
+        if phase is None:
+            return rows
+        column = self._total if phase == 'total' else self._columns[phase]
+        return rows[:, column]
+
+    def percentiles(self, percentiles=(50, 95, 99), phase='total'):
+        '''Returns rolling percentiles of frame (or phase) times
+
+        Returns:
+            dict: seconds by percentile; empty before the first frame
+        '''
+        np = _numpy()
+        times = self.frames(phase)
+        if not len(times):
+            return {}
+        values = np.percentile(times, percentiles)
+        return {percentile: float(value) for percentile, value in zip(percentiles, values)}
+
+    def jank(self, factor=2.0, threshold=None):
+        '''Counts frames taking longer than factor times the median
+
+        Args:
+            factor(float): multiple of the median frame time
+            threshold(float): seconds; used instead of factor if given
+
+        Returns:
+            int: number of janky frames within the ring
+        '''
+        np = _numpy()
+        times = self.frames('total')
+        if not len(times):
+            return 0
+        if threshold is None:
+            threshold = factor * np.median(times)
+        return int(np.count_nonzero(times > threshold))
+
+    @property
+    def fps(self):
+        '''float: frames per second over the ring'''
+        times = self.frames('total')
+        seconds = float(times.sum())
+        return len(times) / seconds if seconds else 0.0
+
+    def summary(self, percentiles=(50, 95, 99)):
+        '''Returns fps, jank and percentiles of the total and each phase'''
+        summary = {
+            'frames': min(self.count, self.size),
+            'fps': self.fps,
+            'jank': self.jank(),
+        }
+        for phase in self.phases + ('total', ):
+            summary[phase] = self.percentiles(percentiles, phase)
+        return summary
+
+    def __repr__(self):
+        cname = self.__class__.__name__
+        string = '<{cname} frames={frames} fps={fps:.1f}>'
+        return string.format(cname=cname, frames=self.count, fps=self.fps)
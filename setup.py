@@ -249,6 +249,23 @@ def get_console_scripts(metadata):
     return scripts
 
 
+def get_cffi_modules():
+    '''Convenience function to wrap the optional compiled extension.
+
+    The compiled (API mode) extension requires a C compiler and the glfw
+    development headers, so it is opt-in:
+
+        $ GLFW_CFFI_COMPILE=1 pip install .
+
+    Returns:
+        list: cffi_modules listed in format required by setup
+    '''
+    modules = []
+    if os.environ.get('GLFW_CFFI_COMPILE', '').lower() in ('1', 'true', 'yes', 'on'):
+        modules.append('glfw/_build.py:build_ffi')
+    return modules
+
+
 def main():
     '''Sets up the package'''
     metadata = get_package_metadata()
@@ -258,6 +275,11 @@ def main():
     extras = {k: v for k, v in requirements.items() if k != 'requirements'}
     year = metadata.get('copyright_years') or datetime.datetime.now().year
     lic = metadata.get('license') or 'Copyright {year} - all rights reserved'.format(year=year)
+    cffi_modules = get_cffi_modules()
+    extension_options = {}
+    if cffi_modules:
+        requirements['setup'] = (requirements.get('setup') or []) + ['cffi>=1.0.0']
+        extension_options['cffi_modules'] = cffi_modules
 
     # Run setup
     setup(
@@ -288,6 +310,9 @@ def main():
         platforms=['any'],
         classifiers=classifiers,
         zip_safe=False,
+
+        # Optional compiled extension
+        **extension_options
     )
 
 
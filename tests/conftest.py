@@ -1,6 +1,11 @@
 # -*- coding: utf-8 -*-
+import sys
+
 from fixtures import *  # noqa
 
+# asyncio integration requires python 3.5+ syntax
+collect_ignore = ['test_aio.py'] if sys.version_info < (3, 5) else []
+
 
 def pytest_addoption(parser):
     parser.addoption("--stress", action="store_true", help="run stress tests")
@@ -41,71 +41,124 @@ def primary_monitor():
     return mon
 
 
-@pytest.fixture(scope="function")
-def opengl_version(primary_monitor):
+class WindowPool(object):
+    '''Hidden windows leased by the window fixtures
+
+    Creating a context dominates the time of the window tests, so windows
+    are returned to the pool after each test with their GL state reset and
+    leased again by later tests.  Windows that cannot be reset, and every
+    window once glfw is terminated, are dropped instead.
+    '''
+
+    titles = {
+        'window': 'Test Fixture Window',
+        'fullscreen': 'Test Fixture Fullscreen',
+        'windowed_fullscreen': 'Test Fixture Windowed Fullscreen',
+    }
+    # Use the monitor's window so that it doesn't reset all other monitors
+    monitors = {
+        'window': None,
+        'fullscreen': 'primary',
+        'windowed_fullscreen': 0,
+    }
+
+    def __init__(self, opengl_version):
+        self.opengl_version = opengl_version
+        self.generation = None
+        self.free = {}
+        self.created = 0
+        self.reused = 0
+
+    def _check(self):
+        '''Drops windows destroyed by glfw.terminate'''
+        import glfw
+        if self.generation != glfw.raw._init_count[0] or not glfw.raw._initialized[0]:
+            self.free = {}
+            self.generation = glfw.raw._init_count[0]
+
+    def lease(self, kind):
+        import glfw
+        glfw.init()
+        assert glfw.init() == glfw.gl.TRUE
+        self._check()
+
+        free = self.free.get(kind)
+        if free:
+            win = free.pop()
+            self.reused += 1
+        else:
+            setup_window(*self.opengl_version)
+            monitor = glfw.Monitor()
+            win = glfw.create_window(
+                title=self.titles[kind],
+                width=monitor.width,
+                height=monitor.height,
+                monitor=self.monitors[kind])
+            glfw.default_window_hints()
+            self.created += 1
+        glfw.core.make_context_current(win)
+        return win
+
+    def release(self, kind, win):
+        import glfw
+        from glfw import gl
+        self._check()
+        if not glfw.raw._initialized[0] or win is None or win == glfw.ffi.NULL:
+            return
+        try:
+            glfw.core.make_context_current(win)
+            glfw.set_window_should_close(win, False)
+            width, height = glfw.get_framebuffer_size(win)
+            gl.viewport(0, 0, width, height)
+            gl.disable(gl.DEPTH_TEST)
+            gl.disable(gl.BLEND)
+            gl.clear_color(0, 0, 0, 0)
+            gl.clear(gl.COLOR_BUFFER_BIT | gl.DEPTH_BUFFER_BIT)
+            gl.finish()
+        except Exception:
+            # A test left the context unusable (e.g. within glBegin)
+            glfw.destroy_window(win)
+        else:
+            self.free.setdefault(kind, []).append(win)
+        finally:
+            glfw.core.make_context_current(glfw.ffi.NULL)
+
+    def close(self):
+        import glfw
+        self._check()
+        if glfw.raw._initialized[0]:
+            for windows in self.free.values():
+                for win in windows:
+                    glfw.destroy_window(win)
+        self.free = {}
+
+
+@pytest.fixture(scope="session")
+def opengl_version():
     import glfw
-    from glfw import ffi
     glfw.init()
     assert glfw.init() == glfw.gl.TRUE
 
-    # win = glfw.create_window()
-    # print('GL Version: {}'.format(glfw.gl.get_string(glfw.gl.VERSION)))
-    # default = (
-    #     glfw.gl.get_integerv(glfw.gl.MAJOR_VERSION),
-    #     glfw.gl.get_integerv(glfw.gl.MINOR_VERSION)
-    # )
-    # print('getIntegerV(Major,Minor): {}'.format(default))
-
-    opengl_version = None
-    versions = [
-        (4, 5), (4, 4), (4, 3), (4, 2), (4, 1), (4, 0),
-        (3, 3), (3, 2), (3, 1), (3, 0),
-        (2, 1), (2, 0),
-        (1, 5), (1, 4), (1, 3), (1, 2), (1, 1), (1, 0),
-    ]
-    title = 'opengl version finder'
-    width, height = primary_monitor.width, primary_monitor.height
-
-    if not glfw.core.init():
-        glfw.terminate()
-        raise RuntimeError('Could not initialize GLFW')
-
-    for major, minor in versions:
-        try:
-            setup_window(major, minor)
-            window = glfw.create_window(width=width, height=height, title=title, monitor=primary_monitor)
-            if window != ffi.NULL:
-                glfw.destroy_window(window)
-                if opengl_version is None:
-                    opengl_version = (major, minor)
-                    break
-            elif 0:
-                emsg = 'Could not create context using GL version: {major}.{minor}'
-                print(emsg.format(major=major, minor=minor))
-        except Exception as e:
-            import traceback
-            print(traceback.format_exc())
-            opengl_version = None
+    # Probed once per process (and cached on disk between runs)
+    info = glfw.probe_context_versions()
+    opengl_version = info.core or info.compat
     if opengl_version is None:
         raise RuntimeError('OpenGL context could not be generated.')
     return opengl_version
 
 
-@pytest.fixture(scope="function")
-def window(primary_monitor, opengl_version):
-    import glfw
-    glfw.init()
-    assert glfw.init() == glfw.gl.TRUE
+@pytest.fixture(scope="session")
+def window_pool(opengl_version):
+    pool = WindowPool(opengl_version)
+    yield pool
+    pool.close()
 
-    major, minor = opengl_version
-    setup_window(major, minor)
 
-    title = 'Test Fixture Window'
-    width = primary_monitor.width
-    height = primary_monitor.height
-    win = glfw.create_window(title=title, width=width, height=height)
-    glfw.core.make_context_current(win)
-    return win
+@pytest.fixture(scope="function")
+def window(window_pool):
+    win = window_pool.lease('window')
+    yield win
+    window_pool.release('window', win)
 
 
 @pytest.fixture(scope='function')
@@ -129,36 +182,14 @@ def opengl_info(opengl_version, window):
 
 
 @pytest.fixture(scope="function")
-def fullscreen(primary_monitor, opengl_version):
-    import glfw
-    glfw.init()
-    assert glfw.init() == glfw.gl.TRUE
-
-    major, minor = opengl_version
-    setup_window(major, minor)
-
-    title = 'Test Fixture Fullscreen'
-    # Use the monitor's window so that it doesn't reset all other monitors
-    # This actually reduces test time.
-    width, height = primary_monitor.width, primary_monitor.height
-    win = glfw.create_window(title=title, width=width, height=height, monitor='primary')
-    glfw.core.make_context_current(win)
-    return win
+def fullscreen(window_pool):
+    win = window_pool.lease('fullscreen')
+    yield win
+    window_pool.release('fullscreen', win)
 
 
 @pytest.fixture(scope="function")
-def windowed_fullscreen(primary_monitor, opengl_version):
-    import glfw
-    glfw.init()
-    assert glfw.init() == glfw.gl.TRUE
-
-    major, minor = opengl_version
-    setup_window(major, minor)
-
-    title = 'Test Fixture Windowed Fullscreen'
-    # Use the monitor's window so that it doesn't reset all other monitors
-    # This actually reduces test time.
-    width, height = primary_monitor.width, primary_monitor.height
-    win = glfw.create_window(title=title, width=width, height=height, monitor=0)
-    glfw.core.make_context_current(win)
-    return win
+def windowed_fullscreen(window_pool):
+    win = window_pool.lease('windowed_fullscreen')
+    yield win
+    window_pool.release('windowed_fullscreen', win)
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function, division
+
+import asyncio
+import socket
+import threading
+import time
+
+import pytest
+
+
+@pytest.mark.unit
+def test_aio_timers():
+    import glfw.aio
+
+    async def sleep():
+        start = time.time()
+        await asyncio.sleep(0.05)
+        return time.time() - start
+
+    loop = glfw.aio.new_event_loop()
+    try:
+        assert loop.run_until_complete(sleep()) >= 0.05
+        # The loop waited within glfw rather than in select()
+        assert loop.counters['waits'] >= 1
+    finally:
+        loop.close()
+
+
+@pytest.mark.unit
+def test_aio_wake_from_thread():
+    import glfw.aio
+
+    loop = glfw.aio.new_event_loop()
+    future = loop.create_future()
+    thread = threading.Timer(0.05, loop.call_soon_threadsafe, (future.set_result, 'woken'))
+    thread.start()
+    try:
+        start = time.time()
+        assert loop.run_until_complete(asyncio.wait_for(future, 5)) == 'woken'
+        assert time.time() - start < 1
+    finally:
+        thread.join()
+        loop.close()
+
+
+@pytest.mark.unit
+def test_aio_sockets():
+    import glfw.aio
+
+    reader, writer = socket.socketpair()
+    reader.setblocking(False)
+
+    async def receive():
+        return await loop.sock_recv(reader, 16)
+
+    loop = glfw.aio.new_event_loop()
+    thread = threading.Timer(0.05, writer.send, (b'data', ))
+    thread.start()
+    try:
+        assert loop.run_until_complete(asyncio.wait_for(receive(), 5)) == b'data'
+    finally:
+        thread.join()
+        loop.close()
+        reader.close()
+        writer.close()
+
+
+@pytest.mark.unit
+def test_aio_events(window):
+    import glfw.aio
+
+    events = glfw.aio.events(window, types=['key', 'window_close'])
+    received = []
+
+    async def consume():
+        async for event in events:
+            received.append((event.type, event.args))
+
+    async def produce():
+        await asyncio.sleep(0.01)
+        # Invoke the callbacks glfw would call while processing events
+        events._callbacks['key'](window, glfw.KEY_A, 0, glfw.PRESS, 0)
+        events._callbacks['key'](window, glfw.KEY_A, 0, glfw.RELEASE, 0)
+        await asyncio.sleep(0.01)
+        events._callbacks['window_close'](window)
+
+    async def main():
+        await asyncio.gather(consume(), produce())
+
+    glfw.aio.run(main())
+    assert received == [
+        ('key', (glfw.KEY_A, 0, glfw.PRESS, 0)),
+        ('key', (glfw.KEY_A, 0, glfw.RELEASE, 0)),
+        ('window_close', ()),
+    ]
+    with pytest.raises(ValueError):
+        glfw.aio.events(window, types=['unknown'])
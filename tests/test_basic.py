@@ -50,6 +50,36 @@ def test_basic_package_functions():
     assert glfw.get_action_string(glfw.RELEASE) == 'release'
 
 
+@pytest.mark.unit
+def test_lookup_tables():
+    import glfw
+    assert glfw.get_key_string(glfw.KEY_MENU) == 'menu'
+    assert glfw.get_key_string(glfw.KEY_UNKNOWN) == 'unknown'
+    assert glfw.get_key_string(100000) == 100000
+    assert glfw.get_mod_string(glfw.MOD_SHIFT | glfw.MOD_ALT) == 'alt+shift'
+    assert glfw.get_mod_string(0) == ''
+    assert glfw.get_mouse_button_string(glfw.MOUSE_BUTTON_8) == '8'
+    assert glfw.get_action_string(glfw.REPEAT) == 'repeat'
+    assert glfw.key_values['space'] == glfw.KEY_SPACE
+    assert glfw.mod_values['control'] == glfw.MOD_CONTROL
+    assert glfw.mouse_button_values['right'] == glfw.MOUSE_BUTTON_RIGHT
+    assert glfw.action_values['press'] == glfw.PRESS
+
+
+@pytest.mark.unit
+def test_lookup_tables_vectorized():
+    np = pytest.importorskip('numpy')
+    import glfw
+    keys = np.array([[glfw.KEY_A, glfw.KEY_UNKNOWN], [glfw.KEY_MENU, 100000]])
+    assert glfw.get_key_strings(keys).tolist() == [['a', 'unknown'], ['menu', 100000]]
+    mods = [0, glfw.MOD_SHIFT | glfw.MOD_CONTROL]
+    assert glfw.get_mod_strings(mods).tolist() == ['', 'control+shift']
+    buttons = np.arange(glfw.MOUSE_BUTTON_LEFT, glfw.MOUSE_BUTTON_MIDDLE + 1)
+    assert glfw.get_mouse_button_strings(buttons).tolist() == ['left', 'right', 'middle']
+    assert glfw.get_action_strings([glfw.PRESS, 7]).tolist() == ['press', 7]
+    assert glfw.get_key_strings([]).tolist() == []
+
+
 @pytest.mark.unit
 def test_basic_window(window):
     '''Runs a simple window example'''
@@ -163,6 +193,34 @@ def test_create_window(width, height, title, monitor, context, raise_exception):
     assert isinstance(window, glfw.ffi.CData)
 
 
+@pytest.mark.unit
+def test_create_windows():
+    import glfw
+    assert glfw.init() == glfw.gl.TRUE
+
+    # Windowed windows do not query any monitor
+    glfw.api._monitors.invalidate()
+    specs = [(64, 48), {'width': 32, 'height': 24, 'title': 'second'}, (16, 16, 'third')]
+    hints = {glfw.VISIBLE: False, glfw.CLIENT_API: glfw.NO_API}
+    windows = glfw.create_windows(specs, monitor=glfw.ffi.NULL, hints=hints, raise_exception=True)
+    try:
+        assert glfw.api._monitors._primary is None
+        assert [glfw.get_window_size(window) for window in windows] == [[64, 48], [32, 24], [16, 16]]
+        assert not any(glfw.get_window_attrib(window, glfw.VISIBLE) for window in windows)
+    finally:
+        for window in windows:
+            glfw.destroy_window(window)
+
+    # The hints do not apply to later windows
+    glfw.window_hint(glfw.CLIENT_API, glfw.NO_API)
+    window = glfw.create_window(8, 8, 'after', monitor=glfw.ffi.NULL, raise_exception=True)
+    try:
+        assert glfw.get_window_attrib(window, glfw.VISIBLE)
+    finally:
+        glfw.destroy_window(window)
+        glfw.default_window_hints()
+
+
 @pytest.mark.unit
 def test_monitor_repr():
     import glfw
@@ -182,6 +240,59 @@ def test_monitor_repr():
     )
 
 
+@pytest.mark.unit
+def test_monitor_registry():
+    import glfw
+    assert glfw.init() == glfw.gl.TRUE
+
+    monitors = glfw.get_monitors()
+    assert [id(m) for m in glfw.get_monitors()] == [id(m) for m in monitors]
+    monitor = monitors[0]
+    assert monitor.name == glfw.get_monitor_name(monitor.handle)
+    assert (monitor.handle, 'name') in glfw.api._monitors._attributes
+
+    # glfw reports configuration changes through the monitor callback
+    events = []
+    assert glfw.set_monitor_callback(lambda handle, event: events.append(event)) is None
+    try:
+        glfw.api._monitors._on_monitor(monitor.handle, glfw.CONNECTED)
+        assert events == [glfw.CONNECTED]
+        assert glfw.api._monitors._attributes == {}
+        assert glfw.get_monitors()[0] is monitor
+        glfw.api._monitors._on_monitor(monitor.handle, glfw.DISCONNECTED)
+        assert glfw.get_monitors()[0] is not monitor
+    finally:
+        glfw.set_monitor_callback(None)
+
+    # glfw.core callbacks are called by the registry rather than replacing it
+    @glfw.decorators.monitor_callback
+    def on_monitor(handle, event):
+        events.append(event)
+
+    assert glfw.core.set_monitor_callback(on_monitor) == glfw.ffi.NULL
+    try:
+        glfw.get_monitors()[0].name
+        glfw.api._monitors._on_monitor(monitor.handle, glfw.CONNECTED)
+        assert events[-1] == glfw.CONNECTED
+        assert glfw.api._monitors._attributes == {}
+    finally:
+        assert glfw.core.set_monitor_callback(glfw.ffi.NULL) == on_monitor
+    assert glfw.api._monitors.user_callback is None
+
+    # Moving a window between monitors may change their video modes
+    assert glfw.get_monitors()[0].name
+    assert glfw.api._monitors._attributes
+    glfw.window_hint(glfw.VISIBLE, False)
+    glfw.window_hint(glfw.CLIENT_API, glfw.NO_API)
+    window = glfw.create_window(32, 24, 'monitor', monitor=glfw.ffi.NULL, raise_exception=True)
+    try:
+        glfw.set_window_monitor(window, glfw.ffi.NULL, 0, 0, 64, 48, 0)
+        assert glfw.api._monitors._attributes == {}
+    finally:
+        glfw.destroy_window(window)
+        glfw.default_window_hints()
+
+
 # TODO: Fix this test.
 # @pytest.mark.unit
 # def test_create_window_exception():
@@ -223,6 +334,115 @@ def test_load_library(capfd, libname, expected_output):
         assert lib is None
 
 
+@pytest.mark.unit
+def test_ffi_mode():
+    import glfw
+    assert glfw.raw.ffi_mode in ('api', 'abi')
+    assert glfw.raw.library_path
+    assert glfw.raw.header_path
+
+
+@pytest.mark.unit
+def test_configure_auto_init():
+    import glfw
+    assert glfw.init() == glfw.gl.TRUE
+
+    assert glfw.configure(auto_init=False)['auto_init'] is False
+    assert glfw.raw._initialized[0] is False
+    # Initialized lazily on the first call that needs it
+    assert glfw.get_time() is not None
+    assert glfw.raw._initialized[0] is True
+    assert glfw.configure(auto_init=True)['auto_init'] is True
+    assert glfw.raw._initialized[0] is True
+
+
+@pytest.mark.unit
+def test_terminate_disables_auto_init():
+    import glfw
+    assert glfw.init() == glfw.gl.TRUE
+    init_count = glfw.raw._init_count[0]
+
+    assert glfw.terminate() is None
+    # Not initialized again behind the user's back
+    glfw.get_time()
+    assert glfw.raw._initialized[0] is False
+    assert glfw.raw._init_count[0] == init_count
+
+    assert glfw.init() == glfw.gl.TRUE
+    assert glfw.raw._initialized[0] is True
+    assert glfw.raw._init_count[0] == init_count + 1
+
+
+@pytest.mark.unit
+def test_configure_reuse_buffers():
+    tracemalloc = pytest.importorskip('tracemalloc')
+    import glfw
+    namespace = glfw.get_version.__globals__
+    new = namespace['_new']
+    allocations = []
+
+    def counting_new(ctype):
+        allocations.append(ctype)
+        return new(ctype)
+
+    assert isinstance(glfw.get_version(), list)
+    assert glfw.configure(reuse_buffers=True)['reuse_buffers'] is True
+    try:
+        version = glfw.get_version()
+        assert isinstance(version, tuple)
+        buffers = namespace['_local'].buffers
+        namespace['_new'] = counting_new
+        tracemalloc.start()
+        try:
+            # Warm up under tracing so objects recycled by python's free
+            #  lists are accounted for in both snapshots
+            for _ in range(10):
+                glfw.get_version()
+            before = tracemalloc.take_snapshot()
+            for _ in range(1000):
+                glfw.get_version()
+            after = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+        # No output pointers allocated and nothing left behind by the wrapper
+        assert allocations == []
+        assert namespace['_local'].buffers is buffers
+        assert glfw.get_version() == version
+        wrapper_filter = [tracemalloc.Filter(True, glfw.get_version.__code__.co_filename)]
+        growth = after.filter_traces(wrapper_filter).compare_to(before.filter_traces(wrapper_filter), 'lineno')
+        assert sum(stat.count_diff for stat in growth) == 0
+    finally:
+        namespace['_new'] = new
+        glfw.configure(reuse_buffers=False)
+    assert isinstance(glfw.get_version(), list)
+
+
+@pytest.mark.unit
+def test_deferred_import():
+    import os
+    import subprocess
+    import sys
+    env = dict(os.environ)
+    env['GLFW_CFFI_AUTO_INIT'] = '0'
+    script = 'import glfw; print(glfw.raw._initialized[0], glfw.KEY_A)'
+    output = subprocess.check_output([sys.executable, '-c', script], env=env)
+    assert output.decode('utf-8').split() == ['False', '65']
+
+
+@pytest.mark.unit
+def test_gl_lazy_names():
+    import OpenGL.GL
+    from glfw import gl
+    assert gl.COLOR_BUFFER_BIT is OpenGL.GL.GL_COLOR_BUFFER_BIT
+    assert gl.clear_color is OpenGL.GL.glClearColor
+    assert gl.glClearColor is OpenGL.GL.glClearColor
+    assert gl.tex_image_2d is OpenGL.GL.glTexImage2D
+    assert 'clear_color' in gl.__dict__
+    assert 'clear_color' in dir(gl)
+    with pytest.raises(AttributeError):
+        gl.not_an_opengl_function
+
+
 @pytest.mark.unit
 def test_api_monitor():
     import glfw
@@ -242,5 +462,14 @@ def test_ffi_string():
     assert glfw.ffi_string(my_string) == test_string
 
 
+@pytest.mark.unit
+def test_wrapper_outputs():
+    import glfw
+    # Output pointers are optional, strings and const pointers are inputs
+    assert glfw.raw.snake.get_cursor_pos.__defaults__ == (None, None)
+    assert glfw.raw.snake.set_window_title.__defaults__ is None
+    assert glfw.raw.snake.set_window_icon.__defaults__ is None
+
+
 if __name__ == '__main__':
     pytest.main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import print_function, division
+
+import pytest
+
+
+@pytest.mark.unit
+def test_cache_round_trip(tmpdir, monkeypatch):
+    from glfw import cache
+    monkeypatch.setenv('GLFW_CFFI_CACHE', str(tmpdir))
+
+    key = {'path': '/some/path', 'signature': [1.5, 10]}
+    assert cache.get_cache_dir() == str(tmpdir)
+    assert cache.load('test', key) is None
+    assert cache.store('test', key, {'value': [1, 2, 3]}) is not None
+    assert cache.load('test', key) == {'value': [1, 2, 3]}
+    # Different keys miss
+    assert cache.load('test', {'path': '/some/path', 'signature': [1.5, 11]}) is None
+    assert cache.invalidate('test') == 1
+    assert cache.load('test', key) is None
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize('value', ['0', 'off', 'false', 'no'])
+def test_cache_disabled(monkeypatch, value):
+    from glfw import cache
+    monkeypatch.setenv('GLFW_CFFI_CACHE', value)
+
+    assert cache.get_cache_dir() is None
+    assert cache.store('test', {}, {}) is None
+    assert cache.load('test', {}) is None
+    assert cache.invalidate() == 0
+
+
+@pytest.mark.unit
+def test_header_cache(tmpdir, monkeypatch):
+    import glfw
+    monkeypatch.setenv('GLFW_CFFI_CACHE', str(tmpdir))
+    if glfw.raw.ffi_mode != 'abi':
+        pytest.skip('header cache is only used in ABI mode')
+
+    source = 'void glfwPollEvents(void);'
+    declarations = glfw.raw._get_function_declarations(source)
+    assert glfw.raw._store_cached_header(glfw.raw.library_path, glfw.raw.header_path, source, declarations)
+    ffi = glfw.raw.FFI()
+    header_path, cached_declarations = glfw.raw._load_cached_header(glfw.raw.library_path, ffi)
+    assert header_path == glfw.raw.header_path
+    assert cached_declarations == declarations
+    assert glfw.raw.invalidate_cache('header') == 1
+    assert glfw.raw._load_cached_header(glfw.raw.library_path, ffi) is None
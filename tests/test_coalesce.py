@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function, division
+
+import pytest
+
+
+@pytest.mark.unit
+def test_motion_coalescer(window):
+    import glfw
+    coalescer = glfw.MotionCoalescer()
+    delivered = []
+
+    @coalescer.cursor_pos_callback
+    def on_mouse_move(win, xpos, ypos):
+        delivered.append(('cursor_pos', xpos, ypos))
+
+    @coalescer.scroll_callback
+    def on_scroll(win, xoffset, yoffset):
+        delivered.append(('scroll', xoffset, yoffset))
+
+    coalescer.attach(window)
+    try:
+        # Invoke the callbacks glfw would call while processing events
+        for index in range(100):
+            coalescer._cursor_pos_callback(window, float(index), float(index * 2))
+        for index in range(10):
+            coalescer._scroll_callback(window, 0.0, 1.0)
+        assert delivered == []
+        assert coalescer.flush() == 2
+        assert delivered == [('cursor_pos', 99.0, 198.0), ('scroll', 0.0, 10.0)]
+        assert coalescer.counters == {
+            'cursor_pos_events': 100,
+            'cursor_pos_delivered': 1,
+            'scroll_events': 10,
+            'scroll_delivered': 1,
+        }
+        assert coalescer.merged == 108
+
+        # Nothing is delivered without new events and scrolling restarts at 0
+        assert coalescer.flush() == 0
+        coalescer._scroll_callback(window, 0.5, 0.0)
+        assert coalescer.flush() == 1
+        assert delivered[-1] == ('scroll', 0.5, 0.0)
+    finally:
+        coalescer.detach()
+    assert glfw.coalesce._attached[0] is None
+
+
+@pytest.mark.unit
+def test_motion_coalescer_single_attachment(window):
+    import glfw
+    coalescer = glfw.MotionCoalescer().attach(window)
+    try:
+        with pytest.raises(RuntimeError):
+            glfw.MotionCoalescer().attach(window)
+    finally:
+        coalescer.detach(window)
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function, division
+
+import pytest
+
+
+def queue_event(queue, name, *args):
+    '''Invokes the callback the queue sets for an event type'''
+    from glfw import _event_source
+    for event_name, event_type, event_args in _event_source._event_types:
+        if event_name == name:
+            return queue._get_callback(name, event_type, event_args)(*args)
+
+
+@pytest.mark.unit
+def test_event_queue(window):
+    pytest.importorskip('numpy')
+    import glfw
+    queue = glfw.EventQueue(capacity=8)
+    assert queue.events.dtype.itemsize == glfw.ffi.sizeof('glfw_cffi_event')
+    queue.attach(window, types=['key', 'cursor_pos'])
+    try:
+        queue_event(queue, 'key', window, glfw.KEY_A, 38, glfw.PRESS, glfw.MOD_SHIFT)
+        queue_event(queue, 'cursor_pos', window, 1.5, 2.5)
+        assert len(queue) == 2
+
+        events = queue.drain()
+        assert len(queue) == 0
+        assert events.base is queue.events
+        assert events['type'].tolist() == [glfw.events.KEY, glfw.events.CURSOR_POS]
+        assert events['window'].tolist() == [glfw.events.window_id(window)] * 2
+        assert events['ints'][0].tolist() == [glfw.KEY_A, 38, glfw.PRESS, glfw.MOD_SHIFT]
+        assert events['doubles'][1].tolist() == [1.5, 2.5]
+        assert (events['time'] >= 0).all()
+    finally:
+        queue.detach()
+    assert glfw.events._attached[0] is None
+
+
+@pytest.mark.unit
+def test_event_queue_overflow(window):
+    pytest.importorskip('numpy')
+    import glfw
+    queue = glfw.EventQueue(capacity=2).attach(window)
+    try:
+        with pytest.raises(RuntimeError):
+            glfw.EventQueue().attach(window)
+        for index in range(5):
+            queue_event(queue, 'scroll', window, 0.0, float(index))
+        assert len(queue) == 2
+        assert queue.dropped == 3
+        # The oldest events are kept
+        assert queue.drain()['doubles'][:, 1].tolist() == [0.0, 1.0]
+    finally:
+        queue.detach()
+
+
+@pytest.mark.unit
+def test_event_queue_unknown_type(window):
+    pytest.importorskip('numpy')
+    import glfw
+    with pytest.raises(ValueError):
+        glfw.EventQueue().attach(window, types=['not_an_event'])
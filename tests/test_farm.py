@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function, division
+
+import os
+import time
+
+import pytest
+
+
+# Jobs are defined at module level so the worker processes can unpickle them
+def clear(color):
+    from glfw import gl
+    gl.clear_color(*color)
+    gl.clear(gl.COLOR_BUFFER_BIT)
+    return color
+
+
+def crash(_):
+    os._exit(3)
+
+
+def hang(_):
+    time.sleep(60)
+
+
+def fail(_):
+    raise ValueError('job failed')
+
+
+@pytest.fixture(scope='module')
+def render_pool(opengl_version):
+    pytest.importorskip('numpy')
+    import glfw.farm
+    if opengl_version < (3, 0):
+        pytest.skip('framebuffer objects require OpenGL 3.0')
+    pool = glfw.farm.RenderPool(processes=2, width=8, height=4, timeout=2.0)
+    yield pool
+    pool.close()
+
+
+@pytest.mark.unit
+def test_render_pool_map(render_pool):
+    colors = [(1, 0, 0, 1), (0, 1, 0, 1), (0, 0, 1, 1), (1, 1, 1, 1)]
+    pids = render_pool.pids
+    images = render_pool.map(clear, colors)
+    assert [image.shape for image in images] == [(4, 8, 4)] * 4
+    for image, color in zip(images, colors):
+        assert (image == [int(channel * 255) for channel in color]).all()
+    # Warm workers are reused
+    assert render_pool.map(clear, colors[:2])[1][0, 0].tolist() == [0, 255, 0, 255]
+    assert render_pool.pids == pids
+
+    results = sorted(render_pool.imap_unordered(clear, colors), key=lambda result: result.index)
+    assert [result.value for result in results] == colors
+
+
+@pytest.mark.unit
+def test_render_pool_isolation(render_pool):
+    counters = dict(render_pool.counters)
+    result = render_pool.render(crash, None)
+    assert 'crashed' in result.error
+    result = render_pool.render(hang, None)
+    assert 'timed out' in result.error
+    result = render_pool.render(fail, None)
+    assert 'ValueError: job failed' in result.error
+    assert render_pool.counters['crashes'] == counters['crashes'] + 1
+    assert render_pool.counters['timeouts'] == counters['timeouts'] + 1
+    assert render_pool.counters['started'] == counters['started'] + 2
+
+    # The replacement workers render as before
+    result = render_pool.render(clear, (0, 1, 0, 1))
+    assert result.error is None
+    assert result.pixels[0, 0].tolist() == [0, 255, 0, 255]
+    with pytest.raises(RuntimeError):
+        render_pool.map(fail, [None])
+
+
+@pytest.mark.unit
+def test_render_pool_idle_crash(render_pool):
+    import signal
+    counters = dict(render_pool.counters)
+    # A worker dying between jobs is only noticed when it is sent one
+    worker = render_pool._workers[0]
+    os.kill(worker.process.pid, getattr(signal, 'SIGKILL', signal.SIGTERM))
+    worker.process.join()
+    images = render_pool.map(clear, [(0, 0, 1, 1), (1, 0, 0, 1)])
+    assert images[0][0, 0].tolist() == [0, 0, 255, 255]
+    assert images[1][0, 0].tolist() == [255, 0, 0, 255]
+    assert worker.process.pid not in render_pool.pids
+    assert render_pool.counters['started'] == counters['started'] + 1
+    assert render_pool.counters['failed'] == counters['failed']
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function, division
+
+import pytest
+
+
+@pytest.mark.unit
+def test_input_snapshot(window):
+    np = pytest.importorskip('numpy')
+    import glfw
+    keys = [glfw.KEY_A, glfw.KEY_B, glfw.KEY_SPACE]
+
+    snapshot = glfw.InputSnapshot.capture(window, keys=keys)
+    assert snapshot.frame == 1
+    assert snapshot.keys.tolist() == keys
+    assert snapshot.key_states.dtype == np.uint8
+    assert snapshot.key_states.shape == (3, )
+    assert snapshot.mouse_button_states.shape == (glfw.MOUSE_BUTTON_LAST + 1, )
+    assert snapshot.cursor.dtype == np.float64
+    assert snapshot.cursor_delta.tolist() == [0.0, 0.0]
+
+    # Buffers are reused rather than reallocated each frame
+    buffers = {id(snapshot.key_states), id(snapshot.previous_key_states)}
+    glfw.poll_events()
+    snapshot.update()
+    snapshot.update()
+    assert {id(snapshot.key_states), id(snapshot.previous_key_states)} == buffers
+    assert snapshot.frame == 3
+
+
+@pytest.mark.unit
+def test_input_snapshot_changes(window):
+    pytest.importorskip('numpy')
+    import glfw
+    snapshot = glfw.InputSnapshot.capture(window, keys=[glfw.KEY_A, glfw.KEY_B])
+    assert snapshot.changed_keys().tolist() == []
+
+    # Simulate pressing B between frames
+    snapshot.update()
+    snapshot.key_states[1] = glfw.PRESS
+    assert snapshot.pressed_keys().tolist() == [glfw.KEY_B]
+    assert snapshot.changed_keys().tolist() == [glfw.KEY_B]
+    assert snapshot.keys_down().tolist() == [glfw.KEY_B]
+    assert snapshot.released_keys().tolist() == []
+
+    # And releasing it on the next frame
+    snapshot.update()
+    assert snapshot.released_keys().tolist() == [glfw.KEY_B]
+    assert snapshot.pressed_keys().tolist() == []
+    assert snapshot.changed_mouse_buttons().tolist() == []
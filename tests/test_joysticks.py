@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function, division
+
+import pytest
+
+
+class FakeJoysticks(object):
+    '''Answers glfw's joystick functions for connected test joysticks'''
+
+    def __init__(self, glfw):
+        self._glfw = glfw.raw._glfw
+        self.ffi = glfw.ffi
+        self.calls = 0
+        self.joysticks = {}
+
+    def connect(self, joy, name, axes, buttons):
+        ffi = self.ffi
+        self.joysticks[joy] = (ffi.new('char[]', name), ffi.new('float[]', axes), ffi.new('unsigned char[]', buttons))
+
+    def __getattr__(self, name):
+        return getattr(self._glfw, name)
+
+    def glfwJoystickPresent(self, joy):
+        self.calls += 1
+        return int(joy in self.joysticks)
+
+    def glfwGetJoystickName(self, joy):
+        self.calls += 1
+        return self.joysticks[joy][0] if joy in self.joysticks else self.ffi.NULL
+
+    def _get_array(self, joy, count, index):
+        self.calls += 1
+        if joy not in self.joysticks:
+            count[0] = 0
+            return self.ffi.NULL
+        array = self.joysticks[joy][index]
+        count[0] = len(array)
+        return array
+
+    def glfwGetJoystickAxes(self, joy, count):
+        return self._get_array(joy, count, 1)
+
+    def glfwGetJoystickButtons(self, joy, count):
+        return self._get_array(joy, count, 2)
+
+
+@pytest.mark.unit
+def test_poll_all():
+    np = pytest.importorskip('numpy')
+    import glfw
+    state = glfw.joysticks.poll_all()
+    assert state.axes.shape == (16, state.max_axes)
+    assert state.axes.dtype == np.float32
+    assert state.buttons.shape == (16, state.max_buttons)
+    assert state.buttons.dtype == np.uint8
+    assert state.present.shape == (16, )
+    assert glfw.joysticks.poll_all() is state
+    assert glfw.joysticks.get_names() == [None if not present else name
+                                          for present, name in zip(state.present, state.names)]
+
+
+@pytest.mark.unit
+def test_joystick_poller(monkeypatch):
+    np = pytest.importorskip('numpy')
+    import glfw
+    fake = FakeJoysticks(glfw)
+    fake.connect(1, b'Pad', [0.5, -1.0, 0.25], [1, 0, 1])
+    fake.connect(3, b'Wheel', [0.75], [0, 1, 1, 1, 0])
+    monkeypatch.setattr(glfw.raw, '_glfw', fake)
+    poller = glfw.joysticks.JoystickPoller(max_axes=2, max_buttons=4, rescan=0)
+
+    poller.poll()
+    assert poller.present.nonzero()[0].tolist() == [1, 3]
+    assert poller.names[1] == 'Pad' and poller.names[3] == 'Wheel' and poller.names[0] is None
+    # Extra axes and buttons are left out
+    assert poller.axes[1].tolist() == [0.5, -1.0]
+    assert poller.axes[3].tolist() == [0.75, 0.0]
+    assert poller.buttons[1].tolist() == [1, 0, 1, 0]
+    assert poller.buttons[3].tolist() == [0, 1, 1, 1]
+    assert poller.axis_counts[[1, 3]].tolist() == [2, 1]
+
+    # Without connection changes only the connected joysticks are queried
+    fake.calls = 0
+    fake.joysticks[1][1][0] = -0.5
+    poller.poll()
+    assert fake.calls == 4
+    assert poller.axes[1, 0] == np.float32(-0.5)
+    assert poller.counters['scans'] == 1
+
+    # A disconnection clears the slot
+    del fake.joysticks[3]
+    glfw.joysticks._joysticks._on_joystick(3, glfw.DISCONNECTED)
+    poller.poll()
+    assert poller.present.nonzero()[0].tolist() == [1]
+    assert poller.names[3] is None
+    assert not poller.axes[3].any() and not poller.buttons[3].any()
+    assert poller.counters['scans'] == 2
+
+
+@pytest.mark.unit
+def test_set_joystick_callback():
+    import glfw
+    events = []
+    previous = glfw.set_joystick_callback(lambda joy, event: events.append((joy, event)))
+    try:
+        glfw.joysticks._joysticks._on_joystick(2, glfw.CONNECTED)
+        assert events == [(2, glfw.CONNECTED)]
+    finally:
+        glfw.set_joystick_callback(previous)
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function, division
+
+import threading
+
+import pytest
+
+
+@pytest.mark.unit
+def test_render_loop(window):
+    import glfw
+    from glfw.events import _get_setter
+    frames = []
+    pressed = []
+
+    @glfw.decorators.key_callback
+    def on_key(win, key, scancode, action, mods):
+        pressed.append(key)
+
+    glfw.set_key_callback(window, on_key)
+    loop = glfw.RenderLoop(window, lambda: frames.append(glfw.get_time()), types=['key'])
+    loop.attach()
+    try:
+        # The first step renders, the next one only waits
+        assert loop.step() is True
+        loop.call_later(0.01)
+        assert loop.step() is False
+        assert loop.counters['timers'] == 1
+        assert loop.step() is True
+
+        # Input marks the loop dirty and reaches the chained callback
+        loop._callbacks['key'](window, glfw.KEY_A, 0, glfw.PRESS, 0)
+        assert loop.dirty
+        assert pressed == [glfw.KEY_A]
+        assert loop.step() is True
+
+        # An empty event wakes the loop without a frame
+        glfw.post_empty_event()
+        assert loop.step() is False
+        assert loop.counters['skipped'] == 1
+
+        # Invalidating from another thread wakes the loop
+        thread = threading.Timer(0.01, loop.invalidate)
+        thread.start()
+        loop.step()
+        thread.join()
+        assert loop.step() is True
+    finally:
+        loop.detach()
+    assert loop.counters['rendered'] == len(frames) == 4
+    # The chained callback is restored
+    assert _get_setter('key')(window, glfw.ffi.NULL) == on_key
+
+
+@pytest.mark.unit
+def test_render_loop_timers(window):
+    import glfw
+    ticks = []
+    loop = glfw.RenderLoop(window, lambda: None, types=[])
+    timer = loop.call_every(0.01, ticks.append, 'tick')
+    cancelled = loop.call_later(0.01, ticks.append, 'cancelled')
+    cancelled.cancel()
+    loop.dirty = False
+    while len(ticks) < 3:
+        loop.step()
+    timer.cancel()
+    assert ticks == ['tick'] * 3
+    assert loop._next_timeout(glfw.get_time()) is None
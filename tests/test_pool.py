@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function, division
+
+import pytest
+
+
+@pytest.mark.unit
+def test_context_pool(opengl_version):
+    import glfw
+    major, minor = opengl_version
+    hints = {glfw.CONTEXT_VERSION_MAJOR: major, glfw.CONTEXT_VERSION_MINOR: minor}
+    if opengl_version >= (3, 2):
+        hints.update({glfw.OPENGL_PROFILE: glfw.OPENGL_CORE_PROFILE, glfw.OPENGL_FORWARD_COMPAT: True})
+    current = glfw.get_current_context()
+    with glfw.ContextPool(size=2, width=8, height=8, hints=hints) as pool:
+        assert len(pool) == 2
+        assert pool.metrics['created'] == 2
+        with pool.context() as win:
+            assert glfw.get_current_context() == win
+            assert glfw.get_window_attrib(win, glfw.VISIBLE) == 0
+            with pool.context() as other:
+                with pool.context() as extra:
+                    assert len({int(glfw.ffi.cast('uintptr_t', w)) for w in (win, other, extra)}) == 3
+                    assert glfw.get_current_context() == extra
+                assert glfw.get_current_context() == other
+            assert glfw.get_current_context() == win
+        assert glfw.get_current_context() == current
+
+        metrics = pool.metrics
+        assert (metrics['hits'], metrics['misses']) == (2, 1)
+        assert metrics['created'] == 3
+        # Only size windows are kept idle
+        assert len(pool) == 2
+        assert metrics['destroyed'] == 1
+        assert metrics['max_creation_seconds'] >= pool.mean_creation_seconds > 0
+    assert len(pool) == 0
+    assert pool.metrics['destroyed'] == 3
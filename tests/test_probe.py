@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function, division
+
+import pytest
+
+
+def fake_driver(monkeypatch, core=(4, 1), compat=(2, 1), reported=None):
+    '''Replaces context creation with a driver supporting the given versions
+
+    Returns:
+        list: (version, core) of every context requested
+    '''
+    import glfw
+    requested = []
+
+    def try_version(version, is_core, strings=None):
+        requested.append((version, is_core))
+        highest = core if is_core else compat
+        if highest is None or version > highest:
+            return None
+        if strings is not None and not strings:
+            strings.update({'vendor': 'vendor', 'renderer': 'renderer', 'version': 'version'})
+        return max(version, reported or version)
+
+    monkeypatch.setattr(glfw.probe, '_try_version', try_version)
+    monkeypatch.setattr(glfw.probe, '_results', {})
+    return requested
+
+
+@pytest.mark.unit
+def test_probe_context_versions(monkeypatch, tmpdir):
+    import glfw
+    monkeypatch.setenv('GLFW_CFFI_CACHE', str(tmpdir))
+    requested = fake_driver(monkeypatch)
+
+    info = glfw.probe_context_versions()
+    assert info == glfw.ContextInfo(core=(4, 1), compat=(2, 1), vendor='vendor', renderer='renderer', version='version')
+    # Far fewer windows than trying every version
+    assert len(requested) <= 2 + 3 + 5
+
+    # Cached in-process, so no more contexts are created
+    del requested[:]
+    assert glfw.probe_context_versions() is info
+    assert requested == []
+
+    # Cached on disk per driver, so only the two identifying contexts are created
+    monkeypatch.setattr(glfw.probe, '_results', {})
+    assert glfw.probe_context_versions() == info
+    assert len(requested) == 2
+
+
+@pytest.mark.unit
+def test_probe_context_versions_reported(monkeypatch):
+    import glfw
+    # Drivers commonly create the newest version available
+    requested = fake_driver(monkeypatch, core=(4, 6), compat=(4, 6), reported=(4, 6))
+    info = glfw.probe_context_versions(disk_cache=False)
+    assert (info.core, info.compat) == ((4, 6), (4, 6))
+    assert len(requested) == 2
+
+
+@pytest.mark.unit
+def test_probe_context_versions_unavailable(monkeypatch):
+    import glfw
+    fake_driver(monkeypatch, core=None, compat=None)
+    info = glfw.probe_context_versions(disk_cache=False)
+    assert info == glfw.ContextInfo(None, None, None, None, None)
@@ -0,0 +1,32 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import print_function, division
+
+from collections import OrderedDict
+
+import pytest
+
+
+@pytest.mark.unit
+def test_format_table():
+    from glfw.profile_import import format_table
+    stats = OrderedDict([
+        ('initialize_module', {'time': 0.010, 'calls': 1, 'count': 0, 'depth': 0}),
+        ('wrap_functions', {'time': 0.002, 'calls': 1, 'count': 92, 'depth': 1}),
+    ])
+    runs = [{'total': 0.020, 'ffi_mode': 'abi', 'stats': stats}] * 2
+    table = format_table(runs)
+    assert 'initialize_module' in table
+    assert '  wrap_functions' in table
+    assert '92' in table
+    assert 'runs: 2   ffi mode: abi' in table
+
+
+@pytest.mark.unit
+def test_profile_import():
+    from glfw.profile_import import profile_import
+    runs = profile_import(repeat=1)
+    assert len(runs) == 1
+    stats = runs[0]['stats']
+    assert 'initialize_module' in stats
+    assert stats['wrap_functions']['count'] > 0
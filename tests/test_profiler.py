@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function, division
+
+import pytest
+
+
+@pytest.mark.unit
+def test_gpu_profiler(window, opengl_version):
+    pytest.importorskip('numpy')
+    import glfw
+    from glfw import gl
+    if opengl_version < (3, 3):
+        pytest.skip('timer queries require OpenGL 3.3')
+
+    profiler = gl.GpuProfiler(queries=2, history=4)
+    assert profiler.__class__ is glfw.GpuProfiler
+    try:
+        for _ in range(6):
+            with profiler.section('frame'):
+                with profiler.section('clear'):
+                    gl.clear(gl.COLOR_BUFFER_BIT)
+            profiler.collect()
+        gl.finish()
+        while profiler.collect():
+            pass
+        # The pool grew to cover the pending queries
+        assert profiler.counters['queries'] > 2
+        assert profiler.counters['sections'] == profiler.counters['collected'] == 12
+        assert profiler.sections == ['clear', 'frame']
+        frame, clear = profiler.times('frame'), profiler.times('clear')
+        assert len(frame) == len(clear) == 4
+        assert (frame >= clear).all()
+        stats = profiler.stats('frame')
+        assert stats['count'] == 4
+        assert stats['p99'] >= stats['p50'] >= 0
+        counts, edges = profiler.histogram('frame', bins=5)
+        assert counts.sum() == 4
+        with pytest.raises(ValueError):
+            with profiler.section('outer'):
+                profiler.end('inner')
+    finally:
+        profiler.delete()
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function, division
+
+import pytest
+
+
+@pytest.mark.unit
+def test_framebuffer_readback(window, opengl_version):
+    pytest.importorskip('numpy')
+    import glfw
+    from glfw import gl
+    if opengl_version < (3, 2):
+        pytest.skip('fences require OpenGL 3.2')
+
+    readback = glfw.FramebufferReadback(64, 32, buffers=3)
+    try:
+        assert readback.latency == 2
+        completed = []
+        for index in range(6):
+            with readback.target():
+                gl.clear_color(index / 10.0, 0, 0, 1)
+                gl.clear(gl.COLOR_BUFFER_BIT)
+            frame = readback.read()
+            # Frame N completes when frame N + latency is read
+            if index < readback.latency:
+                assert frame is None
+            else:
+                assert frame[0] == index - readback.latency
+                assert frame[1].base is readback.frames
+                completed.append((frame[0], int(frame[1][0, 0, 0])))
+        completed.extend((index, int(pixels[0, 0, 0])) for index, pixels in readback.flush())
+
+        assert [index for index, red in completed] == list(range(6))
+        for index, red in completed:
+            assert abs(red - index / 10.0 * 255) <= 1
+        counters = readback.counters
+        assert counters['submitted'] == counters['completed'] == 6
+        assert counters['bytes'] == 6 * 64 * 32 * 4
+        assert readback.fps > 0
+    finally:
+        readback.delete()
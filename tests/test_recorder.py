@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function, division
+
+import struct
+import threading
+import zlib
+
+import pytest
+
+
+def read_png(path):
+    '''Decodes an RGBA png written without filters'''
+    np = pytest.importorskip('numpy')
+    with open(path, 'rb') as fd:
+        data = fd.read()
+    assert data[:8] == b'\x89PNG\r\n\x1a\n'
+    chunks = {}
+    offset = 8
+    while offset < len(data):
+        length, kind = struct.unpack(b'>I4s', data[offset:offset + 8])
+        chunks[kind] = data[offset + 8:offset + 8 + length]
+        offset += 12 + length
+    width, height, depth, color_type = struct.unpack(b'>IIBB', chunks[b'IHDR'][:10])
+    assert (depth, color_type) == (8, 6)
+    rows = np.frombuffer(zlib.decompress(chunks[b'IDAT']), dtype=np.uint8).reshape(height, width * 4 + 1)
+    assert (rows[:, 0] == 0).all()
+    return rows[:, 1:].reshape(height, width, 4)
+
+
+@pytest.mark.unit
+def test_frame_recorder_raw(tmpdir):
+    np = pytest.importorskip('numpy')
+    import glfw
+    path = str(tmpdir.join('frames.rgba'))
+    frames = np.random.randint(0, 255, size=(5, 4, 3, 4)).astype(np.uint8)
+    with glfw.FrameRecorder(path, 3, 4, format='raw', policy='block', queue_size=2) as recorder:
+        for index, frame in enumerate(frames):
+            assert recorder.write(index, frame) is True
+    assert recorder.counters['written'] == 5
+    assert recorder.counters['dropped'] == 0
+    assert recorder.counters['bytes'] == frames.nbytes
+    with open(path, 'rb') as fd:
+        assert fd.read() == frames.tobytes()
+
+
+@pytest.mark.unit
+def test_frame_recorder_png(tmpdir):
+    np = pytest.importorskip('numpy')
+    import glfw
+    pattern = str(tmpdir.join('frame-{:03d}.png'))
+    frame = np.arange(4 * 3 * 4, dtype=np.uint8).reshape(4, 3, 4)
+    with glfw.FrameRecorder(pattern, 3, 4, format='png') as recorder:
+        recorder.write(7, frame, flip=True)
+    assert (read_png(pattern.format(7)) == frame[::-1]).all()
+
+
+@pytest.mark.unit
+def test_frame_recorder_drop(tmpdir):
+    np = pytest.importorskip('numpy')
+    import glfw
+    recorder = glfw.FrameRecorder(str(tmpdir.join('frames.rgba')), 2, 2, queue_size=2, policy='drop')
+    write_frame = recorder._write_frame
+    unblock = threading.Event()
+
+    def slow_write_frame(index, frame):
+        unblock.wait()
+        return write_frame(index, frame)
+
+    recorder._write_frame = slow_write_frame
+    frame = np.zeros((2, 2, 4), dtype=np.uint8)
+    try:
+        # The worker holds one frame and one waits, so the rest are dropped
+        results = [recorder.write(index, frame) for index in range(5)]
+        assert results[:2] == [True, True]
+        assert results.count(False) == recorder.counters['dropped'] == 3
+    finally:
+        unblock.set()
+        recorder.close()
+    assert recorder.counters['written'] == 2
+
+
+@pytest.mark.unit
+def test_frame_recorder_capture(window, opengl_version, tmpdir):
+    np = pytest.importorskip('numpy')
+    import glfw
+    from glfw import gl
+    if opengl_version < (3, 2):
+        pytest.skip('fences require OpenGL 3.2')
+    path = str(tmpdir.join('frames.rgba'))
+    width, height = glfw.get_framebuffer_size(window)
+    with glfw.FrameRecorder(path, width, height, policy='block') as recorder:
+        for index in range(4):
+            gl.clear_color(0, index / 4.0, 0, 1)
+            gl.clear(gl.COLOR_BUFFER_BIT)
+            recorder.capture()
+            glfw.swap_buffers(window)
+    assert recorder.counters['captured'] == recorder.counters['written'] == 4
+    frames = np.fromfile(path, dtype=np.uint8).reshape(4, height, width, 4)
+    # Frames are written in order; allow for framebuffers with fewer bits per channel
+    for index, frame in enumerate(frames):
+        assert abs(int(frame[0, 0, 1]) - index * 255 / 4.0) <= 8
+
+
+@pytest.mark.unit
+def test_frame_recorder_pipe_failure():
+    np = pytest.importorskip('numpy')
+    import subprocess
+    import sys
+    import glfw
+    # Frames larger than the pipe buffer cannot all be accepted by an encoder which exits
+    frame = np.zeros((128, 128, 4), dtype=np.uint8)
+    command = [sys.executable, '-c', 'import sys; sys.exit(3)']
+    recorder = glfw.FrameRecorder(command, 128, 128, format='pipe', policy='block', queue_size=2)
+    with pytest.raises(subprocess.CalledProcessError) as error:
+        try:
+            for index in range(50):
+                recorder.write(index, frame)
+        finally:
+            recorder.close()
+    assert error.value.returncode == 3
+    assert recorder.counters['written'] < 50
+    assert recorder.counters['dropped'] >= 1
+
+
+@pytest.mark.unit
+def test_frame_recorder_close_after_failure(tmpdir):
+    np = pytest.importorskip('numpy')
+    import glfw
+    frame = np.zeros((2, 2, 4), dtype=np.uint8)
+
+    class Readback(object):
+        deleted = False
+
+        def flush(self):
+            return [(0, frame)]
+
+        def delete(self):
+            self.deleted = True
+
+    readback = Readback()
+    recorder = glfw.FrameRecorder(str(tmpdir.join('frames.rgba')), 2, 2)
+    recorder.readback = readback
+    recorder._error = IOError('disk full')
+    # Flushing the readback raises the worker's error; teardown still happens
+    with pytest.raises(IOError):
+        recorder.close()
+    assert readback.deleted
+    assert not recorder._thread.is_alive()
+    assert recorder._file.closed
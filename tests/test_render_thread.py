@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function, division
+
+import pytest
+
+
+@pytest.mark.unit
+def test_command_queue():
+    from glfw.render_thread import CommandQueue
+    woken = []
+    queue = CommandQueue(capacity=2, wake=lambda: woken.append(True))
+    assert queue.put('a') is True
+    assert queue.put('b') is True
+    assert queue.put('c') is False
+    assert queue.dropped == 1
+    assert len(woken) == 2
+    assert queue.drain() == ['a', 'b']
+    assert queue.drain() == []
+    assert len(queue) == 0
+
+
+@pytest.mark.unit
+def test_render_thread(window):
+    import glfw
+    seen = []
+
+    def setup(thread):
+        seen.append(('current', glfw.get_current_context() == window))
+
+    def render(thread, events):
+        if thread.counters['frames'] == 0:
+            # Invoke the callback glfw would call on the main thread
+            thread.call(thread._callbacks['key'], window, glfw.KEY_A, 0, glfw.PRESS, 0)
+        for event in events:
+            seen.append((event.type, event.args))
+            thread.set_title('Pressed {}'.format(event.args[0]))
+            thread.close()
+
+    thread = glfw.RenderThread(window, render, setup=setup, types=['key'], swap_interval=0)
+    try:
+        thread.run(timeout=1.0)
+    finally:
+        glfw.make_context_current(window)
+        glfw.set_window_should_close(window, False)
+    assert seen == [('current', True), ('key', (glfw.KEY_A, 0, glfw.PRESS, 0))]
+    assert thread.counters['events'] == 1
+    # The key callback, then set_title and set_window_should_close
+    assert thread.counters['commands'] == 3
+    assert thread.error is None
+
+
+@pytest.mark.unit
+def test_render_thread_error(window):
+    import glfw
+
+    def render(thread, events):
+        raise ValueError('render failed')
+
+    thread = glfw.RenderThread(window, render, swap_interval=0)
+    try:
+        with pytest.raises(ValueError):
+            thread.run(timeout=1.0)
+    finally:
+        glfw.make_context_current(window)
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function, division
+
+import pytest
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.unit
+def test_frame_timer():
+    np = pytest.importorskip('numpy')
+    import glfw
+    clock = FakeClock()
+    timer = glfw.FrameTimer(size=4, clock=clock)
+    for render, swap in [(0.010, 0.002), (0.012, 0.002), (0.011, 0.003), (0.040, 0.002), (0.010, 0.002)]:
+        clock.now += render
+        timer.mark('render')
+        clock.now += swap
+        timer.mark('swap')
+        clock.now += 0.001
+        timer.mark('poll')
+        timer.end_frame()
+    assert timer.count == 5
+
+    # Only the last four frames are kept, oldest first
+    assert np.allclose(timer.frames('render'), [0.012, 0.011, 0.040, 0.010])
+    assert np.allclose(timer.frames('total'), [0.015, 0.015, 0.043, 0.013])
+    assert np.allclose(timer.frames().sum(axis=1), 2 * timer.frames('total'))
+    assert timer.percentiles((0, 100)) == pytest.approx({0: 0.013, 100: 0.043})
+    assert timer.jank() == 1
+    assert timer.jank(threshold=0.014) == 3
+    assert timer.fps == pytest.approx(4 / 0.086)
+    summary = timer.summary()
+    assert summary['frames'] == 4
+    assert summary['swap'][50] == pytest.approx(0.002)
+
+    timer.reset()
+    assert timer.percentiles() == {}
+    assert timer.fps == 0.0
+
+
+@pytest.mark.unit
+def test_frame_timer_window(window):
+    pytest.importorskip('numpy')
+    import glfw
+    timer = glfw.FrameTimer(size=8)
+    for _ in range(3):
+        timer.swap_buffers(window)
+        timer.poll_events()
+    assert timer.count == 3
+    assert (timer.frames('total') >= 0).all()
+    assert timer.fps > 0
+
+
+@pytest.mark.unit
+def test_frame_timer_init():
+    pytest.importorskip('numpy')
+    import glfw
+    assert glfw.init() == glfw.gl.TRUE
+    glfw.configure(auto_init=False)
+    try:
+        assert glfw.raw._initialized[0] is False
+        # The default clock needs glfw to be initialized
+        glfw.FrameTimer(size=4)
+        assert glfw.raw._initialized[0] is True
+    finally:
+        glfw.configure(auto_init=True)